@@ -0,0 +1,162 @@
+"""
+Location autocomplete from the in-memory LocationIndex
+(src/apartment/autocomplete.py): build time, snapshot size and load time,
+suggestion latency for 1-4 letter prefixes, and the cost of an incremental
+add/remove. Cities get a Zipf-like popularity, like real listings.
+
+With --sql the same prefixes also run as the query the index replaces
+(lower(city) LIKE 'prefix%' through a text_pattern_ops index, GROUP BY,
+ORDER BY count) on a scratch table
+(bench_apartments, a copy of the apartments schema) seeded with --rows
+apartments, so the real apartments table is not touched.
+
+    python -m benchmarks.apartment_autocomplete --cities 50000 --queries 2000
+    python -m benchmarks.apartment_autocomplete --cities 50000 --sql --rows 1000000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import text
+
+from src.apartment import geo
+from src.apartment.autocomplete import LocationIndex, dump_snapshot, load_snapshot
+from src.db.main import engine
+
+COLUMNS = [
+    "uid", "title", "description", "country", "city", "state", "address", "zip_code", "latitude", "longitude",
+    "geohash", "price", "currency", "discount_percentage", "cleaning_fee", "deposit_amount", "num_rooms",
+    "num_beds", "square_meters", "floor", "has_elevator", "has_wifi", "has_air_conditioning", "has_parking",
+    "pet_friendly", "amenity_mask", "facet_id", "is_active", "created_at", "updated_at", "owner_id",
+]
+
+SYLLABLES = ["ba", "be", "bo", "da", "gra", "ka", "ko", "la", "li", "ma", "no", "pa", "ri", "sa", "sp", "sta", "to", "va", "za", "zu"]
+
+
+def make_name() -> str:
+    return "".join(random.choices(SYLLABLES, k=random.randint(2, 4))).capitalize()
+
+
+def make_locations(cities: int) -> list[list]:
+    countries = [make_name() for _ in range(100)]
+    states = [(make_name(), random.choice(countries)) for _ in range(cities // 20 or 1)]
+    rows = []
+    for rank in range(1, cities + 1):
+        state, country = random.choice(states)
+        # Zipf: malo velikih gradova sa puno stanova, dug rep sa po jednim
+        rows.append([country, state, make_name(), max(1, int(20000 / rank))])
+    return rows
+
+
+def summarize(latencies: list[float]) -> str:
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    return f"p50={statistics.median(latencies) * 1000:8.3f}ms p99={p99 * 1000:8.3f}ms"
+
+
+def prefixes(locations: list[list], count: int, length: int) -> list[str]:
+    # pocetak postojecih imena, kao korisnik koji kuca grad koji postoji
+    return [city[:length].lower() for _, _, city, _ in random.choices(locations, k=count)]
+
+
+async def sql_latencies(locations: list[list], rows: int, queries: dict[int, list[str]]) -> dict[int, list[float]]:
+    now = datetime.now()
+    owner = uuid.uuid4()
+    weights = [count for *_, count in locations]
+
+    def make_rows():
+        for n, (country, state, city, _) in enumerate(random.choices(locations, weights=weights, k=rows)):
+            yield (
+                uuid.uuid4(), f"Apartment {n}", "", country, city, state, f"Street {n}", "11000", 44.8, 20.4,
+                geo.encode(44.8, 20.4), 50.0, "EUR", 0.0, 0.0, 0.0, 2, 2, 45.0, 1,
+                False, True, False, False, False, 2, n, True, now, now, owner,
+            )
+
+    latencies = {}
+    async with engine.connect() as conn:
+        await conn.execute(text("DROP TABLE IF EXISTS bench_apartments"))
+        await conn.execute(text("CREATE TABLE bench_apartments (LIKE apartments INCLUDING DEFAULTS INCLUDING IDENTITY)"))
+        await conn.commit()
+
+        raw = (await conn.get_raw_connection()).driver_connection
+        data = list(make_rows())
+        for start in range(0, len(data), 100_000):
+            await raw.copy_records_to_table("bench_apartments", records=data[start:start + 100_000], columns=COLUMNS)
+        del data
+        await conn.execute(text("CREATE INDEX ON bench_apartments (lower(city) text_pattern_ops)"))
+        await conn.execute(text("ANALYZE bench_apartments"))
+        await conn.commit()
+
+        statement = text(
+            "SELECT city, state, country, count(*) AS n FROM bench_apartments "
+            "WHERE is_active AND lower(city) LIKE :prefix GROUP BY city, state, country ORDER BY n DESC LIMIT 10"
+        )
+        for length, words in queries.items():
+            latencies[length] = []
+            for word in words:
+                start = time.perf_counter()
+                await conn.execute(statement, {"prefix": f"{word}%"})
+                latencies[length].append(time.perf_counter() - start)
+
+        await conn.execute(text("DROP TABLE bench_apartments"))
+        await conn.commit()
+
+    await engine.dispose()
+    return latencies
+
+
+def main(cities: int, queries: int, sql: bool, rows: int) -> None:
+    locations = make_locations(cities)
+
+    start = time.perf_counter()
+    index = LocationIndex.build(locations)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    blob = dump_snapshot(0, index)
+    dump_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    load_snapshot(blob)
+    load_seconds = time.perf_counter() - start
+
+    print(f"{len(index.entries)} entries ({cities} cities), build {build_seconds * 1000:.1f}ms")
+    print(f"snapshot {len(blob) / 1024:.0f}KiB compressed, dump {dump_seconds * 1000:.1f}ms, load {load_seconds * 1000:.1f}ms")
+
+    workload = {length: prefixes(locations, queries, length) for length in (1, 2, 3, 4)}
+    memory = {}
+    for length, words in workload.items():
+        memory[length] = []
+        for word in words:
+            start = time.perf_counter()
+            index.suggest(word, limit=10)
+            memory[length].append(time.perf_counter() - start)
+
+    updates = []
+    for country, state, city, _ in random.sample(locations, min(queries, len(locations))):
+        start = time.perf_counter()
+        index.add(country, state, city + "x")
+        index.remove(country, state, city + "x")
+        updates.append(time.perf_counter() - start)
+    print(f"add + remove of a new city {summarize(updates)}")
+
+    database = asyncio.run(sql_latencies(locations, rows, workload)) if sql else {}
+    for length in workload:
+        line = f"prefix {length} letters  index {summarize(memory[length])}"
+        if sql:
+            line += f" | SQL LIKE + GROUP BY {summarize(database[length])}"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cities", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--sql", action="store_true", help="also time the database query on a seeded scratch table")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="apartments seeded for --sql")
+    args = parser.parse_args()
+
+    main(args.cities, args.queries, args.sql, args.rows)
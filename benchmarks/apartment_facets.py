@@ -0,0 +1,141 @@
+"""
+Faceted filtering on a 1M-apartment catalog:
+
+  facet counts   one GROUP BY per facet (5 amenities, rooms, beds) against the
+                 in-memory FacetBitmaps match + counts
+  filter page    boolean columns without an index against amenity_mask IN
+                 (supersets) with the index from migration c5e8a2d4f917
+
+Rows are copied into a scratch table (bench_apartments, a copy of the
+apartments schema), so the real apartments table is not touched.
+
+    python -m benchmarks.apartment_facets --rows 1000000 --queries 100
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import text
+
+from src.apartment import geo
+from src.apartment.facets import AMENITIES, FacetBitmaps, supersets
+from src.db.main import engine
+
+COLUMNS = [
+    "uid", "title", "description", "country", "city", "state", "address", "zip_code", "latitude", "longitude",
+    "geohash", "price", "currency", "discount_percentage", "cleaning_fee", "deposit_amount", "num_rooms",
+    "num_beds", "square_meters", "floor", *AMENITIES, "amenity_mask", "facet_id", "is_active",
+    "created_at", "updated_at", "owner_id",
+]
+
+# verovatnoca svakog sadrzaja, parking i ljubimci su redji
+AMENITY_RATES = (0.4, 0.9, 0.6, 0.25, 0.15)
+
+
+def make_rows(count: int):
+    now = datetime.now()
+    owner = uuid.uuid4()
+    for n in range(count):
+        flags = [random.random() < rate for rate in AMENITY_RATES]
+        mask = sum(1 << bit for bit, flag in enumerate(flags) if flag)
+        rooms = random.choice((1, 1, 2, 2, 2, 3, 3, 4, 5))
+        latitude, longitude = random.uniform(42, 46), random.uniform(19, 23)
+        yield (
+            uuid.uuid4(), f"Apartment {n}", "", "RS", "City", "", f"Street {n}", "11000", latitude, longitude,
+            geo.encode(latitude, longitude), 50.0, "EUR", 0.0, 0.0, 0.0, rooms, rooms + random.randint(0, 2),
+            45.0, random.randint(0, 15), *flags, mask, n, True, now, now, owner,
+        )
+
+
+def random_filter() -> tuple[int, int]:
+    required = sum(1 << bit for bit in random.sample(range(len(AMENITIES)), random.randint(1, 3)))
+    return required, random.randint(1, 3)
+
+
+def bool_where(required: int) -> str:
+    return " AND ".join(name for bit, name in enumerate(AMENITIES) if required >> bit & 1)
+
+
+def summarize(latencies: list[float]) -> str:
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    return f"p50={statistics.median(latencies) * 1000:8.2f}ms p99={p99 * 1000:8.2f}ms"
+
+
+async def group_by_counts(conn, required: int, min_rooms: int) -> None:
+    where = f"is_active AND {bool_where(required)} AND num_rooms >= :min_rooms"
+    for facet in (*AMENITIES, "num_rooms", "num_beds"):
+        await conn.execute(text(f"SELECT {facet}, count(*) FROM bench_apartments WHERE {where} GROUP BY {facet}"),
+                           {"min_rooms": min_rooms})
+
+
+async def main(rows: int, queries: int) -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("DROP TABLE IF EXISTS bench_apartments"))
+        await conn.execute(text("CREATE TABLE bench_apartments (LIKE apartments INCLUDING DEFAULTS INCLUDING IDENTITY)"))
+        await conn.commit()
+
+        data = list(make_rows(rows))
+        raw = (await conn.get_raw_connection()).driver_connection
+        for start in range(0, len(data), 100_000):
+            await raw.copy_records_to_table("bench_apartments", records=data[start:start + 100_000], columns=COLUMNS)
+        await conn.execute(text("ANALYZE bench_apartments"))
+        await conn.commit()
+
+        build_start = time.perf_counter()
+        bitmaps = FacetBitmaps.build((row[26], row[25], row[16], row[17], row[19]) for row in data)
+        build_seconds = time.perf_counter() - build_start
+        del data
+
+        filters = [random_filter() for _ in range(queries)]
+
+        sql_counts, bitmap_counts, scan_pages, index_pages = [], [], [], []
+        for required, min_rooms in filters:
+            start = time.perf_counter()
+            await group_by_counts(conn, required, min_rooms)
+            sql_counts.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            bitmaps.counts(bitmaps.match(required, min_rooms=min_rooms))
+            bitmap_counts.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await conn.execute(text(
+                f"SELECT * FROM bench_apartments WHERE is_active AND {bool_where(required)} "
+                "AND num_rooms >= :min_rooms ORDER BY uid LIMIT 50"
+            ), {"min_rooms": min_rooms})
+            scan_pages.append(time.perf_counter() - start)
+
+        await conn.execute(text("CREATE INDEX ON bench_apartments (amenity_mask, num_rooms)"))
+        await conn.execute(text("ANALYZE bench_apartments"))
+        await conn.commit()
+
+        for required, min_rooms in filters:
+            start = time.perf_counter()
+            await conn.execute(text(
+                "SELECT * FROM bench_apartments WHERE is_active AND amenity_mask = ANY(:masks) "
+                "AND num_rooms >= :min_rooms ORDER BY uid LIMIT 50"
+            ), {"masks": supersets(required), "min_rooms": min_rooms})
+            index_pages.append(time.perf_counter() - start)
+
+        await conn.execute(text("DROP TABLE bench_apartments"))
+        await conn.commit()
+
+    print(f"bitmap build for {rows} rows: {build_seconds:.2f}s")
+    print(f"facet counts  GROUP BY x7 {summarize(sql_counts)} | bitmaps {summarize(bitmap_counts)}")
+    print(f"filter page   bool scan   {summarize(scan_pages)} | amenity_mask index {summarize(index_pages)}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=100)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows, args.queries))
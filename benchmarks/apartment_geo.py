@@ -0,0 +1,140 @@
+"""
+Radius search latency on 1M apartments, without a spatial index (lat/lon
+bounding box scan) and with the geohash index from migration 9b4d2f7a1c63.
+Both variants rank by exact haversine distance. Viewport search uses the same
+geohash + box filter, so it scales the same way.
+
+Rows are clustered around a handful of European cities and copied into a
+scratch table (bench_apartments, a copy of the apartments schema), so the
+real apartments table is not touched.
+
+    python -m benchmarks.apartment_geo --rows 1000000 --queries 200
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import text
+
+from src.apartment import geo
+from src.db.main import engine
+
+CITIES = [(44.787, 20.457), (45.267, 19.833), (43.321, 21.896), (48.208, 16.373), (47.497, 19.040), (52.520, 13.405)]
+
+COLUMNS = [
+    "uid", "title", "description", "country", "city", "state", "address", "zip_code", "latitude", "longitude",
+    "geohash", "price", "currency", "discount_percentage", "cleaning_fee", "deposit_amount", "num_rooms",
+    "num_beds", "square_meters", "floor", "has_elevator", "has_wifi", "has_air_conditioning", "has_parking",
+    "pet_friendly", "is_active", "created_at", "updated_at", "owner_id",
+]
+
+HAVERSINE = """
+2 * 6371.0088 * asin(sqrt(least(
+    power(sin(radians(latitude - :lat) / 2), 2)
+    + cos(radians(:lat)) * cos(radians(latitude)) * power(sin(radians(longitude - :lon) / 2), 2), 1)))
+"""
+
+
+def make_rows(count: int):
+    now = datetime.now()
+    owner = uuid.uuid4()
+    for n in range(count):
+        city_lat, city_lon = random.choice(CITIES)
+        latitude = random.gauss(city_lat, 0.08)
+        longitude = random.gauss(city_lon, 0.12)
+        yield (
+            uuid.uuid4(), f"Apartment {n}", "", "RS", "City", "", f"Street {n}", "11000", latitude, longitude,
+            geo.encode(latitude, longitude), 50.0, "EUR", 0.0, 0.0, 0.0, 2, 2, 45.0, 1,
+            False, True, False, False, False, True, now, now, owner,
+        )
+
+
+def radius_query(latitude: float, longitude: float, radius_km: float, use_geohash: bool):
+    south, west, north, east = geo.radius_bbox(latitude, longitude, radius_km)
+    params = {"lat": latitude, "lon": longitude, "south": south, "north": north, "west": west, "east": east, "r": radius_km}
+
+    cells = ""
+    if use_geohash:
+        ranges = geo.cover_ranges(south, west, north, east)
+        cells = " OR ".join(f"(geohash >= :low{i} AND geohash < :high{i})" for i in range(len(ranges)))
+        cells = f"({cells}) AND "
+        for i, (low, high) in enumerate(ranges):
+            params[f"low{i}"] = low
+            params[f"high{i}"] = high
+
+    query = f"""
+        SELECT uid, {HAVERSINE} AS distance_km FROM bench_apartments
+        WHERE is_active AND {cells}latitude BETWEEN :south AND :north AND longitude BETWEEN :west AND :east
+          AND {HAVERSINE} <= :r
+        ORDER BY distance_km LIMIT 50
+    """
+    return text(query), params
+
+
+async def measure(conn, queries: int, radius_km: float, use_geohash: bool) -> tuple[float, float]:
+    latencies = []
+    for _ in range(queries):
+        city_lat, city_lon = random.choice(CITIES)
+        statement, params = radius_query(random.gauss(city_lat, 0.05), random.gauss(city_lon, 0.08), radius_km, use_geohash)
+        start = time.perf_counter()
+        await conn.execute(statement, params)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+async def seed(conn, rows: int) -> None:
+    await conn.execute(text("DROP TABLE IF EXISTS bench_apartments"))
+    await conn.execute(text("CREATE TABLE bench_apartments (LIKE apartments INCLUDING DEFAULTS INCLUDING IDENTITY)"))
+    await conn.commit()
+
+    raw = (await conn.get_raw_connection()).driver_connection
+    batch = []
+    for row in make_rows(rows):
+        batch.append(row)
+        if len(batch) == 100_000:
+            await raw.copy_records_to_table("bench_apartments", records=batch, columns=COLUMNS)
+            batch = []
+    if batch:
+        await raw.copy_records_to_table("bench_apartments", records=batch, columns=COLUMNS)
+
+    await conn.execute(text("ANALYZE bench_apartments"))
+    await conn.commit()
+
+
+async def main(rows: int, queries: int, radii: list[float]) -> None:
+    async with engine.connect() as conn:
+        await seed(conn, rows)
+
+        before = {radius: await measure(conn, queries, radius, use_geohash=False) for radius in radii}
+
+        await conn.execute(text("CREATE INDEX ON bench_apartments (geohash)"))
+        await conn.execute(text("ANALYZE bench_apartments"))
+        await conn.commit()
+
+        after = {radius: await measure(conn, queries, radius, use_geohash=True) for radius in radii}
+
+        await conn.execute(text("DROP TABLE bench_apartments"))
+        await conn.commit()
+
+    for radius in radii:
+        print(
+            f"radius {radius:5.1f}km bbox scan p50={before[radius][0] * 1000:8.2f}ms p99={before[radius][1] * 1000:8.2f}ms | "
+            f"geohash p50={after[radius][0] * 1000:6.2f}ms p99={after[radius][1] * 1000:6.2f}ms"
+        )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--radius", type=float, action="append", help="km, can be repeated (default 1, 5, 20)")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows, args.queries, args.radius or [1.0, 5.0, 20.0]))
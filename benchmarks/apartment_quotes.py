@@ -0,0 +1,97 @@
+"""
+Stay quotes for a batch of apartments: a naive per-row loop (rate lookup and
+arithmetic per apartment, the way a method on Apartment would do it) against
+src.apartment.pricing.quote_rows, one NumPy pass over the column arrays.
+Both take the same rows the /apartments/quotes endpoint reads from the
+database, so the time includes building the response items.
+
+    python -m benchmarks.apartment_quotes --rows 500 --rows 10000 --repeat 200
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+
+from src.apartment.pricing import quote_rows
+from src.config import Config
+
+
+def make_rows(count: int) -> list[tuple]:
+    currencies = list(Config.APARTMENT_CURRENCY_RATES)
+    return [
+        (
+            uuid.uuid4(),
+            random.uniform(20, 300),
+            random.choice((0.0, 0.0, 5.0, 10.0, 15.0)),
+            random.uniform(0, 40),
+            random.uniform(0, 500),
+            random.choice(currencies),
+        )
+        for _ in range(count)
+    ]
+
+
+def naive_quotes(rows: list[tuple], nights: int, target_currency: str) -> tuple[list[dict], list]:
+    rates = Config.APARTMENT_CURRENCY_RATES
+    items, unavailable = [], []
+    for uid, price, discount_percentage, cleaning_fee, deposit_amount, currency in rows:
+        if currency not in rates:
+            unavailable.append(uid)
+            continue
+        rate = rates[currency] / rates[target_currency]
+        nightly = price * rate
+        subtotal = nightly * nights
+        discount = subtotal * discount_percentage / 100.0
+        cleaning = cleaning_fee * rate
+        items.append({
+            "apartment_uid": uid,
+            "nightly": round(nightly, 2),
+            "subtotal": round(subtotal, 2),
+            "discount": round(discount, 2),
+            "cleaning_fee": round(cleaning, 2),
+            "total": round(subtotal - discount + cleaning, 2),
+            "deposit": round(deposit_amount * rate, 2),
+        })
+    return items, unavailable
+
+
+def measure(function, rows: list[tuple], repeat: int) -> tuple[float, float]:
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(rows, 7, "RSD")
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main(sizes: list[int], repeat: int) -> None:
+    # prvi poziv ucitava tabelu kurseva
+    quote_rows(make_rows(1), 1, "EUR")
+
+    for size in sizes:
+        rows = make_rows(size)
+
+        naive_items, _ = naive_quotes(rows, 7, "RSD")
+        vector_items, _ = quote_rows(rows, 7, "RSD")
+        mismatches = sum(
+            abs(a["total"] - b["total"]) > 0.011 for a, b in zip(naive_items, vector_items)
+        )
+
+        naive = measure(naive_quotes, rows, repeat)
+        vector = measure(quote_rows, rows, repeat)
+        print(
+            f"{size:6d} rows  loop p50={naive[0] * 1000:7.3f}ms p99={naive[1] * 1000:7.3f}ms | "
+            f"numpy p50={vector[0] * 1000:7.3f}ms p99={vector[1] * 1000:7.3f}ms | "
+            f"{naive[0] / vector[0]:4.1f}x, {mismatches} totals differ"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, action="append", help="batch size, can be repeated (default 500, 10000)")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    main(args.rows or [500, 10_000], args.repeat)
@@ -0,0 +1,201 @@
+"""
+Text search relevance and latency on a seeded corpus of apartment listings:
+
+  ILIKE       every query word as '%word%' over title/description/city/address,
+              no ranking (what a quick implementation would do)
+  tsvector    the /apartments/search query from src/apartment/service.py,
+              first with a sequential scan, then with the GIN indexes from
+              migration e2a7c9f4b816
+
+Queries are a city plus one or two features ("sea view balcony Split"), a
+third of them with a typo in the city. A listing is relevant if it is in that
+city and has all the features. Relevance is precision@10, recall@10 (out of
+min(10, relevant)) and MRR, split by clean and misspelled queries.
+
+Rows are copied into a scratch table (bench_apartments, a copy of the
+apartments schema including the generated search_vector), so the real
+apartments table is not touched.
+
+    python -m benchmarks.apartment_text_search --rows 200000 --queries 200
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import MetaData, func, select, text
+
+from src.apartment import geo
+from src.apartment.model import Apartment
+from src.apartment.service import query_terms, text_match
+from src.config import Config
+from src.db.main import engine
+
+COLUMNS = [
+    "uid", "title", "description", "country", "city", "state", "address", "zip_code", "latitude", "longitude",
+    "geohash", "price", "currency", "discount_percentage", "cleaning_fee", "deposit_amount", "num_rooms",
+    "num_beds", "square_meters", "floor", "has_elevator", "has_wifi", "has_air_conditioning", "has_parking",
+    "pet_friendly", "amenity_mask", "facet_id", "is_active", "created_at", "updated_at", "owner_id",
+]
+
+CITIES = ["Split", "Zagreb", "Dubrovnik", "Beograd", "Novi Sad", "Budva", "Kotor", "Zadar", "Rovinj", "Ljubljana"]
+FEATURES = [
+    "sea view", "balcony", "terrace", "garden", "pool", "old town", "beach", "quiet", "jacuzzi", "sauna",
+    "loft", "penthouse", "fireplace", "rooftop",
+]
+FILLER = [
+    "bright", "cozy", "modern", "spacious", "renovated", "central", "kitchen", "bedroom", "family", "near",
+    "shops", "restaurants", "walk", "minutes", "equipped", "comfortable", "stylish", "new",
+]
+STREETS = ["Marmontova", "Obala", "Riva", "Knez Mihailova", "Ilica", "Stradun", "Zmaj Jovina", "Trg", "Put", "Ulica"]
+
+
+def make_rows(count: int):
+    now = datetime.now()
+    owner = uuid.uuid4()
+    for n in range(count):
+        city = random.choice(CITIES)
+        features = random.sample(FEATURES, random.randint(1, 4))
+        # deo osobina u naslovu, ostalo u opisu medju obicnim recima
+        split = random.randint(0, len(features))
+        title = " ".join([random.choice(FILLER), *features[:split], "apartment"])
+        words = random.choices(FILLER, k=random.randint(15, 40)) + features[split:]
+        random.shuffle(words)
+        yield (
+            uuid.uuid4(), title, " ".join(words), "HR", city, "", f"{random.choice(STREETS)} {random.randint(1, 200)}",
+            "21000", 43.5, 16.4, geo.encode(43.5, 16.4), 50.0, "EUR", 0.0, 0.0, 0.0, 2, 2, 45.0, 1,
+            False, True, False, False, False, 2, n, True, now, now, owner,
+        ), city, set(features)
+
+
+def misspell(word: str) -> str:
+    # izbacuje jedno slovo iz sredine, "Split" -> "Splt"
+    position = random.randint(1, len(word) - 2)
+    return word[:position] + word[position + 1:]
+
+
+def make_queries(count: int, listings: dict) -> list[tuple[str, set, bool]]:
+    by_feature: dict[tuple[str, str], set] = {}
+    for uid, (city, features) in listings.items():
+        for feature in features:
+            by_feature.setdefault((city, feature), set()).add(uid)
+
+    queries = []
+    while len(queries) < count:
+        city = random.choice(CITIES)
+        features = random.sample(FEATURES, random.randint(1, 2))
+        relevant = set.intersection(*(by_feature.get((city, feature), set()) for feature in features))
+        if not relevant:
+            continue
+        typo = random.random() < 1 / 3
+        queries.append((" ".join([*features, misspell(city) if typo else city]), relevant, typo))
+    return queries
+
+
+def ilike_query(query: str):
+    haystack = "title || ' ' || description || ' ' || city || ' ' || address"
+    words = query.split()
+    where = " AND ".join(f"{haystack} ILIKE :w{i}" for i in range(len(words)))
+    params = {f"w{i}": f"%{word}%" for i, word in enumerate(words)}
+    return text(f"SELECT uid FROM bench_apartments WHERE is_active AND {where} LIMIT 10"), params
+
+
+def search_query(table, query: str):
+    matches, score = text_match(query, query_terms(query), table)
+    score = score.label("score")
+    return select(table.c.uid, score).where(table.c.is_active, matches).order_by(score.desc(), table.c.uid).limit(10)
+
+
+def relevance(results: list[list], queries: list[tuple[str, set, bool]], typo: bool) -> str:
+    precision, recall, reciprocal = [], [], []
+    for uids, (_, relevant, is_typo) in zip(results, queries):
+        if is_typo != typo:
+            continue
+        hits = [uid in relevant for uid in uids]
+        precision.append(sum(hits) / 10)
+        recall.append(sum(hits) / min(10, len(relevant)))
+        reciprocal.append(1 / (hits.index(True) + 1) if True in hits else 0.0)
+    if not precision:
+        return "no queries"
+    return (
+        f"P@10={statistics.mean(precision):.2f} R@10={statistics.mean(recall):.2f} "
+        f"MRR={statistics.mean(reciprocal):.2f}"
+    )
+
+
+def summarize(latencies: list[float]) -> str:
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    return f"p50={statistics.median(latencies) * 1000:8.2f}ms p99={p99 * 1000:8.2f}ms"
+
+
+async def run(conn, statements) -> tuple[list[list], list[float]]:
+    results, latencies = [], []
+    for statement, params in statements:
+        start = time.perf_counter()
+        rows = (await conn.execute(statement, params)).all()
+        latencies.append(time.perf_counter() - start)
+        results.append([row[0] for row in rows])
+    return results, latencies
+
+
+async def main(rows: int, queries: int) -> None:
+    bench = Apartment.__table__.to_metadata(MetaData(), name="bench_apartments")
+
+    async with engine.connect() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.execute(text("DROP TABLE IF EXISTS bench_apartments"))
+        await conn.execute(text(
+            "CREATE TABLE bench_apartments (LIKE apartments INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING GENERATED)"
+        ))
+        await conn.commit()
+
+        data, listings = [], {}
+        for row, city, features in make_rows(rows):
+            data.append(row)
+            listings[row[0]] = (city, features)
+
+        raw = (await conn.get_raw_connection()).driver_connection
+        for start in range(0, len(data), 50_000):
+            await raw.copy_records_to_table("bench_apartments", records=data[start:start + 50_000], columns=COLUMNS)
+        await conn.execute(text("ANALYZE bench_apartments"))
+        await conn.execute(select(func.set_config(
+            "pg_trgm.word_similarity_threshold", str(Config.APARTMENT_TEXT_SEARCH_SIMILARITY), False,
+        )))
+        await conn.commit()
+        del data
+
+        workload = make_queries(queries, listings)
+
+        ilike_results, ilike_latencies = await run(conn, (ilike_query(query) for query, _, _ in workload))
+        scan_results, scan_latencies = await run(conn, ((search_query(bench, query), {}) for query, _, _ in workload))
+
+        await conn.execute(text("CREATE INDEX ON bench_apartments USING gin (search_vector)"))
+        await conn.execute(text("CREATE INDEX ON bench_apartments USING gin (city gin_trgm_ops)"))
+        await conn.execute(text("CREATE INDEX ON bench_apartments USING gin (address gin_trgm_ops)"))
+        await conn.execute(text("ANALYZE bench_apartments"))
+        await conn.commit()
+
+        _, index_latencies = await run(conn, ((search_query(bench, query), {}) for query, _, _ in workload))
+
+        await conn.execute(text("DROP TABLE bench_apartments"))
+        await conn.commit()
+
+    for name, results in (("ILIKE", ilike_results), ("tsvector", scan_results)):
+        print(f"{name:9s} clean {relevance(results, workload, False)} | typo {relevance(results, workload, True)}")
+    print(f"latency   ILIKE scan {summarize(ilike_latencies)}")
+    print(f"          tsvector scan {summarize(scan_latencies)} | GIN + trigram {summarize(index_latencies)}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows, args.queries))
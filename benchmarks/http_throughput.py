@@ -0,0 +1,53 @@
+"""
+HTTP load generator: fixed concurrency against one URL for a fixed time,
+reports requests per second and latency percentiles.
+
+    python -m benchmarks.http_throughput http://127.0.0.1:8000/api/v1/books/all --concurrency 64 --duration 30
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+
+async def main(url: str, concurrency: int, duration: float) -> None:
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+
+        async def user():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code >= 500:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p = lambda pct: latencies[min(len(latencies) - 1, int(len(latencies) * pct))] * 1000
+    print(
+        f"requests={len(latencies)} errors={errors} rps={len(latencies) / elapsed:,.0f} "
+        f"p50={p(0.50):.1f}ms p99={p(0.99):.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("url")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=30)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.url, args.concurrency, args.duration))
@@ -0,0 +1,62 @@
+"""
+Startup regression benchmark: imports the app in a fresh interpreter with
+-X importtime and reports the total and the slowest modules. Exits with 1
+when the total exceeds --budget-ms, so it can run in CI.
+
+    python -m benchmarks.import_time --top 15 --budget-ms 1500
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+
+def profile(module: str) -> list[tuple[int, int, str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    rows = []
+    for line in result.stderr.splitlines():
+        # "import time:      self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def main(module: str, top: int, budget_ms: float | None, as_json: bool) -> int:
+    rows = profile(module)
+    total_ms = next(cumulative for _, cumulative, name in rows if name.strip() == module) / 1000
+    slowest = sorted(rows, key=lambda row: row[0], reverse=True)[:top]
+
+    if as_json:
+        print(json.dumps({
+            "module": module,
+            "total_ms": total_ms,
+            "slowest": [{"module": name.strip(), "self_ms": s / 1000, "cumulative_ms": c / 1000} for s, c, name in slowest],
+        }, indent=2))
+    else:
+        print(f"import {module}: {total_ms:.1f} ms")
+        for self_us, cumulative_us, name in slowest:
+            print(f"  {self_us / 1000:8.1f} ms self {cumulative_us / 1000:8.1f} ms cumulative  {name.strip()}")
+
+    if budget_ms is not None and total_ms > budget_ms:
+        print(f"over budget: {total_ms:.1f} ms > {budget_ms:.1f} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="src")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    sys.exit(main(args.module, args.top, args.budget_ms, args.json))
@@ -0,0 +1,86 @@
+"""
+Login limiter load test: stari sinhroni redis.Redis klijent naspram deljenog
+redis.asyncio pool-a iz src/db/redis.py.
+
+Svaki "login" radi proveru blokade i upis neuspelog pokusaja, isto kao
+/login kada lozinka nije dobra (async: jedna Lua skripta za oba). Meri se latencija svakog login-a pod
+konkurentnim opterecenjem i ispisuje p50/p99.
+
+Pokretanje (potreban je redis na REDIS_HOST:REDIS_PORT):
+    python -m benchmarks.login_limiter --requests 5000 --concurrency 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import redis as sync_redis
+
+from src.config import Config
+from src.db import redis as async_limiter
+from src.auth.service import BLOCK_DURATION_SECONDS, MAX_FAILED_ATTEMPTS
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    samples = sorted(samples)
+    index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+    return samples[index]
+
+
+def report(name: str, latencies: list[float], elapsed: float) -> None:
+    print(
+        f"{name:<8} requests={len(latencies)} "
+        f"rps={len(latencies) / elapsed:,.0f} "
+        f"p50={percentile(latencies, 50) * 1000:.2f}ms "
+        f"p99={percentile(latencies, 99) * 1000:.2f}ms "
+        f"mean={statistics.mean(latencies) * 1000:.2f}ms"
+    )
+
+
+async def run(login, requests: int, concurrency: int) -> tuple[list[float], float]:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await login(f"bench-{i % 1000}@example.com")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies, time.perf_counter() - start
+
+
+async def main(requests: int, concurrency: int) -> None:
+    r = sync_redis.Redis(host=Config.REDIS_HOST, port=Config.REDIS_PORT, db=0, decode_responses=True)
+
+    # stara implementacija: blokirajuci pozivi direktno iz korutine
+    async def sync_login(email: str):
+        if int(r.get(email) or 0) >= MAX_FAILED_ATTEMPTS:
+            return
+        r.incr(email)
+        r.expire(email, BLOCK_DURATION_SECONDS)
+
+    async def async_login(email: str):
+        await async_limiter.register_login_attempt(email, BLOCK_DURATION_SECONDS, MAX_FAILED_ATTEMPTS)
+
+    keys = [f"bench-{i}@example.com" for i in range(1000)]
+
+    r.delete(*keys)
+    report("sync", *await run(sync_login, requests, concurrency))
+
+    r.delete(*keys)
+    report("async", *await run(async_login, requests, concurrency))
+
+    r.delete(*keys)
+    await async_limiter.close_redis()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.concurrency))
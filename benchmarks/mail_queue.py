@@ -0,0 +1,67 @@
+"""
+Outbound mail throughput through the Redis queue and MailWorker, delivered
+to a local aiosmtpd server instead of a real relay.
+
+    python -m benchmarks.mail_queue --messages 2000 --connections 4
+"""
+import argparse
+import asyncio
+import time
+
+from aiosmtpd.controller import Controller
+
+from src.db.redis import get_redis
+from src.mail_queue import enqueue_mail, MAIL_STREAM, MAIL_DELAYED, MAIL_DEAD
+from src.mail_worker import MailWorker
+
+
+class CountingHandler:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 Message accepted for delivery"
+
+
+async def main(messages: int, connections: int, batch_size: int, port: int) -> None:
+    handler = CountingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+
+    await get_redis().delete(MAIL_STREAM, MAIL_DELAYED, MAIL_DEAD)
+    for i in range(messages):
+        await enqueue_mail([f"user{i}@example.com"], "Benchmark", "<p>benchmark</p>")
+
+    worker = MailWorker(
+        connections=connections,
+        batch_size=batch_size,
+        hostname="127.0.0.1",
+        port=port,
+        use_tls=False,
+        start_tls=False,
+    )
+
+    start = time.perf_counter()
+    task = asyncio.create_task(worker.run())
+    while handler.received < messages:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    worker.stop()
+    await task
+    controller.stop()
+    await get_redis().delete(MAIL_STREAM, MAIL_DELAYED, MAIL_DEAD)
+
+    print(f"connections={connections} batch={batch_size} messages={messages} msg/s={messages / elapsed:,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.messages, args.connections, args.batch_size, args.port))
@@ -0,0 +1,50 @@
+"""
+Per-message cost of rendering the verification mail: the old Starlette
+TemplateResponse path against the shared precompiled Jinja2 environment in
+src/mail_templates.py.
+
+    python -m benchmarks.mail_rendering --iterations 5000
+"""
+import argparse
+import asyncio
+import time
+
+from starlette.templating import Jinja2Templates
+
+from src.mail_templates import precompile, render_mail
+
+LINK = "http://localhost:8000/api/v1/auth/verify/token"
+
+
+def template_response(templates: Jinja2Templates) -> str:
+    return templates.TemplateResponse(
+        "verify_account_mail.html",
+        {"request": None, "link": LINK}
+    ).body.decode("utf-8")
+
+
+async def main(iterations: int) -> None:
+    templates = Jinja2Templates(directory="src/templates")
+    template_response(templates)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        template_response(templates)
+    old = (time.perf_counter() - start) / iterations
+
+    precompile()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await render_mail("verify_account_mail.html", link=LINK)
+    new = (time.perf_counter() - start) / iterations
+
+    print(f"TemplateResponse  {old * 1e6:8.1f} us/message")
+    print(f"render_mail       {new * 1e6:8.1f} us/message")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.iterations))
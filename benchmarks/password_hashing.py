@@ -0,0 +1,52 @@
+"""
+Login throughput with bcrypt on the PasswordHasher pool, for 1..N workers.
+
+Each "login" is one password_hasher.verify call, the expensive part of
+/login. With the work off the event loop, throughput should scale with the
+number of workers up to the number of cores.
+
+    python -m benchmarks.password_hashing --logins 200 --executor thread
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from src.auth.utils import PasswordHasher, generate_password_hash
+
+
+async def measure(executor: str, workers: int, logins: int, hashed: str) -> float:
+    hasher = PasswordHasher(executor=executor, workers=workers, max_queue=logins)
+    try:
+        # zagrevanje pool-a da start procesa/niti ne ulazi u merenje
+        await asyncio.gather(*(hasher.verify("Password1!", hashed) for _ in range(workers)))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(hasher.verify("Password1!", hashed) for _ in range(logins)))
+        return logins / (time.perf_counter() - start)
+    finally:
+        hasher.shutdown()
+
+
+async def main(executor: str, logins: int) -> None:
+    hashed = generate_password_hash("Password1!")
+    cores = os.cpu_count() or 1
+
+    workers = 1
+    baseline = None
+    while True:
+        rate = await measure(executor, workers, logins, hashed)
+        baseline = baseline or rate
+        print(f"{executor} workers={workers:<3} logins/s={rate:8.1f} speedup={rate / baseline:4.2f}x")
+        if workers >= cores:
+            break
+        workers = min(workers * 2, cores)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.executor, args.logins))
@@ -0,0 +1,102 @@
+"""
+Serialization cost of a 10k-row page of books and users, no database:
+
+  fastapi default   build the page model, FastAPI's serialize_response for the
+                    response_model (validate + dump to python), json.dumps
+  orjson response   same path, rendered with ORJSONResponse
+  adapter           precompiled TypeAdapter.dump_json straight from the ORM rows
+
+    python -m benchmarks.serialization --rows 10000 --repeat 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime
+from typing import Callable
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import TypeAdapter
+
+from src.auth.model import GenderEnum, User
+from src.auth.serializers import UserPage, user_page_adapter
+from src.books.model import Book as BookRow
+from src.books.serializers import BookPage, book_page_adapter
+
+
+def make_books(rows: int) -> list[BookRow]:
+    now = datetime.now()
+    return [
+        BookRow(
+            uid=uuid.uuid4(), id=n, title=f"Book {n}", author="Author", publisher="Publisher",
+            published_date="2001-01-01", page_count=300, language="sr", created_at=now, update_at=now,
+        )
+        for n in range(rows)
+    ]
+
+
+def make_users(rows: int) -> list[User]:
+    return [
+        User(
+            username=f"user{n}", password_hash="x" * 60, email=f"user{n}@example.com",
+            first_name="First", last_name="Last", UCIN=str(n).zfill(13), date_of_birth="2000-01-01",
+            gender=GenderEnum.male,
+        )
+        for n in range(rows)
+    ]
+
+
+def fastapi_default(page_type, response_class) -> Callable:
+    # ruta vraca page model, FastAPI ga proverava i serijalizuje kroz response_model
+    field = create_model_field(name="response", type_=page_type, mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    def render(rows):
+        page = page_type(items=rows, next_cursor=None)
+        content = loop.run_until_complete(serialize_response(field=field, response_content=page))
+        return response_class(content).body
+
+    return render
+
+
+def precompiled(adapter: TypeAdapter) -> Callable:
+    return lambda rows: adapter.dump_json({"items": rows, "next_cursor": None})
+
+
+def measure(render: Callable, rows: list, repeat: int) -> float:
+    render(rows)  # zagrevanje
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(rows)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main(rows: int, repeat: int) -> None:
+    cases = [
+        ("books", make_books(rows), BookPage, book_page_adapter),
+        ("users", make_users(rows), UserPage, user_page_adapter),
+    ]
+
+    for name, data, page_type, adapter in cases:
+        results = {
+            "fastapi default": measure(fastapi_default(page_type, JSONResponse), data, repeat),
+            "orjson response": measure(fastapi_default(page_type, ORJSONResponse), data, repeat),
+            "adapter": measure(precompiled(adapter), data, repeat),
+        }
+        baseline = results["fastapi default"]
+        for variant, seconds in results.items():
+            print(f"{name:<6} {variant:<16} {seconds * 1000:8.2f}ms  x{baseline / seconds:5.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    main(args.rows, args.repeat)
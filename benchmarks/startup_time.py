@@ -0,0 +1,52 @@
+"""
+Worker startup cost of init_db: create_all (old behaviour, now DB_CREATE_ALL)
+against the alembic_version check. Every run disposes the pool first, so each
+one pays for a fresh connection like a newly booted worker does. --workers
+boots that many workers at once to show how create_all behaves under a
+simultaneous restart.
+
+    python -m benchmarks.startup_time --runs 20 --workers 8
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from src.config import Config
+from src.db.main import engine, init_db
+
+
+async def boot(workers: int) -> float:
+    await engine.dispose()
+    start = time.perf_counter()
+    await asyncio.gather(*(init_db() for _ in range(workers)))
+    return time.perf_counter() - start
+
+
+async def measure(create_all: bool, runs: int, workers: int) -> list[float]:
+    Config.DB_CREATE_ALL = create_all
+    # mereni su upiti, ne ishod provere
+    Config.DB_SCHEMA_CHECK = "warn"
+
+    await boot(workers)  # zagrevanje (import alembic-a, citanje migracija)
+    return sorted([await boot(workers) for _ in range(runs)])
+
+
+async def main(runs: int, workers: int) -> None:
+    for name, create_all in [("create_all", True), ("version check", False)]:
+        timings = await measure(create_all, runs, workers)
+        print(
+            f"{name:<14} p50={statistics.median(timings) * 1000:8.2f}ms "
+            f"max={timings[-1] * 1000:8.2f}ms ({workers} workers, {runs} runs)"
+        )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.runs, args.workers))
@@ -0,0 +1,90 @@
+"""
+Login and signup lookup latency on a 1M-row users table, without and with
+the indexes from migration 7c3e1a9d5b20.
+
+Rows are seeded into a scratch table (bench_users, a copy of the users
+schema) with generate_series, so the real users table is not touched.
+
+    python -m benchmarks.user_indexes --rows 1000000 --lookups 200
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+
+from src.db.main import engine
+
+SEED = """
+INSERT INTO bench_users (uid, username, password_hash, email, first_name, last_name,
+                         "UCIN", date_of_birth, gender, is_verified, role, enabled_2fa,
+                         created_at, updated_at)
+SELECT gen_random_uuid(), 'user' || n, 'x', 'user' || n || '@example.com', 'First', 'Last',
+       lpad(n::text, 13, '0'), '2000-01-01', 'male', true, 'clan', false, now(), now()
+FROM generate_series(1, :rows) AS n
+"""
+
+INDEXES = [
+    'CREATE UNIQUE INDEX ON bench_users (email)',
+    'CREATE UNIQUE INDEX ON bench_users (username)',
+    'CREATE UNIQUE INDEX ON bench_users ("UCIN")',
+    'CREATE INDEX ON bench_users (lower(email))',
+]
+
+LOGIN = "SELECT * FROM bench_users WHERE email = :email"
+SIGNUP = 'SELECT uid FROM bench_users WHERE lower(email) = :email OR username = :username OR "UCIN" = :ucin LIMIT 1'
+
+
+async def measure(conn, rows: int, lookups: int) -> dict:
+    results = {}
+    for name, query in [("login", LOGIN), ("signup", SIGNUP)]:
+        latencies = []
+        for _ in range(lookups):
+            n = random.randint(1, rows)
+            params = {"email": f"user{n}@example.com", "username": f"user{n}", "ucin": str(n).zfill(13)}
+            start = time.perf_counter()
+            await conn.execute(text(query), params)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        results[name] = (statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1])
+    return results
+
+
+async def main(rows: int, lookups: int) -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("DROP TABLE IF EXISTS bench_users"))
+        await conn.execute(text("CREATE TABLE bench_users (LIKE users INCLUDING DEFAULTS)"))
+        await conn.execute(text(SEED), {"rows": rows})
+        await conn.execute(text("ANALYZE bench_users"))
+        await conn.commit()
+
+        before = await measure(conn, rows, lookups)
+
+        for statement in INDEXES:
+            await conn.execute(text(statement))
+        await conn.execute(text("ANALYZE bench_users"))
+        await conn.commit()
+
+        after = await measure(conn, rows, lookups)
+
+        await conn.execute(text("DROP TABLE bench_users"))
+        await conn.commit()
+
+    for name in ("login", "signup"):
+        print(
+            f"{name:<7} no index p50={before[name][0] * 1000:8.2f}ms p99={before[name][1] * 1000:8.2f}ms | "
+            f"indexed p50={after[name][0] * 1000:6.2f}ms p99={after[name][1] * 1000:6.2f}ms"
+        )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows, args.lookups))
@@ -0,0 +1,71 @@
+"""
+Production server launcher.
+
+Starts src:app under uvicorn with uvloop and httptools, one worker process
+per CPU core by default. Every option can be set from the command line or
+from the environment (WEB_CONCURRENCY, PORT, ...).
+
+    python main.py
+    python main.py --workers 8 --port 8000 --preload
+
+On SIGTERM uvicorn stops accepting connections and waits up to
+--graceful-timeout seconds for in-flight requests to finish. Outbound mail
+is already in the Redis queue by the time a request returns, so nothing is
+lost when a worker exits.
+
+uvicorn spawns its workers rather than forking them, so --preload cannot
+share memory with the workers. Instead it imports the app once in the
+master first, so a broken build fails immediately instead of every worker
+crash-looping.
+"""
+import argparse
+import os
+
+import uvicorn
+
+
+def env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the Template FastAPI app in production mode")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=env_int("PORT", 8000))
+    parser.add_argument("--workers", type=int, default=env_int("WEB_CONCURRENCY", os.cpu_count() or 1))
+    parser.add_argument("--backlog", type=int, default=env_int("BACKLOG", 2048))
+    parser.add_argument("--keep-alive", type=int, default=env_int("KEEP_ALIVE", 5))
+    parser.add_argument("--graceful-timeout", type=int, default=env_int("GRACEFUL_TIMEOUT", 30))
+    parser.add_argument("--limit-concurrency", type=int, default=env_int("LIMIT_CONCURRENCY", 0) or None)
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    parser.add_argument("--no-access-log", action="store_true", default=os.getenv("ACCESS_LOG", "1") == "0")
+    parser.add_argument("--preload", action="store_true", default=os.getenv("PRELOAD", "0") == "1")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    if args.preload:
+        import src  # noqa: F401
+
+    uvicorn.run(
+        "src:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop="uvloop",
+        http="httptools",
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        limit_concurrency=args.limit_concurrency,
+        log_level=args.log_level,
+        access_log=not args.no_access_log,
+        proxy_headers=True,
+        server_header=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
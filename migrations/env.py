@@ -10,6 +10,7 @@ from alembic import context
 # =================================MODELI======================================
 from src.auth.model import User
 from src.books.model import Book
+from src.apartment.model import Apartment
 
 
 # =============================================================================
@@ -0,0 +1,103 @@
+"""apartments with geohash index
+
+Revision ID: 9b4d2f7a1c63
+Revises: 7c3e1a9d5b20
+Create Date: 2026-10-18 19:02:17.284530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+from src.apartment import geo
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4d2f7a1c63'
+down_revision: Union[str, None] = '7c3e1a9d5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def uid_is_unique(inspector) -> bool:
+    if inspector.get_pk_constraint('users')['constrained_columns'] == ['uid']:
+        return True
+    if any(c['column_names'] == ['uid'] for c in inspector.get_unique_constraints('users')):
+        return True
+    return any(i['unique'] and i['column_names'] == ['uid'] for i in inspector.get_indexes('users'))
+
+
+def backfill_geohash(bind, batch: int = 10000) -> None:
+    # geohash se racuna u Python-u (geo.encode), isti kod kao pri upisu stana
+    statement, params = "SELECT uid, latitude, longitude FROM apartments", {"batch": batch}
+    while True:
+        rows = bind.execute(sa.text(statement + " ORDER BY uid LIMIT :batch"), params).all()
+        if not rows:
+            return
+        bind.execute(
+            sa.text("UPDATE apartments SET geohash = :geohash WHERE uid = :uid"),
+            [{"uid": uid, "geohash": geo.encode(latitude, longitude)} for uid, latitude, longitude in rows],
+        )
+        statement = "SELECT uid, latitude, longitude FROM apartments WHERE uid > :last"
+        params["last"] = rows[-1].uid
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    # users ima slozeni primarni kljuc (uid, id), za foreign key na uid treba unique
+    if not uid_is_unique(inspector):
+        op.create_unique_constraint('uq_users_uid', 'users', ['uid'])
+
+    # baza napravljena sa create_all pre migracija vec ima apartments, samo bez geohash-a
+    if inspector.has_table('apartments'):
+        op.add_column('apartments', sa.Column('geohash', sa.String(length=12, collation='C'), nullable=True))
+        backfill_geohash(bind)
+        op.alter_column('apartments', 'geohash', existing_type=sa.String(length=12, collation='C'), nullable=False)
+    else:
+        op.create_table('apartments',
+        sa.Column('uid', sa.Uuid(), nullable=False),
+        sa.Column('title', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('description', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('country', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('city', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('state', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('address', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('zip_code', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('latitude', sa.Float(), nullable=False),
+        sa.Column('longitude', sa.Float(), nullable=False),
+        sa.Column('geohash', sa.String(length=12, collation='C'), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('currency', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('discount_percentage', sa.Float(), nullable=False),
+        sa.Column('cleaning_fee', sa.Float(), nullable=False),
+        sa.Column('deposit_amount', sa.Float(), nullable=False),
+        sa.Column('num_rooms', sa.Integer(), nullable=False),
+        sa.Column('num_beds', sa.Integer(), nullable=False),
+        sa.Column('square_meters', sa.Float(), nullable=False),
+        sa.Column('floor', sa.Integer(), nullable=False),
+        sa.Column('has_elevator', sa.Boolean(), nullable=False),
+        sa.Column('has_wifi', sa.Boolean(), nullable=False),
+        sa.Column('has_air_conditioning', sa.Boolean(), nullable=False),
+        sa.Column('has_parking', sa.Boolean(), nullable=False),
+        sa.Column('pet_friendly', sa.Boolean(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('owner_id', sa.Uuid(), nullable=False),
+        sa.ForeignKeyConstraint(['owner_id'], ['users.uid'], ),
+        sa.PrimaryKeyConstraint('uid')
+        )
+    op.create_index(op.f('ix_apartments_geohash'), 'apartments', ['geohash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # apartments i uq_users_uid ostaju: tabela je mozda postojala pre ove revizije (create_all) i ima podatke,
+    # a ponovni upgrade oba slucaja prepoznaje
+    op.drop_index(op.f('ix_apartments_geohash'), table_name='apartments')
+    op.drop_column('apartments', 'geohash')
@@ -0,0 +1,101 @@
+"""users table matches src/auth/model.py
+
+Revision ID: b7e3f1a9c2d4
+Revises: e2a7c9f4b816
+Create Date: 2026-10-19 09:41:06.118273
+
+"""
+from contextlib import contextmanager
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3f1a9c2d4'
+down_revision: Union[str, None] = 'e2a7c9f4b816'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+gender_enum = postgresql.ENUM('male', 'female', name='genderenum', create_type=False)
+
+
+@contextmanager
+def without_user_foreign_keys(inspector):
+    # foreign key na users.uid zavisi od unique indeksa (pkey ili uq_users_uid), skida se dok se oni menjaju
+    foreign_keys = [
+        (table, fk)
+        for table in inspector.get_table_names()
+        for fk in inspector.get_foreign_keys(table)
+        if fk['referred_table'] == 'users'
+    ]
+    for table, fk in foreign_keys:
+        op.drop_constraint(fk['name'], table, type_='foreignkey')
+    yield
+    for table, fk in foreign_keys:
+        op.create_foreign_key(fk['name'], table, 'users', fk['constrained_columns'], fk['referred_columns'])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # init migracija je napravila users sa (uid, id) kljucem i update_at, bez 2FA kolona;
+    # baza napravljena sa create_all (vidi README, alembic stamp) vec ima semu modela, pa se svaki korak proverava
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {column['name']: column for column in inspector.get_columns('users')}
+    unique_uid = [c['name'] for c in inspector.get_unique_constraints('users') if c['column_names'] == ['uid']]
+
+    if 'id' in columns or unique_uid:
+        with without_user_foreign_keys(inspector):
+            for name in unique_uid:
+                op.drop_constraint(name, 'users', type_='unique')
+            if 'id' in columns:
+                op.drop_constraint(inspector.get_pk_constraint('users')['name'], 'users', type_='primary')
+                op.drop_column('users', 'id')
+                op.create_primary_key('users_pkey', 'users', ['uid'])
+
+    if 'update_at' in columns:
+        op.alter_column('users', 'update_at', new_column_name='updated_at')
+    op.execute("UPDATE users SET created_at = coalesce(created_at, now()), updated_at = coalesce(updated_at, now())")
+    op.alter_column('users', 'created_at', existing_type=postgresql.TIMESTAMP(), nullable=False)
+    op.alter_column('users', 'updated_at', existing_type=postgresql.TIMESTAMP(), nullable=False)
+
+    if 'totp_secret' not in columns:
+        op.add_column('users', sa.Column('totp_secret', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    if 'enabled_2fa' not in columns:
+        op.add_column('users', sa.Column('enabled_2fa', sa.Boolean(), server_default=sa.false(), nullable=False))
+        op.alter_column('users', 'enabled_2fa', existing_type=sa.Boolean(), server_default=None)
+
+    if not isinstance(columns['gender']['type'], sa.Enum):
+        gender_enum.create(bind, checkfirst=True)
+        op.alter_column(
+            'users', 'gender', type_=gender_enum, existing_type=sqlmodel.sql.sqltypes.AutoString(),
+            existing_nullable=False, postgresql_using='gender::genderenum',
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    op.alter_column(
+        'users', 'gender', type_=sqlmodel.sql.sqltypes.AutoString(), existing_type=gender_enum,
+        existing_nullable=False, postgresql_using='gender::text',
+    )
+    gender_enum.drop(bind, checkfirst=True)
+
+    op.drop_column('users', 'enabled_2fa')
+    op.drop_column('users', 'totp_secret')
+    op.alter_column('users', 'created_at', existing_type=postgresql.TIMESTAMP(), nullable=True)
+    op.alter_column('users', 'updated_at', new_column_name='update_at', existing_type=postgresql.TIMESTAMP(), nullable=True)
+
+    with without_user_foreign_keys(inspector):
+        op.drop_constraint('users_pkey', 'users', type_='primary')
+        op.add_column('users', sa.Column('id', sa.Integer(), sa.Identity(), nullable=False))
+        op.create_primary_key('users_pkey', 'users', ['uid', 'id'])
+        # 9b4d2f7a1c63 ocekuje unique na uid za foreign key iz apartments
+        op.create_unique_constraint('uq_users_uid', 'users', ['uid'])
@@ -0,0 +1,42 @@
+"""apartment amenity mask and facet id
+
+Revision ID: c5e8a2d4f917
+Revises: 9b4d2f7a1c63
+Create Date: 2026-10-18 19:41:05.613208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e8a2d4f917'
+down_revision: Union[str, None] = '9b4d2f7a1c63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('apartments', sa.Column('amenity_mask', sa.SmallInteger(), server_default='0', nullable=False))
+    # postojeci redovi dobijaju facet_id odmah (identity se popunjava pri ADD COLUMN)
+    op.add_column('apartments', sa.Column('facet_id', sa.BigInteger(), sa.Identity(), nullable=False))
+    op.create_unique_constraint(op.f('apartments_facet_id_key'), 'apartments', ['facet_id'])
+
+    # redosled bitova kao src/apartment/facets.py AMENITIES
+    op.execute("""
+        UPDATE apartments SET amenity_mask =
+            has_elevator::int | (has_wifi::int << 1) | (has_air_conditioning::int << 2)
+            | (has_parking::int << 3) | (pet_friendly::int << 4)
+    """)
+    op.create_index('ix_apartments_amenity_mask', 'apartments', ['amenity_mask', 'num_rooms'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_apartments_amenity_mask', table_name='apartments')
+    op.drop_constraint(op.f('apartments_facet_id_key'), 'apartments', type_='unique')
+    op.drop_column('apartments', 'facet_id')
+    op.drop_column('apartments', 'amenity_mask')
@@ -0,0 +1,54 @@
+"""apartment full text and trigram search
+
+Revision ID: e2a7c9f4b816
+Revises: c5e8a2d4f917
+Create Date: 2026-10-18 20:24:51.370912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c9f4b816'
+down_revision: Union[str, None] = 'c5e8a2d4f917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # isti izraz kao search_vector u src/apartment/model.py; ADD COLUMN ... STORED prepisuje tabelu
+    op.add_column('apartments', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(city, '') || ' ' || coalesce(address, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'C')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    op.create_index('ix_apartments_search_vector', 'apartments', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index(
+        'ix_apartments_city_trgm', 'apartments', ['city'], unique=False,
+        postgresql_using='gin', postgresql_ops={'city': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_apartments_address_trgm', 'apartments', ['address'], unique=False,
+        postgresql_using='gin', postgresql_ops={'address': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_apartments_address_trgm', table_name='apartments', postgresql_using='gin')
+    op.drop_index('ix_apartments_city_trgm', table_name='apartments', postgresql_using='gin')
+    op.drop_index('ix_apartments_search_vector', table_name='apartments', postgresql_using='gin')
+    op.drop_column('apartments', 'search_vector')
@@ -1,7 +1,19 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
+from fastapi.responses import ORJSONResponse
 
 from contextlib import asynccontextmanager
-from src.db.main import init_db
+import logging
+from src.db.main import init_db, pool_stats
+from src.db.redis import init_redis, close_redis
+from src.db.revocation import revocation_filter
+from src.auth.profile_cache import user_profiles
+from src.auth.utils import password_hasher
+from src.mail_templates import precompile as precompile_mail_templates
+from src.metrics import MetricsMiddleware, metrics_publisher, metrics_router
+from src.db.query_stats import QueryStatsMiddleware
+from src.profiler import ProfilerMiddleware, profiler_router
+from src.auth.dependencies import RoleChecker
+from src.config import Config
 from fastapi.middleware.cors import CORSMiddleware
 
 
@@ -9,15 +21,36 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from src.books.api import book_router
 from src.auth.api import auth_router
+from src.apartment.api import apartment_router
+from src.apartment.facets import facet_index
+from src.apartment.autocomplete import autocomplete
 
 # =============================================================================
 
 
+logger = logging.getLogger(__name__)
+
+
 @asynccontextmanager
 async def life_span(app: FastAPI):
     print("server is starting...")
+    await init_redis()
     await init_db()
+    precompile_mail_templates()
+    await revocation_filter.start()
+    await user_profiles.start()
+    await metrics_publisher.start()
+    await facet_index.start()
+    await autocomplete.start()
     yield
+    await autocomplete.stop()
+    await facet_index.stop()
+    await metrics_publisher.stop()
+    await user_profiles.stop()
+    await revocation_filter.stop()
+    logger.info("db pool at shutdown: %s", pool_stats())
+    await close_redis()
+    password_hasher.shutdown()
     print("server has been stopped...")
 
 
@@ -28,6 +61,7 @@ app = FastAPI(
     description="Template FastAPI project",
     version=version,
     lifespan=life_span,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -38,6 +72,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(ProfilerMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+
+if Config.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 
 # ================================routes include===============================
 
@@ -45,4 +85,16 @@ app.include_router(book_router, prefix=f"/api/{version}/books", tags=["Books"])
 
 app.include_router(auth_router, prefix=f"/api/{version}/auth", tags=["Users"])
 
+app.include_router(apartment_router, prefix=f"/api/{version}/apartments", tags=["Apartments"])
+
+app.include_router(profiler_router, prefix=f"/api/{version}/admin/profiler", tags=["Admin"])
+
+
+@app.get(f"/api/{version}/db/pool-stats", tags=["Health"], dependencies=[Depends(RoleChecker(["admin"]))])
+async def get_pool_stats():
+    return pool_stats()
+
+
+app.include_router(metrics_router, tags=["Health"])
+
 # =============================================================================
@@ -0,0 +1,187 @@
+from fastapi import APIRouter, status, Depends, Query
+from fastapi.exceptions import HTTPException
+from fastapi.responses import Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Literal, Optional
+from .serializers import (
+    ApartmentCreateModel,
+    QuoteRequestModel,
+    apartment_row_adapter,
+    apartment_search_adapter,
+    apartment_filter_adapter,
+    apartment_match_adapter,
+    location_suggestions_adapter,
+    quote_result_adapter,
+)
+from .service import ApartmentService
+from .facets import facet_index
+from .autocomplete import autocomplete
+from src.auth.dependencies import get_current_user
+from src.auth.model import User
+from src.config import Config
+from src.db.main import get_session
+from src.db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, next_cursor
+
+apartment_router = APIRouter()
+apartment_service = ApartmentService()
+
+
+def search_response(rows) -> Response:
+    items = [{"apartment": apartment, "distance_km": distance} for apartment, distance in rows]
+    return Response(content=apartment_search_adapter.dump_json({"items": items}), media_type="application/json")
+
+
+@apartment_router.post("/create", status_code=status.HTTP_201_CREATED)
+async def create_apartment(
+    apartment_data: ApartmentCreateModel,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    new_apartment = await apartment_service.create_apartment(apartment_data, current_user.uid, session)
+
+    return Response(
+        content=apartment_row_adapter.dump_json(new_apartment),
+        media_type="application/json",
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+@apartment_router.patch("/{apartment_uid}/deactivate")
+async def deactivate_apartment(
+    apartment_uid: str,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    apartment = await apartment_service.get_apartment(apartment_uid, session)
+
+    if apartment is None:
+        raise HTTPException(status_code=404, detail="Apartment not found")
+
+    if current_user.role != "admin" and apartment.owner_id != current_user.uid:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not allowed to perform this action")
+
+    apartment = await apartment_service.deactivate_apartment(apartment, session)
+
+    return Response(content=apartment_row_adapter.dump_json(apartment), media_type="application/json")
+
+
+# ===================================PRETRAGA==================================
+
+@apartment_router.get("/nearby")
+async def search_nearby(
+    latitude: float = Query(ge=-90, le=90),
+    longitude: float = Query(ge=-180, le=180),
+    radius_km: float = Query(5.0, gt=0, le=Config.APARTMENT_SEARCH_MAX_RADIUS_KM),
+    limit: int = Query(50, ge=1, le=Config.APARTMENT_SEARCH_MAX_RESULTS),
+    session: AsyncSession = Depends(get_session),
+):
+    rows = await apartment_service.search_radius(latitude, longitude, radius_km, limit, session)
+
+    return search_response(rows)
+
+
+@apartment_router.get("/viewport")
+async def search_viewport(
+    south: float = Query(ge=-90, le=90),
+    west: float = Query(ge=-180, le=180),
+    north: float = Query(ge=-90, le=90),
+    east: float = Query(ge=-180, le=180),
+    limit: int = Query(200, ge=1, le=Config.APARTMENT_SEARCH_MAX_RESULTS),
+    session: AsyncSession = Depends(get_session),
+):
+    # west > east znaci da prikaz prelazi 180. meridijan
+    if south > north:
+        raise HTTPException(status_code=422, detail="south must not be greater than north")
+
+    rows = await apartment_service.search_box(south, west, north, east, limit, session)
+
+    return search_response(rows)
+
+
+@apartment_router.get("/search")
+async def search_text(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(50, ge=1, le=Config.APARTMENT_SEARCH_MAX_RESULTS),
+    session: AsyncSession = Depends(get_session),
+):
+    rows = await apartment_service.search_text(q, limit, session)
+
+    items = [{"apartment": apartment, "score": score} for apartment, score in rows]
+    return Response(content=apartment_match_adapter.dump_json({"items": items}), media_type="application/json")
+
+
+@apartment_router.get("/autocomplete")
+async def autocomplete_location(
+    q: str = Query(min_length=1, max_length=100),
+    kind: Optional[Literal["country", "state", "city"]] = None,
+    limit: int = Query(10, ge=1, le=50),
+):
+    # iz memorije, bez upita u bazu po svakom otkucanom slovu
+    if not autocomplete.ready:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Autocomplete is not available")
+
+    items = autocomplete.index.suggest(q, kind, limit)
+    return Response(content=location_suggestions_adapter.dump_json({"items": items}), media_type="application/json")
+
+
+@apartment_router.get("/filter")
+async def filter_apartments(
+    has_elevator: bool = False,
+    has_wifi: bool = False,
+    has_air_conditioning: bool = False,
+    has_parking: bool = False,
+    pet_friendly: bool = False,
+    min_rooms: Optional[int] = Query(None, ge=0),
+    max_rooms: Optional[int] = Query(None, ge=0),
+    min_beds: Optional[int] = Query(None, ge=0),
+    max_beds: Optional[int] = Query(None, ge=0),
+    min_floor: Optional[int] = None,
+    max_floor: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+):
+    # True = mora da ima, False = svejedno
+    wanted = (has_elevator, has_wifi, has_air_conditioning, has_parking, pet_friendly)
+    required = sum(1 << bit for bit, amenity in enumerate(wanted) if amenity)
+    ranges = dict(
+        min_rooms=min_rooms, max_rooms=max_rooms, min_beds=min_beds, max_beds=max_beds,
+        min_floor=min_floor, max_floor=max_floor,
+    )
+
+    after = decode_cursor(cursor) if cursor else None
+    apartments = await apartment_service.filter_apartments(required, session, limit, after, **ranges)
+
+    # brojevi po facetama za ceo rezultat (ne samo ovu stranu), iz bitmapa u memoriji
+    facets = None
+    if facet_index.ready:
+        facets = facet_index.bitmaps.counts(facet_index.bitmaps.match(required, **ranges))
+
+    content = apartment_filter_adapter.dump_json({
+        "items": apartments[:limit],
+        "next_cursor": next_cursor(apartments, limit),
+        "facets": facets,
+    })
+    return Response(content=content, media_type="application/json")
+
+
+@apartment_router.post("/quotes")
+async def get_quotes(quote_data: QuoteRequestModel, session: AsyncSession = Depends(get_session)):
+    # numpy se ucitava tek na prvi zahtev za cenu, ne pri startu workera
+    from .pricing import quote_rows
+
+    rows = await apartment_service.get_quote_columns(quote_data.apartment_uids, session)
+    items, unavailable = quote_rows(rows, quote_data.nights, quote_data.currency)
+
+    # trazeni a neaktivni ili nepostojeci stanovi
+    found = {row[0] for row in rows}
+    unavailable += [uid for uid in dict.fromkeys(quote_data.apartment_uids) if uid not in found]
+
+    content = quote_result_adapter.dump_json({
+        "currency": quote_data.currency,
+        "nights": quote_data.nights,
+        "items": items,
+        "unavailable": unavailable,
+    })
+    return Response(content=content, media_type="application/json")
+
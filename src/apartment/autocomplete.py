@@ -0,0 +1,251 @@
+import asyncio
+import heapq
+import logging
+import time
+import unicodedata
+import uuid
+import zlib
+from bisect import bisect_left, insort
+from collections import deque
+
+import orjson
+from sqlmodel import select, func
+from src.config import Config
+from src.db.main import async_session
+from src.db.redis import get_redis
+from .model import Apartment
+
+logger = logging.getLogger(__name__)
+
+LOCATIONS_CHANNEL = "apartment_locations"
+SNAPSHOT_KEY = "apartment_locations:snapshot"
+SEQUENCE_KEY = "apartment_locations:seq"
+REBUILD_LOCK_KEY = "apartment_locations:rebuild"
+
+# dogadjaji koji se ponovo primene posle ucitavanja snapshot-a koji ih mozda ne sadrzi
+RECENT_EVENTS = 10000
+
+# bez snapshot-a (hladan start) gradi samo worker sa lock-om, ostali proveravaju da li je snapshot stigao
+COLD_START_LOCK_SECONDS = 60
+SNAPSHOT_POLL_SECONDS = 0.5
+
+# najveci znak, prefix + MAX_CHAR je iza svih kljuceva koji pocinju tim prefiksom
+MAX_CHAR = "\U0010ffff"
+
+
+def normalize(value: str) -> str:
+    # "Zürich" i "zur" se poklapaju: mala slova, bez akcenata
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).strip()
+
+
+def location_keys(country: str, state: str, city: str) -> tuple:
+    # isti grad u dve drzave su dva predloga, pa kljuc nosi i roditelje
+    return ("country", (country,)), ("state", (state, country)), ("city", (city, state, country))
+
+
+class LocationIndex:
+    """
+    Sorted array of (normalized name, kind, key) over the distinct countries,
+    states and cities of active apartments, with an apartment count per
+    entry. A prefix is a bisect range in the array; the most popular entries
+    in it are the suggestions.
+    """
+
+    def __init__(self):
+        self.entries: list[tuple] = []
+        self.counts: dict[tuple, int] = {}
+
+    @classmethod
+    def build(cls, rows) -> "LocationIndex":
+        # rows: (country, state, city, broj aktivnih stanova)
+        index = cls()
+        for country, state, city, count in rows:
+            for entry in location_keys(country, state, city):
+                index.counts[entry] = index.counts.get(entry, 0) + count
+        index.entries = sorted((normalize(key[0]), kind, key) for kind, key in index.counts if key[0])
+        return index
+
+    def add(self, country: str, state: str, city: str) -> None:
+        for kind, key in location_keys(country, state, city):
+            count = self.counts.get((kind, key), 0)
+            self.counts[(kind, key)] = count + 1
+            if count == 0 and key[0]:
+                insort(self.entries, (normalize(key[0]), kind, key))
+
+    def remove(self, country: str, state: str, city: str) -> None:
+        for kind, key in location_keys(country, state, city):
+            count = self.counts.get((kind, key), 0)
+            if count > 1:
+                self.counts[(kind, key)] = count - 1
+            elif count == 1:
+                del self.counts[(kind, key)]
+                if not key[0]:
+                    continue
+                entry = (normalize(key[0]), kind, key)
+                position = bisect_left(self.entries, entry)
+                if position < len(self.entries) and self.entries[position] == entry:
+                    del self.entries[position]
+
+    def suggest(self, prefix: str, kind: str | None = None, limit: int = 10) -> list[dict]:
+        prefix = normalize(prefix)
+        low = bisect_left(self.entries, (prefix,))
+        high = bisect_left(self.entries, (prefix + MAX_CHAR,))
+
+        candidates = (
+            (self.counts[(entry_kind, key)], entry_kind, key)
+            for _, entry_kind, key in self.entries[low:high]
+            if kind is None or entry_kind == kind
+        )
+        top = heapq.nlargest(limit, candidates, key=lambda candidate: candidate[0])
+
+        return [
+            {
+                "kind": entry_kind,
+                "value": key[0],
+                "state": key[1] if entry_kind == "city" else None,
+                "country": key[-1] if entry_kind != "country" else None,
+                "count": count,
+            }
+            for count, entry_kind, key in top
+        ]
+
+    def rows(self) -> list[list]:
+        # samo gradovi su dovoljni, drzave i regioni se sabiraju iz njih pri build-u
+        return [[*reversed(key), count] for (kind, key), count in self.counts.items() if kind == "city"]
+
+
+def dump_snapshot(sequence: int, index: LocationIndex) -> bytes:
+    return zlib.compress(orjson.dumps([sequence, index.rows()]), 6)
+
+
+def load_snapshot(blob: bytes) -> tuple[int, LocationIndex]:
+    sequence, rows = orjson.loads(zlib.decompress(blob))
+    return sequence, LocationIndex.build(rows)
+
+
+async def publish_location_event(action: str, apartment: Apartment) -> None:
+    redis = get_redis()
+    sequence = await redis.incr(SEQUENCE_KEY)
+    await redis.publish(
+        LOCATIONS_CHANNEL, orjson.dumps([action, sequence, apartment.country, apartment.state, apartment.city]),
+    )
+
+
+class Autocomplete:
+    """
+    Per-worker LocationIndex. Workers load the compressed snapshot from Redis
+    instead of each running the GROUP BY. Events from the apartment service
+    (numbered from a Redis counter) keep the index current, and events already
+    counted in the snapshot are skipped. Every rebuild_interval one worker
+    (whoever gets the lock) rebuilds from the database, stores a new snapshot
+    and tells the others to reload it; recent events newer than the snapshot
+    are replayed on top of it. With no snapshot yet, the same lock picks the
+    one worker that builds it while the others wait. While the subscription
+    is down, ready is False and the endpoint answers 503.
+    """
+
+    def __init__(self, rebuild_interval: float):
+        self.rebuild_interval = rebuild_interval
+        self.index = LocationIndex()
+        self.sequence = 0
+        self.ready = False
+        self.worker_id = uuid.uuid4().hex
+        self._recent = deque(maxlen=RECENT_EVENTS)
+        self._task = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.ready = False
+
+    async def apply(self, payload: bytes) -> None:
+        action, *values = orjson.loads(payload)
+        if action == "snapshot":
+            # svoj snapshot ovaj worker vec ima
+            if values[0] != self.worker_id:
+                await self._load()
+            return
+
+        self._recent.append((action, *values))
+        self._apply_event(action, *values)
+
+    def _apply_event(self, action: str, sequence: int, country: str, state: str, city: str) -> None:
+        # self.sequence je brojac u trenutku snapshot-a; redosled posle njega nije bitan (incr i publish nisu atomicni)
+        if sequence <= self.sequence:
+            return
+        if action == "add":
+            self.index.add(country, state, city)
+        else:
+            self.index.remove(country, state, city)
+
+    async def _load(self) -> None:
+        while (blob := await get_redis().get(SNAPSHOT_KEY)) is None:
+            if await self._take_rebuild_lock(COLD_START_LOCK_SECONDS):
+                await self._rebuild()
+                return
+            await asyncio.sleep(SNAPSHOT_POLL_SECONDS)
+
+        self.sequence, self.index = await asyncio.to_thread(load_snapshot, blob)
+        for event in list(self._recent):
+            self._apply_event(*event)
+
+    async def _rebuild(self) -> None:
+        # brojac pre upita: dogadjaj sa vecim brojem mozda je vec u bazi pa se broji dva puta, do sledeceg rebuild-a
+        sequence = int(await get_redis().get(SEQUENCE_KEY) or 0)
+        rows = await self._locations()
+
+        index = await asyncio.to_thread(LocationIndex.build, rows)
+        blob = await asyncio.to_thread(dump_snapshot, sequence, index)
+        self.sequence, self.index = sequence, index
+
+        await get_redis().set(SNAPSHOT_KEY, blob)
+        await get_redis().publish(LOCATIONS_CHANNEL, orjson.dumps(["snapshot", self.worker_id]))
+
+    async def _locations(self) -> list:
+        statement = (
+            select(Apartment.country, Apartment.state, Apartment.city, func.count())
+            .where(Apartment.is_active)
+            .group_by(Apartment.country, Apartment.state, Apartment.city)
+        )
+
+        async with async_session() as session:
+            return (await session.exec(statement)).all()
+
+    async def _take_rebuild_lock(self, seconds: float) -> bool:
+        return bool(await get_redis().set(REBUILD_LOCK_KEY, self.worker_id, nx=True, ex=max(int(seconds), 1)))
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with get_redis().pubsub() as pubsub:
+                    await pubsub.subscribe(LOCATIONS_CHANNEL)
+                    await self._load()
+                    self.ready = True
+                    next_rebuild = time.monotonic() + self.rebuild_interval
+
+                    while True:
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if message is not None:
+                            await self.apply(message["data"])
+
+                        if time.monotonic() >= next_rebuild:
+                            # samo jedan worker po intervalu, ostali dobiju "snapshot" poruku
+                            if await self._take_rebuild_lock(self.rebuild_interval - 1):
+                                await self._rebuild()
+                            next_rebuild = time.monotonic() + self.rebuild_interval
+            except Exception as e:
+                self.ready = False
+                logger.warning("apartment autocomplete disconnected, suggestions disabled: %s", e)
+                await asyncio.sleep(5)
+
+
+autocomplete = Autocomplete(rebuild_interval=Config.APARTMENT_AUTOCOMPLETE_REBUILD_SECONDS)
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import time
+
+import orjson
+from sqlmodel import select
+from src.config import Config
+from src.db.main import async_session
+from src.db.redis import get_redis
+from .model import Apartment
+
+logger = logging.getLogger(__name__)
+
+AMENITIES = ("has_elevator", "has_wifi", "has_air_conditioning", "has_parking", "pet_friendly")
+ALL_AMENITIES = (1 << len(AMENITIES)) - 1
+FACETS_CHANNEL = "apartment_facets"
+
+
+def amenity_mask(apartment) -> int:
+    mask = 0
+    for bit, name in enumerate(AMENITIES):
+        if getattr(apartment, name):
+            mask |= 1 << bit
+    return mask
+
+
+def supersets(required: int) -> list[int]:
+    # sve maske koje sadrze trazene bitove, sa 5 bitova najvise 32 vrednosti za IN (...)
+    return [mask for mask in range(ALL_AMENITIES + 1) if mask & required == required]
+
+
+class FacetBitmaps:
+    """
+    One bitset per facet value over Apartment.facet_id, stored as a Python
+    int: AND/OR/bit_count run in C over 64-bit words, so the counts for a
+    result set are a few bitwise ops per facet instead of a GROUP BY.
+    """
+
+    def __init__(self):
+        self.active = 0
+        self.amenities = [0] * len(AMENITIES)
+        self.rooms: dict[int, int] = {}
+        self.beds: dict[int, int] = {}
+        self.floors: dict[int, int] = {}
+
+    @classmethod
+    def build(cls, rows) -> "FacetBitmaps":
+        # punjenje kroz bytearray (O(1) po bitu), int se pravi jednom na kraju
+        rows = list(rows)
+        size = (max((row[0] for row in rows), default=0) >> 3) + 1
+        active = bytearray(size)
+        amenities = [bytearray(size) for _ in AMENITIES]
+        values = ({}, {}, {})
+
+        for facet_id, mask, *facet_values in rows:
+            byte, bit = facet_id >> 3, 1 << (facet_id & 7)
+            active[byte] |= bit
+            for index in range(len(AMENITIES)):
+                if mask >> index & 1:
+                    amenities[index][byte] |= bit
+            for bitmaps, value in zip(values, facet_values):
+                if value not in bitmaps:
+                    bitmaps[value] = bytearray(size)
+                bitmaps[value][byte] |= bit
+
+        def to_int(bits: bytearray) -> int:
+            return int.from_bytes(bits, "little")
+
+        index = cls()
+        index.active = to_int(active)
+        index.amenities = [to_int(bits) for bits in amenities]
+        index.rooms, index.beds, index.floors = ({value: to_int(bits) for value, bits in bitmaps.items()} for bitmaps in values)
+        return index
+
+    def add(self, facet_id: int, mask: int, rooms: int, beds: int, floor: int) -> None:
+        bit = 1 << facet_id
+        self.active |= bit
+        for index in range(len(AMENITIES)):
+            if mask >> index & 1:
+                self.amenities[index] |= bit
+        for bitmaps, value in ((self.rooms, rooms), (self.beds, beds), (self.floors, floor)):
+            bitmaps[value] = bitmaps.get(value, 0) | bit
+
+    def remove(self, facet_id: int, mask: int, rooms: int, beds: int, floor: int) -> None:
+        bit = 1 << facet_id
+        if not self.active & bit:
+            return
+        self.active &= ~bit
+        for index in range(len(AMENITIES)):
+            if mask >> index & 1:
+                self.amenities[index] &= ~bit
+        for bitmaps, value in ((self.rooms, rooms), (self.beds, beds), (self.floors, floor)):
+            if value in bitmaps:
+                bitmaps[value] &= ~bit
+
+    @staticmethod
+    def _range(bitmaps: dict[int, int], low: int | None, high: int | None) -> int | None:
+        if low is None and high is None:
+            return None
+        result = 0
+        for value, bits in bitmaps.items():
+            if (low is None or value >= low) and (high is None or value <= high):
+                result |= bits
+        return result
+
+    def match(self, required: int, min_rooms=None, max_rooms=None, min_beds=None, max_beds=None,
+              min_floor=None, max_floor=None) -> int:
+        result = self.active
+        for index in range(len(AMENITIES)):
+            if required >> index & 1:
+                result &= self.amenities[index]
+
+        for bitmaps, low, high in (
+            (self.rooms, min_rooms, max_rooms),
+            (self.beds, min_beds, max_beds),
+            (self.floors, min_floor, max_floor),
+        ):
+            bits = self._range(bitmaps, low, high)
+            if bits is not None:
+                result &= bits
+        return result
+
+    def counts(self, result: int) -> dict:
+        return {
+            "total": result.bit_count(),
+            "amenities": {name: (result & bits).bit_count() for name, bits in zip(AMENITIES, self.amenities)},
+            "num_rooms": {value: (result & bits).bit_count() for value, bits in sorted(self.rooms.items())},
+            "num_beds": {value: (result & bits).bit_count() for value, bits in sorted(self.beds.items())},
+        }
+
+
+def facet_event(action: str, apartment: Apartment) -> bytes:
+    return orjson.dumps([
+        action, apartment.facet_id, apartment.amenity_mask, apartment.num_rooms, apartment.num_beds, apartment.floor,
+    ])
+
+
+async def publish_facet_event(action: str, apartment: Apartment) -> None:
+    await get_redis().publish(FACETS_CHANNEL, facet_event(action, apartment))
+
+
+class FacetIndex:
+    """
+    Per-worker FacetBitmaps, loaded from the database and kept current from
+    the Redis channel the apartment service publishes creates and
+    deactivations to, with a full reload every rebuild_interval. While the
+    subscription is down, ready is False and the API returns no facet counts.
+    """
+
+    def __init__(self, rebuild_interval: float):
+        self.rebuild_interval = rebuild_interval
+        self.bitmaps = FacetBitmaps()
+        self.ready = False
+        self._task = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.ready = False
+
+    def apply(self, payload: bytes) -> None:
+        action, *values = orjson.loads(payload)
+        if action == "add":
+            self.bitmaps.add(*values)
+        else:
+            self.bitmaps.remove(*values)
+
+    async def _rebuild(self) -> None:
+        statement = (
+            select(Apartment.facet_id, Apartment.amenity_mask, Apartment.num_rooms, Apartment.num_beds, Apartment.floor)
+            .where(Apartment.is_active)
+            .execution_options(yield_per=10000)
+        )
+
+        async with async_session() as session:
+            result = await session.stream(statement)
+            rows = [tuple(row) async for row in result]
+
+        # gradi se van event loop-a, na 1M redova traje par sekundi
+        self.bitmaps = await asyncio.to_thread(FacetBitmaps.build, rows)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with get_redis().pubsub() as pubsub:
+                    # prvo subscribe pa ucitavanje, dogadjaji u medjuvremenu se primene posle (idempotentni su)
+                    await pubsub.subscribe(FACETS_CHANNEL)
+                    await self._rebuild()
+                    self.ready = True
+                    next_rebuild = time.monotonic() + self.rebuild_interval
+
+                    while True:
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if message is not None:
+                            self.apply(message["data"])
+
+                        if time.monotonic() >= next_rebuild:
+                            await self._rebuild()
+                            next_rebuild = time.monotonic() + self.rebuild_interval
+            except Exception as e:
+                self.ready = False
+                logger.warning("apartment facet index disconnected, facet counts disabled: %s", e)
+                await asyncio.sleep(5)
+
+
+facet_index = FacetIndex(rebuild_interval=Config.APARTMENT_FACET_REBUILD_SECONDS)
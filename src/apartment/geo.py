@@ -0,0 +1,123 @@
+import math
+
+# geohash: svaki karakter deli celiju na 32 dela (naizmenicno po duzini i sirini).
+# alfabet je rastuci po ASCII, pa su sve lokacije unutar celije jedan opseg u B-tree indeksu
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+PRECISION = 9  # ~4.8m x 4.8m
+MAX_CELLS = 32
+EARTH_RADIUS_KM = 6371.0088
+
+
+def encode(latitude: float, longitude: float, precision: int = PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        if coordinate >= middle:
+            value = (value << 1) | 1
+            interval[0] = middle
+        else:
+            value <<= 1
+            interval[1] = middle
+        even = not even
+
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    # (visina, sirina) celije u stepenima
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def radius_bbox(latitude: float, longitude: float, radius_km: float) -> tuple[float, float, float, float]:
+    # (south, west, north, east) koji sigurno sadrzi krug
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    south = max(latitude - dlat, -90.0)
+    north = min(latitude + dlat, 90.0)
+
+    if south == -90.0 or north == 90.0:
+        return south, -180.0, north, 180.0
+
+    dlon = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(max(abs(south), abs(north))))))
+    if dlon >= 180.0:
+        return south, -180.0, north, 180.0
+
+    west = (longitude - dlon + 540.0) % 360.0 - 180.0
+    east = (longitude + dlon + 540.0) % 360.0 - 180.0
+    return south, west, north, east
+
+
+def _lon_spans(west: float, east: float) -> list[tuple[float, float]]:
+    # viewport preko 180. meridijana se deli na dva dela
+    if west <= east:
+        return [(west, east)]
+    return [(west, 180.0), (-180.0, east)]
+
+
+def cover(south: float, west: float, north: float, east: float) -> list[str]:
+    """
+    Geohash cells that cover the box, at the finest precision that needs at
+    most MAX_CELLS cells.
+    """
+    spans = _lon_spans(west, east)
+
+    for precision in range(PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        rows = math.floor(north / height) - math.floor(south / height) + 1
+        columns = sum(math.floor(e / width) - math.floor(w / width) + 1 for w, e in spans)
+        if rows * columns <= MAX_CELLS:
+            break
+
+    cells = set()
+    for row in range(math.floor(south / height), math.floor(north / height) + 1):
+        latitude = min(max((row + 0.5) * height, -90.0), 90.0)
+        for w, e in spans:
+            for column in range(math.floor(w / width), math.floor(e / width) + 1):
+                longitude = min(max((column + 0.5) * width, -180.0), 180.0)
+                cells.add(encode(latitude, longitude, precision))
+
+    return sorted(cells)
+
+
+def _next_cell(cell: str) -> str | None:
+    # sledeca celija iste preciznosti u geohash redosledu (None posle "zzz")
+    for i in range(len(cell) - 1, -1, -1):
+        index = BASE32.index(cell[i])
+        if index < len(BASE32) - 1:
+            return cell[:i] + BASE32[index + 1] + "0" * (len(cell) - i - 1)
+    return None
+
+
+def cover_ranges(south: float, west: float, north: float, east: float) -> list[tuple[str, str]]:
+    """
+    The covering cells as [low, high) geohash ranges, with neighbours that
+    are adjacent in geohash order merged, so the index does fewer range scans.
+    """
+    ranges = []
+    for cell in cover(south, west, north, east):
+        high = _next_cell(cell) or "~"
+        if ranges and ranges[-1][1] == cell:
+            ranges[-1] = (ranges[-1][0], high)
+        else:
+            ranges.append((cell, high))
+    return ranges
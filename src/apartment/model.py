@@ -2,7 +2,9 @@
 from __future__ import annotations
 
 from typing import Optional, TYPE_CHECKING
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Relationship, Column
+from sqlalchemy import String, SmallInteger, BigInteger, Identity, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from datetime import datetime
 import uuid
 
@@ -25,6 +27,8 @@ class Apartment(SQLModel, table=True):
     zip_code: str
     latitude: float
     longitude: float
+    # geohash lokacije (src/apartment/geo.py), "C" collation da bi opsezi u indeksu isli po bajtovima
+    geohash: str = Field(sa_column=Column(String(12, collation="C"), nullable=False, index=True))
 
     price: float
     currency: str = Field(default="EUR")
@@ -43,6 +47,11 @@ class Apartment(SQLModel, table=True):
     has_parking: bool = Field(default=False)
     pet_friendly: bool = Field(default=False)
 
+    # bitovi has_* polja (src/apartment/facets.py), za filtriranje kroz indeks
+    amenity_mask: int = Field(default=0, sa_column=Column(SmallInteger, nullable=False, server_default="0"))
+    # gust broj reda za facet bitmape u memoriji
+    facet_id: Optional[int] = Field(default=None, sa_column=Column(BigInteger, Identity(), nullable=False, unique=True))
+
     is_active: bool = Field(default=True)
 
     created_at: datetime = Field(default_factory=datetime.now)
@@ -56,6 +65,40 @@ class Apartment(SQLModel, table=True):
         return f"<Apartment {self.title}>"
 
 
+# filter po sadrzaju: amenity_mask IN (nadskupovi trazene maske) + broj soba
+Index("ix_apartments_amenity_mask", Apartment.__table__.c.amenity_mask, Apartment.__table__.c.num_rooms)
+
+
+# ================================TEXT SEARCH==================================
+
+# 'simple' bez stemovanja i stop reci, oglasi su na vise jezika
+SEARCH_CONFIG = "simple"
+
+# generated kolona koju popunjava baza; nije polje modela pa se ne ucitava uz stan i ne ide u JSON
+search_vector = Column(
+    "search_vector",
+    TSVECTOR,
+    Computed(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(city, '') || ' ' || coalesce(address, '')), 'B') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'C')",
+        persisted=True,
+    ),
+)
+Apartment.__table__.append_column(search_vector)
+
+Index("ix_apartments_search_vector", search_vector, postgresql_using="gin")
+# slicnost po trigramima (pg_trgm) za grad i adresu sa greskom u kucanju
+Index(
+    "ix_apartments_city_trgm", Apartment.__table__.c.city,
+    postgresql_using="gin", postgresql_ops={"city": "gin_trgm_ops"},
+)
+Index(
+    "ix_apartments_address_trgm", Apartment.__table__.c.address,
+    postgresql_using="gin", postgresql_ops={"address": "gin_trgm_ops"},
+)
+
+
 # class ApartmentImage(SQLModel, table=True):
 #     __tablename__ = "apartment_images"
 
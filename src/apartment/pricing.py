@@ -0,0 +1,80 @@
+from functools import lru_cache
+
+import numpy as np
+from src.config import Config
+
+# cena boravka za ceo niz stanova odjednom: svaka kolona je numpy niz, nema Python petlje po stanu
+
+
+@lru_cache
+def rate_table() -> tuple[np.ndarray, np.ndarray]:
+    # (sortirane oznake valuta, kurs prema EUR), pravi se jednom po procesu
+    codes = sorted(Config.APARTMENT_CURRENCY_RATES)
+    return np.array(codes), np.array([Config.APARTMENT_CURRENCY_RATES[code] for code in codes], dtype=np.float64)
+
+
+def to_eur(currencies: np.ndarray) -> np.ndarray:
+    # kurs za svaku valutu u nizu, NaN za nepoznatu
+    codes, rates = rate_table()
+    index = np.clip(np.searchsorted(codes, currencies), 0, len(codes) - 1)
+    return np.where(codes[index] == currencies, rates[index], np.nan)
+
+
+def quote(
+    price: np.ndarray,
+    discount_percentage: np.ndarray,
+    cleaning_fee: np.ndarray,
+    deposit_amount: np.ndarray,
+    currency: np.ndarray,
+    nights: int,
+    target_currency: str,
+) -> dict[str, np.ndarray]:
+    """
+    Stay quotes in target_currency: the nightly price times nights, minus the
+    discount, plus the one-off cleaning fee. The deposit is refundable and
+    reported apart from the total. Apartments in a currency missing from the
+    rate table come back as NaN.
+    """
+    rate = to_eur(currency) / to_eur(np.array([target_currency]))[0]
+
+    nightly = price * rate
+    subtotal = nightly * nights
+    discount = subtotal * discount_percentage / 100.0
+    cleaning = cleaning_fee * rate
+
+    return {
+        "nightly": np.round(nightly, 2),
+        "subtotal": np.round(subtotal, 2),
+        "discount": np.round(discount, 2),
+        "cleaning_fee": np.round(cleaning, 2),
+        "total": np.round(subtotal - discount + cleaning, 2),
+        "deposit": np.round(deposit_amount * rate, 2),
+    }
+
+
+def quote_rows(rows: list, nights: int, target_currency: str) -> tuple[list[dict], list]:
+    # rows: (uid, price, discount_percentage, cleaning_fee, deposit_amount, currency)
+    uids = [row[0] for row in rows]
+    columns = list(zip(*rows)) if rows else [()] * 6
+
+    quotes = quote(
+        np.array(columns[1], dtype=np.float64),
+        np.array(columns[2], dtype=np.float64),
+        np.array(columns[3], dtype=np.float64),
+        np.array(columns[4], dtype=np.float64),
+        np.array(columns[5], dtype=str),
+        nights,
+        target_currency,
+    )
+
+    valid = ~np.isnan(quotes["total"])
+    if valid.all():
+        unavailable = []
+    else:
+        unavailable = [uid for uid, ok in zip(uids, valid.tolist()) if not ok]
+        uids = [uid for uid, ok in zip(uids, valid.tolist()) if ok]
+        quotes = {name: values[valid] for name, values in quotes.items()}
+
+    keys = ("apartment_uid", *quotes)
+    items = [dict(zip(keys, values)) for values in zip(uids, *(values.tolist() for values in quotes.values()))]
+    return items, unavailable
@@ -0,0 +1,145 @@
+from pydantic import BaseModel, Field, TypeAdapter, field_validator, model_validator
+from typing import Dict, List, Optional
+from typing_extensions import TypedDict
+from datetime import date
+from src.config import Config
+from .model import Apartment
+import uuid
+
+
+def check_currency(value: str) -> str:
+    # "usd" -> "USD"; valuta bez kursa u APARTMENT_CURRENCY_RATES se ne moze preracunati (pricing.to_eur)
+    currency = value.strip().upper()
+    if currency not in Config.APARTMENT_CURRENCY_RATES:
+        raise ValueError(f"Unsupported currency: {value}")
+    return currency
+
+
+class ApartmentCreateModel(BaseModel):
+    title: str
+    description: str
+    country: str
+    city: str
+    state: str
+    address: str
+    zip_code: str
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+
+    price: float = Field(ge=0)
+    currency: str = "EUR"
+    discount_percentage: float = Field(default=0.0, ge=0, le=100)
+    cleaning_fee: float = Field(default=0.0, ge=0)
+    deposit_amount: float = Field(default=0.0, ge=0)
+
+    num_rooms: int = Field(ge=0)
+    num_beds: int = Field(ge=0)
+    square_meters: float = Field(gt=0)
+
+    floor: int
+    has_elevator: bool = False
+    has_wifi: bool = False
+    has_air_conditioning: bool = False
+    has_parking: bool = False
+    pet_friendly: bool = False
+
+    @field_validator("currency")
+    @classmethod
+    def validate_currency(cls, value: str) -> str:
+        return check_currency(value)
+
+
+class QuoteRequestModel(BaseModel):
+    apartment_uids: List[uuid.UUID] = Field(min_length=1, max_length=Config.APARTMENT_QUOTE_MAX_BATCH)
+    check_in: date
+    check_out: date
+    currency: str = "EUR"
+
+    @field_validator("currency")
+    @classmethod
+    def validate_currency(cls, value: str) -> str:
+        return check_currency(value)
+
+    @model_validator(mode="after")
+    def validate_stay(self):
+        nights = (self.check_out - self.check_in).days
+        if nights < 1:
+            raise ValueError("check_out must be after check_in")
+        if nights > Config.APARTMENT_QUOTE_MAX_NIGHTS:
+            raise ValueError(f"Stay can be at most {Config.APARTMENT_QUOTE_MAX_NIGHTS} nights")
+        return self
+
+    @property
+    def nights(self) -> int:
+        return (self.check_out - self.check_in).days
+
+
+# =====================PRECOMPILED SERIALIZERS=======================
+
+class ApartmentHit(TypedDict):
+    apartment: Apartment
+    distance_km: float
+
+
+class ApartmentSearchResult(TypedDict):
+    items: List[ApartmentHit]
+
+
+class ApartmentMatch(TypedDict):
+    apartment: Apartment
+    score: float
+
+
+class ApartmentMatchResult(TypedDict):
+    items: List[ApartmentMatch]
+
+
+class LocationSuggestion(TypedDict):
+    kind: str
+    value: str
+    state: Optional[str]
+    country: Optional[str]
+    count: int
+
+
+class LocationSuggestions(TypedDict):
+    items: List[LocationSuggestion]
+
+
+class ApartmentFacets(TypedDict):
+    total: int
+    amenities: Dict[str, int]
+    num_rooms: Dict[int, int]
+    num_beds: Dict[int, int]
+
+
+class ApartmentFilterPage(TypedDict):
+    items: List[Apartment]
+    next_cursor: Optional[str]
+    facets: Optional[ApartmentFacets]
+
+
+class ApartmentQuote(TypedDict):
+    apartment_uid: uuid.UUID
+    nightly: float
+    subtotal: float
+    discount: float
+    cleaning_fee: float
+    total: float
+    deposit: float
+
+
+class QuoteResult(TypedDict):
+    currency: str
+    nights: int
+    items: List[ApartmentQuote]
+    unavailable: List[uuid.UUID]
+
+
+apartment_row_adapter = TypeAdapter(Apartment)
+apartment_filter_adapter = TypeAdapter(ApartmentFilterPage)
+quote_result_adapter = TypeAdapter(QuoteResult)
+apartment_search_adapter = TypeAdapter(ApartmentSearchResult)
+apartment_match_adapter = TypeAdapter(ApartmentMatchResult)
+location_suggestions_adapter = TypeAdapter(LocationSuggestions)
+# ===================================================================
@@ -0,0 +1,216 @@
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel import select, update, and_, or_, func
+from sqlalchemy import Integer, Table
+from .serializers import ApartmentCreateModel
+from .model import Apartment, SEARCH_CONFIG
+from .facets import amenity_mask, supersets, publish_facet_event
+from .autocomplete import publish_location_event
+from . import geo
+from src.config import Config
+from datetime import datetime
+import uuid
+import re
+
+
+def haversine_sql(latitude: float, longitude: float):
+    # ista formula kao geo.haversine_km, racuna se u bazi samo za kandidate iz geohash opsega
+    lat1 = func.radians(latitude)
+    lat2 = func.radians(Apartment.latitude)
+    dlat = func.radians(Apartment.latitude - latitude)
+    dlon = func.radians(Apartment.longitude - longitude)
+    a = func.power(func.sin(dlat / 2.0), 2) + func.cos(lat1) * func.cos(lat2) * func.power(func.sin(dlon / 2.0), 2)
+    return 2 * geo.EARTH_RADIUS_KM * func.asin(func.sqrt(func.least(a, 1.0)))
+
+
+def in_box(south: float, west: float, north: float, east: float):
+    # geohash opsezi koriste indeks, lat/lon uslov sece visak iz granicnih celija
+    cells = or_(*(
+        and_(Apartment.geohash >= low, Apartment.geohash < high)
+        for low, high in geo.cover_ranges(south, west, north, east)
+    ))
+    longitude = (
+        Apartment.longitude.between(west, east)
+        if west <= east
+        else or_(Apartment.longitude >= west, Apartment.longitude <= east)
+    )
+    return and_(cells, Apartment.latitude.between(south, north), longitude)
+
+
+def query_terms(query: str) -> list[str]:
+    # reci iz upita bez ponavljanja i bez iskljucenih (-rec), samo slova i cifre da bi to_tsquery uvek mogao da ih parsira
+    query = re.sub(r"(^|\s)-\S+", " ", query.lower())
+    return list(dict.fromkeys(re.findall(r"[^\W_]+", query)))[:Config.APARTMENT_TEXT_SEARCH_MAX_TERMS]
+
+
+def text_match(query: str, terms: list[str], table: Table = Apartment.__table__):
+    """
+    Candidates are apartments matching every word of the query (tsvector,
+    websearch syntax) or with a city/address close to one of the words
+    (trigrams), so "balcony Splt" still finds apartments in Split. Score:
+    1 for a full match, plus cover density over any of the words, plus the
+    best trigram similarity, each part in [0, 1].
+    """
+    all_terms = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+    any_term = func.to_tsquery(SEARCH_CONFIG, " | ".join(terms))
+    full_match = table.c.search_vector.op("@@")(all_terms)
+
+    # term <% kolona, napisano obrnuto da bi islo kroz gin_trgm_ops indeks
+    fuzzy = [(term, column) for term in terms if len(term) >= 3 for column in (table.c.city, table.c.address)]
+    similar = [column.op("%>")(term) for term, column in fuzzy]
+    similarity = func.greatest(0.0, *(func.word_similarity(term, column) for term, column in fuzzy))
+
+    score = full_match.cast(Integer) + func.ts_rank_cd(table.c.search_vector, any_term, 32) + similarity
+    return or_(full_match, *similar), score
+
+
+class ApartmentService:
+    async def get_apartment(self, apartment_uid: str, session: AsyncSession):
+        statement = select(Apartment).where(Apartment.uid == apartment_uid)
+
+        result = await session.exec(statement)
+
+        return result.first()
+
+    async def create_apartment(self, apartment_data: ApartmentCreateModel, owner_uid: uuid.UUID, session: AsyncSession):
+        new_apartment = Apartment(**apartment_data.model_dump(), owner_id=owner_uid)
+        new_apartment.geohash = geo.encode(new_apartment.latitude, new_apartment.longitude)
+        new_apartment.amenity_mask = amenity_mask(new_apartment)
+
+        session.add(new_apartment)
+
+        await session.commit()
+
+        await publish_facet_event("add", new_apartment)
+        await publish_location_event("add", new_apartment)
+
+        return new_apartment
+
+    async def deactivate_apartment(self, apartment: Apartment, session: AsyncSession):
+        # uslov na is_active: od dva istovremena zahteva samo jedan menja red i salje "remove"
+        statement = (
+            update(Apartment)
+            .where(Apartment.uid == apartment.uid, Apartment.is_active)
+            .values(is_active=False, updated_at=datetime.now())
+            .returning(Apartment.uid)
+        )
+        deactivated = (await session.exec(statement)).first() is not None
+        await session.commit()
+
+        if not deactivated:
+            # neko drugi ga je vec deaktivirao, dogadjaj je vec poslat
+            await session.refresh(apartment)
+            return apartment
+
+        await publish_facet_event("remove", apartment)
+        await publish_location_event("remove", apartment)
+
+        return apartment
+
+    async def filter_apartments(
+        self,
+        required_amenities: int,
+        session: AsyncSession,
+        limit: int,
+        after: uuid.UUID | None = None,
+        min_rooms: int | None = None,
+        max_rooms: int | None = None,
+        min_beds: int | None = None,
+        max_beds: int | None = None,
+        min_floor: int | None = None,
+        max_floor: int | None = None,
+    ):
+        # amenity_mask & trazeno = trazeno, napisano kao IN (...) da bi islo kroz indeks
+        statement = (
+            select(Apartment)
+            .where(Apartment.is_active, Apartment.amenity_mask.in_(supersets(required_amenities)))
+            .order_by(Apartment.uid)
+            .limit(limit + 1)
+        )
+
+        for column, low, high in (
+            (Apartment.num_rooms, min_rooms, max_rooms),
+            (Apartment.num_beds, min_beds, max_beds),
+            (Apartment.floor, min_floor, max_floor),
+        ):
+            if low is not None:
+                statement = statement.where(column >= low)
+            if high is not None:
+                statement = statement.where(column <= high)
+
+        if after is not None:
+            statement = statement.where(Apartment.uid > after)
+
+        result = await session.exec(statement)
+
+        return result.all()
+
+    async def search_radius(self, latitude: float, longitude: float, radius_km: float, limit: int, session: AsyncSession):
+        distance = haversine_sql(latitude, longitude).label("distance_km")
+
+        statement = (
+            select(Apartment, distance)
+            .where(Apartment.is_active, in_box(*geo.radius_bbox(latitude, longitude, radius_km)))
+            .where(distance <= radius_km)
+            .order_by(distance)
+            .limit(limit)
+        )
+
+        result = await session.exec(statement)
+
+        return result.all()
+
+    async def search_box(self, south: float, west: float, north: float, east: float, limit: int, session: AsyncSession):
+        # najblizi centru prikaza prvi
+        center_lon = (west + east) / 2 if west <= east else ((west + east + 360) / 2 + 180) % 360 - 180
+        distance = haversine_sql((south + north) / 2, center_lon).label("distance_km")
+
+        statement = (
+            select(Apartment, distance)
+            .where(Apartment.is_active, in_box(south, west, north, east))
+            .order_by(distance)
+            .limit(limit)
+        )
+
+        result = await session.exec(statement)
+
+        return result.all()
+
+    async def get_quote_columns(self, apartment_uids: list[uuid.UUID], session: AsyncSession):
+        # samo kolone potrebne za cenu, bez pravljenja Apartment objekata
+        statement = select(
+            Apartment.uid,
+            Apartment.price,
+            Apartment.discount_percentage,
+            Apartment.cleaning_fee,
+            Apartment.deposit_amount,
+            Apartment.currency,
+        ).where(Apartment.is_active, Apartment.uid.in_(apartment_uids))
+
+        result = await session.exec(statement)
+
+        return result.all()
+
+    async def search_text(self, query: str, limit: int, session: AsyncSession):
+        terms = query_terms(query)
+        if not terms:
+            return []
+
+        matches, score = text_match(query, terms)
+        score = score.label("score")
+
+        # prag za %> vazi samo do kraja ove transakcije
+        await session.exec(select(func.set_config(
+            "pg_trgm.word_similarity_threshold", str(Config.APARTMENT_TEXT_SEARCH_SIMILARITY), True,
+        )))
+
+        statement = (
+            select(Apartment, score)
+            .where(Apartment.is_active, matches)
+            .order_by(score.desc(), Apartment.uid)
+            .limit(limit)
+        )
+
+        result = await session.exec(statement)
+
+        return result.all()
+
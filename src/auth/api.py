@@ -1,30 +1,32 @@
-from fastapi import APIRouter, status, Depends, Request, BackgroundTasks, Response, Form
+from fastapi import APIRouter, status, Depends, Request, BackgroundTasks, Response, Form, Query
 from fastapi.responses import JSONResponse
 from fastapi.responses import HTMLResponse
-from typing import List
+from typing import List, Literal, Optional
 from fastapi.exceptions import HTTPException
-from .serializers import UserCreateSerializer, UserLoginSerializer, UsernameChangeSerializer, EmailChangeSerializer, UserLoginSerializerOpt, PasswordResetSerializerNoLogin
+from .serializers import UserCreateSerializer, UserLoginSerializer, UsernameChangeSerializer, EmailChangeSerializer, UserLoginSerializerOpt, PasswordResetSerializerNoLogin, UserPage, user_row_adapter, user_page_adapter
 from .model import User
 from .service import UserService
+from .email_check import email_checker
 from sqlmodel.ext.asyncio.session import AsyncSession
-from ..db.main import get_session
+from ..db.main import get_session, async_session
+from ..db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, next_cursor
 from ..db.redis import add_jti_to_blocklist
 from .dependencies import AccessTokenBearer
 from .utils import (
-    generate_password_hash,
+    password_hasher,
+    token_cache,
     create_access_token,
-    verify_password_hash,
     decode_url_safe_token,
     create_url_safe_token
 )
 from datetime import timedelta
 from starlette.templating import Jinja2Templates
 from src.config import Config
-from ..mail import create_message, mail
-from .dependencies import get_current_user
+from ..mail_queue import enqueue_mail
+from ..mail_templates import render_mail
+from .dependencies import get_current_user, RoleChecker
 
 from fastapi.responses import StreamingResponse
-import pyotp
 
 
 REFRESH_TOKEN_EXPIRY = 2
@@ -38,31 +40,48 @@ templates = Jinja2Templates(directory="src/templates")
 # =========================================================ALL_USER====================================================================
 
 
-@auth_router.post("/all_users", response_model=List[User])
-async def get_all_users(session: AsyncSession = Depends(get_session)):
-    # role = user_details.get('user', {}).get("role")
-    role = "admin"
-    if role == "admin":
-        users = await user_service.get_all_users(session)
-        return users
-    else:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="You are not allowed")
+@auth_router.post("/all_users", response_model=UserPage, dependencies=[Depends(RoleChecker(["admin"]))])
+async def get_all_users(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    session: AsyncSession = Depends(get_session),
+):
+    after = decode_cursor(cursor) if cursor else None
+
+    if format == "ndjson":
+        # izvoz svih korisnika, samo javna polja (user_row_adapter)
+        async def rows():
+            async with async_session() as stream_session:
+                async for user in user_service.stream_all_users(stream_session, after):
+                    yield user_row_adapter.dump_json(user) + b"\n"
+
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    users = await user_service.get_all_users(session, limit, after)
+    content = user_page_adapter.dump_json({"items": users[:limit], "next_cursor": next_cursor(users, limit)})
+    return Response(content=content, media_type="application/json")
 
 
 @auth_router.get('/me')
 async def get_curr_user(current_user = Depends(get_current_user)):
-    return current_user
+    return Response(content=user_row_adapter.dump_json(current_user), media_type="application/json")
 
 
 # =========================================================CREATE_USER====================================================================
 
 
 @auth_router.post("/singup", status_code=status.HTTP_201_CREATED)
-async def create_user(user_data: UserCreateSerializer, bg_tasks: BackgroundTasks, session: AsyncSession = Depends(get_session)):
+async def create_user(user_data: UserCreateSerializer, session: AsyncSession = Depends(get_session)):
     email = user_data.email
     username = user_data.username
     ucin = user_data.UCIN
 
+    email_error = await email_checker.check(email)
+
+    if email_error:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Invalid email address: {email_error}")
+
     user_exists = await user_service.user_exists(email, username, ucin, session)
 
     if user_exists:
@@ -74,19 +93,14 @@ async def create_user(user_data: UserCreateSerializer, bg_tasks: BackgroundTasks
 
     link = f"http://{Config.DOMAIN}/api/v1/auth/verify/{token}"
 
-    html_message = templates.TemplateResponse(
-        "verify_account_mail.html",
-        {"request": None, "link": link}
-    ).body.decode("utf-8") 
+    html_message = await render_mail("verify_account_mail.html", link=link)
 
-    message = create_message(
+    await enqueue_mail(
         recipients=[email],
         subject="Verify your Email",
         body=html_message,
     )
 
-    bg_tasks.add_task(mail.send_message, message)
-
     return {
         "message": "Account verification email sent",
         "user": new_user
@@ -116,6 +130,8 @@ async def if2falogin_users(login_data: UserLoginSerializerOpt, session: AsyncSes
 
     user = await user_service.get_user_by_email(login_data.email, session)
 
+    import pyotp
+
     totp = pyotp.TOTP(user.totp_secret)
     if not totp.verify(login_data.otp_code, valid_window=1):  # valid_window dozvoljava malo kašnjenje
         # print("===============================")
@@ -140,7 +156,7 @@ async def if2falogin_users(login_data: UserLoginSerializerOpt, session: AsyncSes
         refresh=True,
         expiry=timedelta(days=REFRESH_TOKEN_EXPIRY)
     )
-    user_service.reset_failed_login(login_data.email)
+    await user_service.reset_failed_login(login_data.email)
     return JSONResponse(
         content={
             "message": "Successfully logged in",
@@ -160,7 +176,7 @@ async def login_users(login_data: UserLoginSerializer, session: AsyncSession = D
     email = login_data.email
     password_hash = login_data.password_hash
 
-    if user_service.is_user_blocked(email):
+    if await user_service.register_login_attempt(email):
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="To many failed login attempts, please try again later."
@@ -170,7 +186,7 @@ async def login_users(login_data: UserLoginSerializer, session: AsyncSession = D
 
     if user is not None:
         if user.is_verified:
-            password_valid = verify_password_hash(password_hash, user.password_hash)
+            password_valid = await password_hasher.verify(password_hash, user.password_hash)
             if password_valid:
                 if not user.enabled_2fa:
                     access_token = create_access_token(
@@ -190,7 +206,7 @@ async def login_users(login_data: UserLoginSerializer, session: AsyncSession = D
                         refresh=True,
                         expiry=timedelta(days=REFRESH_TOKEN_EXPIRY)
                     )
-                    user_service.reset_failed_login(email)
+                    await user_service.reset_failed_login(email)
                     return JSONResponse(
                         content={
                             "message": "Successfully logged in",
@@ -204,6 +220,8 @@ async def login_users(login_data: UserLoginSerializer, session: AsyncSession = D
                         }
                     )
                 else:
+                    # lozinka je dobra, pokusaj se ne racuna kao neuspesan
+                    await user_service.reset_failed_login(email)
                     return JSONResponse(
                         content={
                             "message": "2FA required",
@@ -217,7 +235,6 @@ async def login_users(login_data: UserLoginSerializer, session: AsyncSession = D
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Account is not verified, check your email",
             )
-    user_service.increment_failed_login(email)
     raise HTTPException(
         status_code=status.HTTP_403_FORBIDDEN,
         detail="Invalid email or password",
@@ -230,6 +247,7 @@ async def logout(token_details: dict = Depends(AccessTokenBearer())):
     jti = token_details['jti']
 
     await add_jti_to_blocklist(jti)
+    token_cache.evict_jti(jti)
 
     return JSONResponse(
         content={
@@ -282,6 +300,11 @@ async def update_username(data: UsernameChangeSerializer, session: AsyncSession
 
 @auth_router.patch("/update-email")
 async def update_email(data: EmailChangeSerializer, session: AsyncSession = Depends(get_session)):
+    email_error = await email_checker.check(data.new_email)
+
+    if email_error:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Invalid new_email address: {email_error}")
+
     updated_user = await user_service.update_email(data.user_uid, data.new_email, session)
     return {"message": "Email updated successfully", "user": updated_user}
 
@@ -304,7 +327,7 @@ async def delete_user(user_uid: str, session: AsyncSession = Depends(get_session
 
 
 @auth_router.post('/password_reset_request')
-async def password_reset_request(bg_tasks: BackgroundTasks, user_details=Depends(access_token_bearer)):
+async def password_reset_request(user_details=Depends(access_token_bearer)):
     email = user_details.get('user', {}).get("email")
 
     if not email:
@@ -315,18 +338,13 @@ async def password_reset_request(bg_tasks: BackgroundTasks, user_details=Depends
 
     link = f"http://{Config.DOMAIN}/api/v1/auth/password_reset_confirm/{token}"
 
-    html_message = f"""
-                    <h1>Reset your password</h1>
-                    <p>Please reset your password. <a href="{link}">Reset here</a> </p>
-                    """
+    html_message = await render_mail("password_reset_mail.html", link=link)
 
-    message = create_message(
-                recipients=[email],
-                subject="Reset your password",
-                body=html_message,
-            )
-    
-    bg_tasks.add_task(mail.send_message, message)
+    await enqueue_mail(
+        recipients=[email],
+        subject="Reset your password",
+        body=html_message,
+    )
 
     return JSONResponse(
         content={
@@ -337,7 +355,7 @@ async def password_reset_request(bg_tasks: BackgroundTasks, user_details=Depends
 
 
 @auth_router.post('/password_reset_request_no_login')
-async def password_reset_request_no_login(user_data: PasswordResetSerializerNoLogin, bg_tasks: BackgroundTasks):
+async def password_reset_request_no_login(user_data: PasswordResetSerializerNoLogin):
     email = user_data.email
 
     if not email:
@@ -348,18 +366,13 @@ async def password_reset_request_no_login(user_data: PasswordResetSerializerNoLo
 
     link = f"http://{Config.DOMAIN}/api/v1/auth/password_reset_confirm/{token}"
 
-    html_message = f"""
-                    <h1>Reset your password</h1>
-                    <p>Please reset your password. <a href="{link}">Reset here</a> </p>
-                    """
+    html_message = await render_mail("password_reset_mail.html", link=link)
 
-    message = create_message(
-                recipients=[email],
-                subject="Reset your password",
-                body=html_message,
-            )
-    
-    bg_tasks.add_task(mail.send_message, message)
+    await enqueue_mail(
+        recipients=[email],
+        subject="Reset your password",
+        body=html_message,
+    )
 
     return JSONResponse(
         content={
@@ -408,7 +421,7 @@ async def reset_user_password(
                 detail="User not found"
             )
 
-        passwd_hash = generate_password_hash(new_password)
+        passwd_hash = await password_hasher.hash(new_password)
 
         await user_service.update_user_email_verify(user, {"password_hash": passwd_hash}, session)
 
@@ -433,18 +446,17 @@ async def reset_user_password(
 
 
 @auth_router.get("/2fa/qr-code/{username}")
-async def get_2fa_qr_code(username: str, session: AsyncSession = Depends(get_session)):
-    user = await user_service.get_user_by_username(username, session)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    
-    secret = user_service.generate_secret()
+async def get_2fa_qr_code(username: str, current_user = Depends(get_current_user), session: AsyncSession = Depends(get_session)):
+    # QR sadrzi TOTP secret, dobija ga samo vlasnik naloga
+    if current_user is None or current_user.username != username:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not allowed to perform this action")
 
-    await user_service.update_totp(user.uid, secret, session)
-    await user_service.update_enabled_2fa(user.uid, session)
+    secret = await user_service.enroll_2fa(current_user.uid, session)
+    if not secret:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    img_buf = user_service.get_qr_code(username, secret)
-    return StreamingResponse(img_buf, media_type="image/png")
+    png = await user_service.get_qr_code_png(username, secret)
+    return Response(content=png, media_type="image/png")
 
 
 @auth_router.post('/disable_2fa')
@@ -476,7 +488,6 @@ async def disable_2fa(user_details=Depends(access_token_bearer), session: AsyncS
 # ====================================================CHAT================================================================
 
 
-import requests
 rasa_router = APIRouter()
 
 RASA_SERVER_URL = "http://localhost:5005/webhooks/rest/webhook"
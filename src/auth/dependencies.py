@@ -2,8 +2,8 @@ from fastapi.exceptions import HTTPException
 from fastapi import Request, status, Depends
 from fastapi.security import HTTPBearer
 from fastapi.security.http import HTTPAuthorizationCredentials
-from .utils import decode_token
-from src.db.redis import token_in_blocklist
+from .utils import decode_token_cached
+from src.db.revocation import revocation_filter
 from src.db.main import get_session
 from sqlmodel.ext.asyncio.session import AsyncSession
 from .service import UserService
@@ -22,20 +22,20 @@ class TokenBearer(HTTPBearer):
 
         token = creds.credentials
 
-        token_data = decode_token(token)
+        token_data = decode_token_cached(token)
 
-        if not self.token_valid(token):
+        if token_data is None:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={
                 "error": "This token is invalid or expired",
                 "resolution": "Please get new token"
             })
 
-        # POTREBAN REDIS DA BI SE OVO KORISTILO, PROVERAVA BLOKIRANE TOKENE KOJI SE CUVAJU U REDISU
-        # if await token_in_blocklist(token_data['jti']):
-        #     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={
-        #         "error": "This token is invalid or has been revoked",
-        #         "resolution": "Please get new token"
-        #     })
+        # bloom filter u procesu, Redis se pita samo kada filter kaze "mozda"
+        if await revocation_filter.is_revoked(token_data['jti']):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={
+                "error": "This token is invalid or has been revoked",
+                "resolution": "Please get new token"
+            })
 
         self.verify_token_data(token_data)
 
@@ -43,7 +43,7 @@ class TokenBearer(HTTPBearer):
 
     def token_valid(self, token : str) -> bool:
 
-        token_data = decode_token(token)
+        token_data = decode_token_cached(token)
 
         if token_data is not None:
             return True
@@ -67,9 +67,9 @@ class RefreshTokenBearer(TokenBearer):
 
 
 async def get_current_user(token_details: dict = Depends(AccessTokenBearer()), sessio: AsyncSession = Depends(get_session)):
-    user_email = token_details['user']['email']
+    user_uid = token_details['user']['user_uid']
 
-    user = await user_service.get_user_by_email(user_email, sessio)
+    user = await user_service.get_user_by_uid(user_uid, sessio)
 
     return user
 
@@ -78,7 +78,7 @@ class RoleChecker:
     def __init__(self, allowed_roles: List[str]) -> None:
         self.allowed_roles = allowed_roles
 
-    def __class__(self, current_user : User = Depends(get_current_user)) -> Any:
+    def __call__(self, current_user : User = Depends(get_current_user)) -> Any:
         if current_user.role in self.allowed_roles:
             return True
         raise HTTPException(
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+
+from email_validator import validate_email, EmailNotValidError, EmailUndeliverableError
+from email_validator.deliverability import validate_email_deliverability
+from redis.exceptions import RedisError
+from starlette.concurrency import run_in_threadpool
+
+from src.config import Config
+from src.db.cache import LRUCache
+from src.db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# presuda za domen: "" znaci isporucivo, inace razlog odbijanja
+DELIVERABLE = ""
+
+
+async def dns_resolver(domain: str, domain_i18n: str) -> str:
+    try:
+        # email_validator radi sinhroni DNS upit, zato ide u thread pool
+        await run_in_threadpool(validate_email_deliverability, domain, domain_i18n)
+        return DELIVERABLE
+    except EmailUndeliverableError as e:
+        return str(e)
+
+
+class StubResolver:
+    """Resolver for tests: no DNS, fixed verdicts, optional latency."""
+
+    def __init__(self, undeliverable: dict[str, str] | None = None, delay: float = 0.0):
+        self.undeliverable = undeliverable or {}
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self, domain: str, domain_i18n: str) -> str:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.undeliverable.get(domain, DELIVERABLE)
+
+
+class DeliverabilityChecker:
+    """
+    Domain deliverability verdicts, positive and negative, cached in process
+    and in Redis so all workers share one DNS lookup per domain per TTL.
+    """
+
+    def __init__(self, resolver=dns_resolver, ttl: int = 86400, negative_ttl: int = 3600, enabled: bool = True):
+        self.resolver = resolver
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.enabled = enabled
+        self.local = LRUCache(maxsize=4096)
+
+    @staticmethod
+    def _key(domain: str) -> str:
+        return f"email_domain:{domain}"
+
+    async def check(self, email: str) -> str | None:
+        """Returns the reason the address is undeliverable, or None."""
+        if not self.enabled:
+            return None
+
+        try:
+            valid = validate_email(email, check_deliverability=False)
+        except EmailNotValidError as e:
+            return str(e)
+
+        domain = valid.ascii_domain
+        verdict = self.local.get(domain)
+
+        if verdict is None:
+            try:
+                cached = await get_redis().get(self._key(domain))
+                verdict = cached.decode() if cached is not None else None
+            except RedisError as e:
+                logger.warning("email domain cache read failed for %s: %s", domain, e)
+
+        if verdict is None:
+            verdict = await self.resolver(domain, valid.domain)
+            ttl = self.ttl if verdict == DELIVERABLE else self.negative_ttl
+            try:
+                await get_redis().set(self._key(domain), verdict, ex=ttl)
+            except RedisError as e:
+                logger.warning("email domain cache write failed for %s: %s", domain, e)
+
+        self.local.set(domain, verdict, ttl=self.ttl if verdict == DELIVERABLE else self.negative_ttl)
+
+        return verdict or None
+
+
+email_checker = DeliverabilityChecker(
+    ttl=Config.EMAIL_DOMAIN_CACHE_TTL,
+    negative_ttl=Config.EMAIL_DOMAIN_NEGATIVE_TTL,
+    enabled=Config.EMAIL_CHECK_DELIVERABILITY,
+)
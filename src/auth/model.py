@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from typing import Optional, List, TYPE_CHECKING
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, func
 from datetime import datetime
 import uuid
 from enum import Enum
@@ -13,32 +14,40 @@ class GenderEnum(str, Enum):
     male = "male"
     female = "female"
 
-class User(SQLModel, table=True):
-    __tablename__ = "users"
-
+class UserPublic(SQLModel):
+    # polja koja API vraca o korisniku; lozinka i TOTP secret postoje samo u User
     uid: uuid.UUID = Field(
         default_factory=uuid.uuid4, primary_key=True
     )
 
-    username: str
-    password_hash: str
-    email: str
+    username: str = Field(unique=True, index=True)
+    email: str = Field(unique=True, index=True)
     first_name: str
     last_name: str
-    UCIN: str
+    UCIN: str = Field(unique=True, index=True)
     date_of_birth: str
     gender: GenderEnum
     is_verified: bool = Field(default=False)
     role: str = Field(default="clan")
 
-    totp_secret: Optional[str] = None
     enabled_2fa: bool = Field(default=False)
 
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
 
+
+class User(UserPublic, table=True):
+    __tablename__ = "users"
+
+    password_hash: str
+    totp_secret: Optional[str] = None
+
     # Use SQLModel's Relationship instead of SQLAlchemy's
     # apartments: List["Apartment"] = Relationship(back_populates="owner")
 
     def __repr__(self):
-        return f"<User {self.username}>"
\ No newline at end of file
+        return f"<User {self.username}>"
+
+
+# case-insensitive pretraga po email-u (user_exists)
+Index("ix_users_email_lower", func.lower(User.__table__.c.email))
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import uuid
+
+from redis.exceptions import RedisError
+
+from src.config import Config
+from src.db.cache import LRUCache
+from src.db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+USER_PROFILES_CHANNEL = "user_profiles"
+
+
+class UserProfileCache:
+    """
+    Per-worker LRU of user profiles keyed by uid. Every write publishes the
+    uid on a Redis channel and each worker drops its copy, so a changed role,
+    password hash or 2FA state is not served from another worker. Loads take
+    the generation before their SELECT and are not stored if an invalidation
+    arrived in between. While the subscription is down the cache is bypassed.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.generation = 0
+        self.ready = False
+        self._task = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._disable()
+
+    def get(self, uid: uuid.UUID) -> dict | None:
+        if not self.ready:
+            return None
+        return self.local.get(uid)
+
+    def set(self, uid: uuid.UUID, profile: dict, generation: int) -> None:
+        # generation: vrednost self.generation procitana pre SELECT-a
+        if self.ready and generation == self.generation:
+            self.local.set(uid, profile)
+
+    def drop(self, uid: uuid.UUID) -> None:
+        self.generation += 1
+        self.local.pop(uid)
+
+    async def invalidate(self, uid: uuid.UUID) -> None:
+        # poziva se posle commit-a; svoj worker odmah, ostali kroz kanal
+        self.drop(uid)
+        try:
+            await get_redis().publish(USER_PROFILES_CHANNEL, str(uid))
+        except RedisError as e:
+            logger.warning("user profile invalidation for %s not published: %s", uid, e)
+
+    def _disable(self) -> None:
+        self.ready = False
+        self.generation += 1
+        self.local.clear()
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with get_redis().pubsub() as pubsub:
+                    await pubsub.subscribe(USER_PROFILES_CHANNEL)
+                    # sve sto je upisano dok kanal nije slusan moze biti zastarelo
+                    self.local.clear()
+                    self.ready = True
+
+                    while True:
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if message is not None:
+                            self.drop(uuid.UUID(message["data"].decode()))
+            except Exception as e:
+                self._disable()
+                logger.warning("user profile cache disconnected, loading users from the database: %s", e)
+                await asyncio.sleep(5)
+
+
+user_profiles = UserProfileCache(maxsize=Config.USER_PROFILE_CACHE_SIZE, ttl=Config.USER_PROFILE_CACHE_TTL)
@@ -2,10 +2,11 @@ from enum import Enum
 from typing import List, Optional
 from datetime import datetime
 from email_validator import validate_email as email_check, EmailNotValidError
-from pydantic import BaseModel, field_validator, Field
+from pydantic import BaseModel, field_validator, Field, TypeAdapter
+from typing_extensions import TypedDict
 import uuid
 import re
-from .model import GenderEnum
+from .model import GenderEnum, UserPublic
 
 class UserSerializer(BaseModel):
     uid: uuid.UUID
@@ -26,6 +27,25 @@ class UserSerializer(BaseModel):
     update_at: datetime
 
 
+class UserPage(BaseModel):
+    items: List[UserPublic]
+    next_cursor: Optional[str] = None
+
+
+# =====================PRECOMPILED SERIALIZERS=======================
+# User redovi iz baze se serijalizuju direktno, bez ponovne validacije.
+# Semu daje UserPublic, pa password_hash i totp_secret ne izlaze iz API-ja
+
+class UserRowPage(TypedDict):
+    items: List[UserPublic]
+    next_cursor: Optional[str]
+
+
+user_row_adapter = TypeAdapter(UserPublic)
+user_page_adapter = TypeAdapter(UserRowPage)
+# ===================================================================
+
+
 class GenderEnumSerializer(str, Enum):
     male = "Male"
     female = "Female"
@@ -55,7 +75,7 @@ class UserCreateSerializer(BaseModel):
     @classmethod
     def validate_email(cls, value: str) -> str:
         try:
-            valid = email_check(value)
+            valid = email_check(value, check_deliverability=False)
             return valid.email
         except EmailNotValidError as e:
             raise ValueError(f"Invalid email address: {str(e)}")
@@ -139,7 +159,7 @@ class EmailChangeSerializer(BaseModel):
     @classmethod
     def validate_email(cls, value: str) -> str:
         try:
-            valid = email_check(value)
+            valid = email_check(value, check_deliverability=False)
             return valid.email
         except EmailNotValidError as e:
             raise ValueError(f"Invalid new_email address: {str(e)}")
\ No newline at end of file
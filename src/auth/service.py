@@ -2,41 +2,90 @@ from .model import User
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select
 from .serializers import UserCreateSerializer
-from .utils import generate_password_hash
-from sqlalchemy import or_
+from .utils import password_hasher
+from sqlalchemy import or_, and_, case, func, update
+from sqlalchemy.orm import make_transient_to_detached
 from fastapi import Depends, HTTPException, status
+from starlette.concurrency import run_in_threadpool
 import re
+import uuid
 
-import pyotp
-import qrcode
 from io import BytesIO
+from src.db import redis
+from src.db.cache import LRUCache
+from .profile_cache import user_profiles
+from src.config import Config
 
 MAX_FAILED_ATTEMPTS = 5
 BLOCK_DURATION_SECONDS = 600  # 10 minuta
-import redis
-r = redis.Redis(host="localhost", port=6379, db=0, decode_responses=True)
+
+# PNG QR kodovi po (username, secret)
+qr_codes = LRUCache(maxsize=1024)
 
 class UserService:
 
-    async def get_all_users(self, session: AsyncSession):
-        statement = select(User).order_by(User.uid)
+    async def get_all_users(self, session: AsyncSession, limit: int, after: uuid.UUID | None = None):
+        statement = select(User).order_by(User.uid).limit(limit + 1)
+
+        if after is not None:
+            statement = statement.where(User.uid > after)
 
         result = await session.exec(statement)
 
         return result.all()
 
 
+    async def stream_all_users(self, session: AsyncSession, after: uuid.UUID | None = None):
+        statement = select(User).order_by(User.uid).execution_options(yield_per=1000)
+
+        if after is not None:
+            statement = statement.where(User.uid > after)
+
+        result = await session.stream_scalars(statement)
+
+        async for user in result:
+            yield user
+
+
     # ==================================================================================================
 
 
+    # identity map po zahtevu: sesija je jedna po zahtevu pa session.info zivi koliko i zahtev
+    def _identity_map(self, session: AsyncSession) -> dict:
+        return session.info.setdefault("users", {})
+
+
+    def _remember(self, user: User | None, session: AsyncSession, generation: int | None = None):
+        # generation: user_profiles.generation pre SELECT-a, samo tada profil ide u kes
+        if user is not None:
+            users = self._identity_map(session)
+            users[("uid", user.uid)] = user
+            users[("email", user.email)] = user
+            if generation is not None:
+                user_profiles.set(user.uid, user.model_dump(), generation)
+
+        return user
+
+
+    def _forget(self, user: User, session: AsyncSession):
+        users = self._identity_map(session)
+        users.pop(("uid", user.uid), None)
+        users.pop(("email", user.email), None)
+
+
     async def get_user_by_email(self, email: str, session: AsyncSession):
+        user = self._identity_map(session).get(("email", email))
+        if user is not None:
+            return user
+
+        generation = user_profiles.generation
         statement = select(User).where(User.email == email)
 
         result = await session.exec(statement)
 
         user = result.first()
 
-        return user
+        return self._remember(user, session, generation)
 
 
     async def get_user_by_first_name(self, first_name: str, session: AsyncSession):
@@ -100,13 +149,31 @@ class UserService:
 
 
     async def get_user_by_uid(self, uid: str, session: AsyncSession):
+        try:
+            uid = uid if isinstance(uid, uuid.UUID) else uuid.UUID(str(uid))
+        except ValueError:
+            return None
+
+        user = self._identity_map(session).get(("uid", uid))
+        if user is not None:
+            return user
+
+        profile = user_profiles.get(uid)
+        if profile is not None:
+            # profil iz kesa se kaci na sesiju bez SELECT-a
+            cached_user = User.model_validate(profile)
+            make_transient_to_detached(cached_user)
+            user = await session.merge(cached_user, load=False)
+            return self._remember(user, session)
+
+        generation = user_profiles.generation
         statement = select(User).where(User.uid == uid)
 
         result = await session.exec(statement)
 
         user = result.first()
 
-        return user
+        return self._remember(user, session, generation)
 
 
     # ==================================================================================================
@@ -114,7 +181,7 @@ class UserService:
 
     async def user_exists(self, email: str, username: str, ucin: str, session: AsyncSession):
         result = await session.exec(
-            select(User).where((User.email == email) | (User.username == username) | (User.UCIN == ucin))
+            select(User).where((func.lower(User.email) == email.lower()) | (User.username == username) | (User.UCIN == ucin))
         )
         return result.first() is not None
 
@@ -126,7 +193,7 @@ class UserService:
             **user_data_dict
         )
 
-        new_user.password_hash = generate_password_hash(user_data_dict["password_hash"])
+        new_user.password_hash = await password_hasher.hash(user_data_dict["password_hash"])
 
         session.add(new_user)
 
@@ -142,7 +209,7 @@ class UserService:
             **user_data_dict
         )
 
-        new_user.password_hash = generate_password_hash(user_data_dict["password_hash"])
+        new_user.password_hash = await password_hasher.hash(user_data_dict["password_hash"])
         new_user.role = "admin"
         new_user.is_verified = True
 
@@ -160,7 +227,7 @@ class UserService:
             **user_data_dict
         )
 
-        new_user.password_hash = generate_password_hash(user_data_dict["password_hash"])
+        new_user.password_hash = await password_hasher.hash(user_data_dict["password_hash"])
         new_user.role = "role_name"
         # new_user.is_approved = True
         # new_user.is_active = True
@@ -182,10 +249,14 @@ class UserService:
         user_to_delete = await self.get_user_by_uid(user_uid, session)
 
         if user_to_delete is not None:
+            self._forget(user_to_delete, session)
+
             await session.delete(user_to_delete)
 
             await session.commit()
 
+            await user_profiles.invalidate(user_to_delete.uid)
+
             return {}
 
         else:
@@ -197,6 +268,8 @@ class UserService:
             setattr(user, k, v)
         await session.commit()
 
+        await user_profiles.invalidate(user.uid)
+
         return user
 
 
@@ -206,6 +279,8 @@ class UserService:
 
         await session.commit()
 
+        await user_profiles.invalidate(user.uid)
+
         return user
 
 
@@ -222,7 +297,7 @@ class UserService:
 
         user.username = new_username
         await session.commit()
-        await session.refresh(user)
+        await user_profiles.invalidate(user.uid)
 
         return user
     
@@ -236,9 +311,11 @@ class UserService:
         if not user:
             raise ValueError("User not found")
 
+        self._forget(user, session)
         user.email = new_email
         await session.commit()
-        await session.refresh(user)
+        self._remember(user, session)
+        await user_profiles.invalidate(user.uid)
 
         return user
     
@@ -250,7 +327,7 @@ class UserService:
 
         user.totp_secret = new_totp
         await session.commit()
-        await session.refresh(user)
+        await user_profiles.invalidate(user.uid)
 
 
     async def update_enabled_2fa(self, user_uid: str, session: AsyncSession):
@@ -260,7 +337,7 @@ class UserService:
 
         user.enabled_2fa = True
         await session.commit()
-        await session.refresh(user)
+        await user_profiles.invalidate(user.uid)
 
 
     async def validate_password_complexity(self, password: str):
@@ -298,16 +375,63 @@ class UserService:
 
 
     def generate_secret(self):
+        import pyotp
+
         return pyotp.random_base32()
 
 
     def get_qr_code(self, username: str, secret: str):
+        # pyotp i qrcode (sa PIL-om) se ucitavaju tek kada zatrebaju
+        import pyotp
+        import qrcode
+
         otp_uri = pyotp.totp.TOTP(secret).provisioning_uri(name=username, issuer_name="MyApp")
         img = qrcode.make(otp_uri)
         buf = BytesIO()
         img.save(buf)
         buf.seek(0)
         return buf
+
+
+    async def get_qr_code_png(self, username: str, secret: str) -> bytes:
+        png = qr_codes.get((username, secret))
+        if png is None:
+            # generisanje slike je CPU posao, ne radi se na event loop-u
+            buf = await run_in_threadpool(self.get_qr_code, username, secret)
+            png = buf.getvalue()
+            qr_codes.set((username, secret), png)
+
+        return png
+
+
+    async def enroll_2fa(self, uid: uuid.UUID, session: AsyncSession) -> str | None:
+        """
+        Enables 2FA in a single UPDATE ... RETURNING. An already enrolled user
+        keeps the existing secret so the authenticator app stays valid. Takes
+        the uid of the authenticated user, the secret is only for its owner.
+        """
+        already_enrolled = and_(User.enabled_2fa, func.coalesce(User.totp_secret, "") != "")
+
+        statement = (
+            update(User)
+            .where(User.uid == uid)
+            .values(
+                totp_secret=case((already_enrolled, User.totp_secret), else_=self.generate_secret()),
+                enabled_2fa=True,
+            )
+            .returning(User.uid, User.totp_secret)
+        )
+
+        result = await session.exec(statement)
+        row = result.first()
+        await session.commit()
+
+        if row is None:
+            return None
+
+        await user_profiles.invalidate(row.uid)
+
+        return row.totp_secret
     
     async def deactivate_2FA(self, email: str, session: AsyncSession):
         user = await self.get_user_by_email(email, session)
@@ -318,7 +442,7 @@ class UserService:
         user.enabled_2fa = False
         session.add(user)
         await session.commit()
-        await session.refresh(user)
+        await user_profiles.invalidate(user.uid)
 
 
     # ==================================================================================================
@@ -327,16 +451,12 @@ class UserService:
     def get_failed_attempts_key(self, email: str) -> str:
         return f"{email}"
 
-    def increment_failed_login(self, email: str):
-        key = self.get_failed_attempts_key(email)
-        r.incr(key)
-        r.expire(key, BLOCK_DURATION_SECONDS)
-
-    def reset_failed_login(self, email: str):
+    async def register_login_attempt(self, email: str) -> bool:
+        # True ako je nalog blokiran; inace je pokusaj vec upisan, uspesan login ga brise sa reset_failed_login
         key = self.get_failed_attempts_key(email)
-        r.delete(key)
+        _, blocked = await redis.register_login_attempt(key, BLOCK_DURATION_SECONDS, MAX_FAILED_ATTEMPTS)
+        return blocked
 
-    def is_user_blocked(self, email: str) -> bool:
+    async def reset_failed_login(self, email: str):
         key = self.get_failed_attempts_key(email)
-        attempts = int(r.get(key) or 0)
-        return attempts >= MAX_FAILED_ATTEMPTS
\ No newline at end of file
+        await redis.reset_failed_login(key)
\ No newline at end of file
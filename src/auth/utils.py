@@ -1,13 +1,18 @@
 import uuid
+import os
+import hashlib
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 import jwt
-from starlette.templating import Jinja2Templates
 from src.config import *
 import logging
 from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
-from fastapi import HTTPException, Request
+from fastapi import HTTPException, Request, status
 from fastapi.responses import HTMLResponse
+from src.db.cache import LRUCache
 
 ACCESS_TOKEN_EXPIRE = 3600
 
@@ -25,6 +30,82 @@ def generate_password_hash(password: str) -> str:
 def verify_password_hash(password: str, hashed_password: str) -> bool:
     return password_context.verify(password, hashed_password)
 
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a worker pool so the event loop
+    keeps serving other requests. Calls beyond workers + max_queue are
+    rejected with 503 instead of piling up.
+    """
+
+    def __init__(self, executor: str = "thread", workers: int = 0, max_queue: int = 64):
+        self.executor_type = executor
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = self.workers + max_queue
+        self.pending = 0
+        self.rejected = 0
+        self.timings = {
+            "hash": {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0},
+            "verify": {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0},
+        }
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, operation: str, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again later.",
+            )
+
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.pending -= 1
+            elapsed = time.perf_counter() - start
+            timing = self.timings[operation]
+            timing["count"] += 1
+            timing["total_seconds"] += elapsed
+            timing["max_seconds"] = max(timing["max_seconds"], elapsed)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", generate_password_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run("verify", verify_password_hash, password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.executor_type,
+            "workers": self.workers,
+            "pending": self.pending,
+            "rejected": self.rejected,
+            "timings": self.timings,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor=Config.PASSWORD_HASH_EXECUTOR,
+    workers=Config.PASSWORD_HASH_WORKERS,
+    max_queue=Config.PASSWORD_HASH_MAX_QUEUE,
+)
+
 # ===============================================================================
 
 def create_access_token(user_data: dict, expiry: timedelta = None, refresh: bool = False):
@@ -57,9 +138,55 @@ def decode_token(token: str) -> dict:
         return None
 
 
-# ===============================================================================
+class TokenCache:
+    """
+    Verified JWT claims keyed by token digest, kept until the token's exp.
+    Entries can be dropped by jti when a token is revoked.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self._claims = LRUCache(maxsize=maxsize)
+        self._digests = LRUCache(maxsize=maxsize)
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict | None:
+        return self._claims.get(self.digest(token))
+
+    def set(self, token: str, claims: dict) -> None:
+        ttl = claims.get("exp", 0) - time.time()
+        if ttl <= 0:
+            return
+
+        digest = self.digest(token)
+        self._claims.set(digest, claims, ttl=ttl)
+        if "jti" in claims:
+            self._digests.set(claims["jti"], digest, ttl=ttl)
+
+    def evict_jti(self, jti: str) -> None:
+        digest = self._digests.pop(jti)
+        if digest is not None:
+            self._claims.pop(digest)
 
-templates = Jinja2Templates(directory="src/templates")
+
+token_cache = TokenCache(maxsize=Config.TOKEN_CACHE_SIZE)
+
+
+def decode_token_cached(token: str) -> dict | None:
+    token_data = token_cache.get(token)
+    if token_data is not None:
+        return token_data
+
+    token_data = decode_token(token)
+    if token_data is not None:
+        token_cache.set(token, token_data)
+
+    return token_data
+
+
+# ===============================================================================
 
 serializer = URLSafeTimedSerializer(
     secret_key=Config.JWT_SECRET,
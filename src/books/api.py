@@ -1,21 +1,44 @@
-from fastapi import APIRouter, status, Depends
+from fastapi import APIRouter, status, Depends, Query
 from fastapi.exceptions import HTTPException
-from ..books.serializers import Book, BookCreateModel
-from typing import List
+from fastapi.responses import Response, StreamingResponse
+from ..books.serializers import Book, BookCreateModel, BookPage, book_row_adapter, book_page_adapter
+from typing import List, Literal, Optional
 from src.books.service import BookService
+from src.books.cache import book_cache, book_key, page_key, LIST_GROUP
 
-from src.db.main import get_session
+from src.db.main import get_session, async_session
+from src.db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, next_cursor
 from sqlalchemy.ext.asyncio import AsyncSession
 
 book_router = APIRouter()
 book_service = BookService()
 
 
-@book_router.get("/all", response_model=List[Book])
-async def get_all_books(session: AsyncSession = Depends(get_session)):
-    books = await book_service.get_all_books(session)
+@book_router.get("/all", response_model=BookPage)
+async def get_all_books(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    session: AsyncSession = Depends(get_session),
+):
+    after = decode_cursor(cursor) if cursor else None
 
-    return books
+    if format == "ndjson":
+        # stream otvara svoju sesiju, sesija iz zavisnosti se zatvara pre slanja tela odgovora
+        async def rows():
+            async with async_session() as stream_session:
+                async for book in book_service.stream_all_books(stream_session, after):
+                    yield book_row_adapter.dump_json(book) + b"\n"
+
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    async def load_page():
+        books = await book_service.get_all_books(session, limit, after)
+        return book_page_adapter.dump_json({"items": books[:limit], "next_cursor": next_cursor(books, limit)})
+
+    content = await book_cache.get_or_load(page_key(limit, cursor), load_page, group=LIST_GROUP)
+
+    return Response(content=content, media_type="application/json")
 
 
 @book_router.post("/create", status_code=status.HTTP_201_CREATED, response_model=Book)
@@ -27,10 +50,14 @@ async def create_a_book(book_data: BookCreateModel, session: AsyncSession = Depe
 
 @book_router.get("/{book_id}")
 async def get_book(book_uid: str, session: AsyncSession = Depends(get_session)):
-    book = await book_service.get_book(book_uid, session)
+    async def load_book():
+        book = await book_service.get_book(book_uid, session)
+        return book_row_adapter.dump_json(book) if book else None
+
+    content = await book_cache.get_or_load(book_key(book_uid), load_book)
 
-    if book:
-        return book
+    if content:
+        return Response(content=content, media_type="application/json")
     else:
         raise HTTPException(
             status_code=404, detail="Book not found", details="Book not found"
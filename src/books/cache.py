@@ -0,0 +1,26 @@
+from src.config import Config
+from src.db.cache import ReadThroughCache
+
+book_cache = ReadThroughCache(
+    namespace="books",
+    ttl=Config.BOOK_CACHE_TTL,
+    local_maxsize=Config.BOOK_CACHE_LOCAL_SIZE,
+    local_ttl=Config.BOOK_CACHE_LOCAL_TTL,
+)
+
+LIST_GROUP = "list"
+
+
+def book_key(book_uid) -> str:
+    return f"book:{book_uid}"
+
+
+def page_key(limit: int, cursor: str | None) -> str:
+    return f"{LIST_GROUP}:{limit}:{cursor or ''}"
+
+
+async def invalidate_book(book_uid=None) -> None:
+    if book_uid is not None:
+        await book_cache.invalidate(book_key(book_uid))
+
+    await book_cache.invalidate_group(LIST_GROUP)
@@ -1,9 +1,14 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+from typing import List, Optional
+from typing_extensions import TypedDict
 from datetime import datetime
 import uuid
+from .model import Book as BookRow
 
 
 class Book(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     uid: uuid.UUID
     id: int
     title: str
@@ -16,6 +21,24 @@ class Book(BaseModel):
     update_at: datetime
 
 
+class BookPage(BaseModel):
+    items: List[Book]
+    next_cursor: Optional[str] = None
+
+
+# =====================PRECOMPILED SERIALIZERS=======================
+# redovi iz baze su vec validni, pa se serijalizuju direktno (bez ponovne validacije kroz Book)
+
+class BookRowPage(TypedDict):
+    items: List[BookRow]
+    next_cursor: Optional[str]
+
+
+book_row_adapter = TypeAdapter(BookRow)
+book_page_adapter = TypeAdapter(BookRowPage)
+# ===================================================================
+
+
 class BookCreateModel(BaseModel):
     title: str
     author: str
@@ -1,18 +1,35 @@
 from sqlmodel.ext.asyncio.session import AsyncSession
 from .serializers import BookCreateModel, BookUpdateModel
 from .model import Book
+from .cache import invalidate_book
 from sqlmodel import select
 from datetime import datetime
+import uuid
 
 
 class BookService:
-    async def get_all_books(self, session: AsyncSession):
-        statement = select(Book).order_by(Book.uid)
+    async def get_all_books(self, session: AsyncSession, limit: int, after: uuid.UUID | None = None):
+        # keyset paginacija po uid, uzima se jedan red vise da bi se znalo da li postoji sledeca strana
+        statement = select(Book).order_by(Book.uid).limit(limit + 1)
+
+        if after is not None:
+            statement = statement.where(Book.uid > after)
 
         result = await session.exec(statement)
 
         return result.all()
 
+    async def stream_all_books(self, session: AsyncSession, after: uuid.UUID | None = None):
+        statement = select(Book).order_by(Book.uid).execution_options(yield_per=1000)
+
+        if after is not None:
+            statement = statement.where(Book.uid > after)
+
+        result = await session.stream_scalars(statement)
+
+        async for book in result:
+            yield book
+
     async def get_book(self, book_uid: str, session: AsyncSession):
         statement = select(Book).where(Book.uid == book_uid)
 
@@ -31,6 +48,8 @@ class BookService:
 
         await session.commit()
 
+        await invalidate_book()
+
         return new_book
 
     async def update_book(self, book_uid: str, update_data: BookUpdateModel, session: AsyncSession):
@@ -44,6 +63,8 @@ class BookService:
 
             await session.commit()
 
+            await invalidate_book(book_uid)
+
             return book_to_update
 
         else:
@@ -57,6 +78,8 @@ class BookService:
 
             await session.commit()
 
+            await invalidate_book(book_uid)
+
             return book_to_delete
 
         else:
@@ -7,8 +7,42 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     JWT_SECRET: str
     JWT_ALGORITHM: str
+
+    DB_ECHO: bool = False
+    DB_SLOW_QUERY_MS: float = 200.0
+    DB_N_PLUS_ONE_THRESHOLD: int = 0  # 0 = iskljuceno, za dev npr. 3
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_SCHEMA_CHECK: str = "error"  # error, warn ili off
+    DB_CREATE_ALL: bool = False  # samo za dev, create_all umesto alembic-a
+
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
+    REDIS_MAX_CONNECTIONS: int = 50
+
+    TOKEN_CACHE_SIZE: int = 10000
+    REVOCATION_BLOOM_CAPACITY: int = 100000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    REVOCATION_BLOOM_REBUILD_SECONDS: int = 600
+
+    USER_PROFILE_CACHE_SIZE: int = 10000
+    USER_PROFILE_CACHE_TTL: float = 30.0
+
+    EMAIL_CHECK_DELIVERABILITY: bool = True
+    EMAIL_DOMAIN_CACHE_TTL: int = 86400
+    EMAIL_DOMAIN_NEGATIVE_TTL: int = 3600
+
+    BOOK_CACHE_TTL: int = 300
+    BOOK_CACHE_LOCAL_SIZE: int = 1024
+    BOOK_CACHE_LOCAL_TTL: float = 5.0
+
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # thread ili process
+    PASSWORD_HASH_WORKERS: int = 0  # 0 = broj jezgara
+    PASSWORD_HASH_MAX_QUEUE: int = 64
 
     MAIL_FROM: str
     MAIL_SERVER: str
@@ -21,6 +55,32 @@ class Settings(BaseSettings):
     USE_CREDENTIALS: bool = True
     VALIDATE_CERTS: bool = True
 
+    MAIL_WORKER_CONNECTIONS: int = 4
+    MAIL_WORKER_BATCH_SIZE: int = 50
+    MAIL_MAX_ATTEMPTS: int = 5
+    MAIL_VISIBILITY_TIMEOUT: int = 300
+    MAIL_RETRY_BACKOFF: float = 30.0
+
+    APARTMENT_SEARCH_MAX_RADIUS_KM: float = 100.0
+    APARTMENT_SEARCH_MAX_RESULTS: int = 500
+    APARTMENT_FACET_REBUILD_SECONDS: int = 900
+    APARTMENT_AUTOCOMPLETE_REBUILD_SECONDS: int = 900
+    # pg_trgm word_similarity prag za grad/adresu sa greskom u kucanju
+    APARTMENT_TEXT_SEARCH_SIMILARITY: float = 0.5
+    APARTMENT_TEXT_SEARCH_MAX_TERMS: int = 8
+    APARTMENT_QUOTE_MAX_BATCH: int = 1000
+    APARTMENT_QUOTE_MAX_NIGHTS: int = 365
+    # koliko EUR vredi jedna jedinica valute, u .env kao JSON
+    APARTMENT_CURRENCY_RATES: dict[str, float] = {"EUR": 1.0, "RSD": 0.00853, "USD": 0.92, "GBP": 1.17, "CHF": 1.05}
+
+    METRICS_ENABLED: bool = True
+    METRICS_PUBLISH_SECONDS: float = 15.0  # 0 = /metrics vraca samo worker koji je odgovorio
+
+    PROFILER_INTERVAL_MS: float = 5.0
+    PROFILER_MAX_SECONDS: int = 60
+    PROFILER_TOKEN_TTL: int = 300
+    PROFILER_RESULT_TTL: int = 3600
+
     DOMAIN: str
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from redis.exceptions import RedisError
+
+from src.db.redis import get_redis, get_script
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """In-process LRU with an optional TTL per entry."""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl: Optional[float] = None) -> None:
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def keys(self) -> list:
+        return list(self._data.keys())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# upis samo ako se generacija kljuca (i grupe) nije promenila od citanja pre loader-a
+# KEYS: vrednost, generacija kljuca, [set grupe, generacija grupe]; ARGV: vrednost, ttl, generacije, kljuc
+STORE_IF_CURRENT = """
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[3] then
+    return 0
+end
+if #KEYS == 4 and (redis.call('GET', KEYS[4]) or '') ~= ARGV[4] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+if #KEYS == 4 then
+    redis.call('SADD', KEYS[3], ARGV[5])
+    redis.call('EXPIRE', KEYS[3], ARGV[2])
+end
+return 1
+"""
+
+
+class ReadThroughCache:
+    """
+    Serialized responses cached in Redis with a TTL and an in-process LRU in
+    front of it. Concurrent misses for the same key share one load.
+
+    Invalidation bumps a generation counter per key (and per group) in Redis.
+    A load that read the row before an invalidation, on any worker, sees the
+    changed generation and does not store its stale result.
+
+    Other workers keep their local copy for at most local_ttl seconds after
+    an invalidation, Redis is invalidated immediately.
+    """
+
+    def __init__(self, namespace: str, ttl: int, local_maxsize: int = 1024, local_ttl: float = 5.0):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local = LRUCache(maxsize=local_maxsize, ttl=local_ttl)
+        self.stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "invalidations": 0, "stale_loads": 0}
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _group_key(self, group: str) -> str:
+        return f"{self.namespace}:group:{group}"
+
+    def _generation_key(self, key: str) -> str:
+        return f"{self.namespace}:gen:{key}"
+
+    def _group_generation_key(self, group: str) -> str:
+        return f"{self.namespace}:group-gen:{group}"
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Optional[bytes]]],
+        group: Optional[str] = None,
+    ) -> Optional[bytes]:
+        value = self.local.get(key)
+        if value is not None:
+            self.stats["local_hits"] += 1
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._load(key, loader, group)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # oznaci izuzetak kao procitan ako niko drugi ne ceka isti kljuc
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            del self._inflight[key]
+
+        return value
+
+    async def _load(self, key: str, loader, group: Optional[str]) -> Optional[bytes]:
+        generation_keys = [self._generation_key(key)]
+        if group is not None:
+            generation_keys.append(self._group_generation_key(group))
+
+        # vrednost i generacije jednim MGET-om, generacije se citaju pre loader-a
+        try:
+            value, *generations = await get_redis().mget(self._redis_key(key), *generation_keys)
+        except RedisError as e:
+            logger.warning("cache read failed for %s: %s", key, e)
+            value, generations = None, None
+
+        if value is not None:
+            self.stats["redis_hits"] += 1
+            self.local.set(key, value)
+            return value
+
+        self.stats["misses"] += 1
+        value = await loader()
+        if value is None:
+            return None
+
+        # bez generacija (Redis nije bio dostupan) nema bezbednog upisa
+        if generations is None:
+            return value
+
+        keys = [self._redis_key(key), generation_keys[0]]
+        args = [value, self.ttl, generations[0] or b""]
+        if group is not None:
+            keys += [self._group_key(group), generation_keys[1]]
+            args += [generations[1] or b"", key]
+
+        try:
+            stored = await get_script(STORE_IF_CURRENT)(keys=keys, args=args)
+        except RedisError as e:
+            logger.warning("cache write failed for %s: %s", key, e)
+            return value
+
+        # invalidirano dok je loader radio: vrednost ide samo ovom pozivaocu, ne u kes
+        if stored:
+            self.local.set(key, value)
+        else:
+            self.stats["stale_loads"] += 1
+        return value
+
+    async def invalidate(self, *keys: str) -> None:
+        self.stats["invalidations"] += 1
+
+        for key in keys:
+            self.local.pop(key)
+
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.delete(*(self._redis_key(key) for key in keys))
+                for key in keys:
+                    pipe.incr(self._generation_key(key))
+                    pipe.expire(self._generation_key(key), self.ttl)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("cache invalidation failed for %s: %s", keys, e)
+
+    async def invalidate_group(self, group: str) -> None:
+        self.stats["invalidations"] += 1
+
+        try:
+            members = await get_redis().smembers(self._group_key(group))
+            keys = [member.decode() for member in members]
+            for key in keys:
+                self.local.pop(key)
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.delete(self._group_key(group), *(self._redis_key(key) for key in keys))
+                pipe.incr(self._group_generation_key(group))
+                pipe.expire(self._group_generation_key(group), self.ttl)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("cache invalidation failed for group %s: %s", group, e)
+
+        # lokalne kopije grupe se brisu i kada Redis nije dostupan
+        prefix = f"{group}:"
+        for key in self.local.keys():
+            if key.startswith(prefix):
+                self.local.pop(key)
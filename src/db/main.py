@@ -1,8 +1,14 @@
-from sqlmodel import create_engine, SQLModel
-from sqlalchemy.ext.asyncio import AsyncEngine
+import logging
+from functools import lru_cache
+from pathlib import Path
+from sqlmodel import SQLModel
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from src.config import Config
+from src.db.query_stats import instrument
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.orm import sessionmaker
 
 # ======================MODEL TO CREATE IN DB========================
 from src.auth.model import User
@@ -12,21 +18,109 @@ from src.apartment.model import Apartment #, ApartmentImage
 #from src.review.model import Review
 # ===================================================================
 
-engine = AsyncEngine(create_engine(url=Config.DATABASE_URL, echo=True))
+connect_args = {}
+if make_url(Config.DATABASE_URL).get_driver_name() == "asyncpg":
+    connect_args["prepared_statement_cache_size"] = Config.DB_STATEMENT_CACHE_SIZE
+
+engine = create_async_engine(
+    url=Config.DATABASE_URL,
+    echo=Config.DB_ECHO,
+    pool_size=Config.DB_POOL_SIZE,
+    max_overflow=Config.DB_MAX_OVERFLOW,
+    pool_timeout=Config.DB_POOL_TIMEOUT,
+    pool_recycle=Config.DB_POOL_RECYCLE,
+    pool_pre_ping=Config.DB_POOL_PRE_PING,
+    connect_args=connect_args,
+)
+
+# statistika upita po zahtevu i log sporih upita (umesto echo)
+instrument(engine)
+
+# jedan session factory za celu aplikaciju
+async_session = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+@lru_cache
+def expected_heads() -> frozenset[str]:
+    # head revizije iz migrations/, citaju se sa diska samo jednom po procesu
+    from alembic.config import Config as AlembicConfig
+    from alembic.script import ScriptDirectory
+
+    alembic_cfg = AlembicConfig(str(ALEMBIC_INI))
+    alembic_cfg.set_main_option("script_location", str(ALEMBIC_INI.parent / "migrations"))
+    return frozenset(ScriptDirectory.from_config(alembic_cfg).get_heads())
+
+
+async def current_revisions() -> frozenset[str]:
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        except DBAPIError:
+            # nema alembic_version tabele = baza nije migrirana
+            return frozenset()
+        return frozenset(result.scalars().all())
+
+
+async def check_schema_version() -> None:
+    if Config.DB_SCHEMA_CHECK == "off":
+        return
+
+    expected = expected_heads()
+    current = await current_revisions()
+    if current == expected:
+        return
+
+    message = (
+        f"database schema is at {sorted(current) or 'no revision'}, "
+        f"code expects {sorted(expected)} - run 'alembic upgrade head'"
+    )
+    if not current:
+        # baza napravljena sa create_all nema alembic_version, prvo alembic stamp (README)
+        message += " (a database built by create_all needs 'alembic stamp' first, see README)"
+    if Config.DB_SCHEMA_CHECK == "warn":
+        logger.warning(message)
+        return
+    raise SchemaVersionError(message)
 
 
 async def init_db() -> None:
+    if not Config.DB_CREATE_ALL:
+        # semu vodi alembic, na startu samo jedan upit za verziju
+        await check_schema_version()
+        return
+
+    # dev mod: kreira sve importovane modele direktno u bazi
     async with engine.begin() as conn:
-        # proverava da sve imporovane modele i kreira ih u bazi
+        # trigram indeksi na apartments traze pg_trgm
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(SQLModel.metadata.create_all)
 
 
 async def get_session() -> AsyncSession:
-    Session = sessionmaker(
-        bind=engine,
-        class_=AsyncSession,
-        expire_on_commit=False
-    )
-
-    async with Session() as session:
+    async with async_session() as session:
         yield session
+
+
+def pool_stats() -> dict:
+    pool = engine.pool
+
+    return {
+        "pool_size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": Config.DB_MAX_OVERFLOW,
+    }
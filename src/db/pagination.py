@@ -0,0 +1,26 @@
+import base64
+import binascii
+import uuid
+from fastapi import HTTPException, status
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+# kursor je uid poslednjeg reda sa prethodne strane, klijent ga vidi kao neprovidan token
+def encode_cursor(uid: uuid.UUID) -> str:
+    return base64.urlsafe_b64encode(uid.bytes).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> uuid.UUID:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return uuid.UUID(bytes=base64.urlsafe_b64decode(padded))
+    except (ValueError, binascii.Error):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def next_cursor(rows: list, limit: int) -> str | None:
+    if len(rows) > limit:
+        return encode_cursor(rows[limit - 1].uid)
+    return None
@@ -0,0 +1,132 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class RequestQueries:
+    """
+    SQL issued while serving one request: count, total time and the slowest
+    statement. With DB_N_PLUS_ONE_THRESHOLD set, identical statements are
+    counted too so repeated lookups can be reported when the request ends.
+    """
+
+    def __init__(self, scope: dict, track_statements: bool):
+        self.scope = scope
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement = ""
+        self.statements: Counter | None = Counter() if track_statements else None
+        self.same_parameters: Counter | None = Counter() if track_statements else None
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        return getattr(route, "path", self.scope.get("path", ""))
+
+    def record(self, statement: str, parameters, elapsed: float) -> None:
+        self.count += 1
+        self.total_seconds += elapsed
+        if elapsed > self.slowest_seconds:
+            self.slowest_seconds = elapsed
+            self.slowest_statement = statement
+
+        if self.statements is not None:
+            self.statements[statement] += 1
+            self.same_parameters[(statement, repr(parameters))] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int, int]]:
+        # (statement, koliko puta, koliko puta sa istim parametrima)
+        if self.statements is None:
+            return []
+
+        repeated = []
+        for statement, count in self.statements.items():
+            if count >= threshold:
+                same = max(n for (text, _), n in self.same_parameters.items() if text == statement)
+                repeated.append((statement, count, same))
+        return repeated
+
+
+current_queries: ContextVar[RequestQueries | None] = ContextVar("current_queries", default=None)
+
+
+def instrument(engine: AsyncEngine) -> None:
+    # sync engine event-i rade i za async engine, greenlet nasledjuje context pa contextvar vazi
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_start
+        queries = current_queries.get()
+
+        if queries is not None:
+            queries.record(statement, parameters, elapsed)
+
+        if elapsed * 1000 >= Config.DB_SLOW_QUERY_MS:
+            logger.warning(
+                "slow query %.1fms (%s): %s",
+                elapsed * 1000,
+                queries.route if queries is not None else "no request",
+                " ".join(statement.split()),
+            )
+
+
+class QueryStatsMiddleware:
+    """
+    Attributes every statement to the current request and reports the totals
+    in a Server-Timing header (visible in the browser dev tools):
+
+        Server-Timing: db;dur=4.2;desc="3 queries", db-slowest;dur=2.9, app;dur=11.8
+
+    Statements issued after the headers are sent (streamed bodies) are still
+    counted for the N+1 report, they just miss the header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        threshold = Config.DB_N_PLUS_ONE_THRESHOLD
+        queries = RequestQueries(scope, track_statements=threshold > 0)
+        token = current_queries.set(queries)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                app_ms = (time.perf_counter() - start) * 1000
+                timing = (
+                    f'db;dur={queries.total_seconds * 1000:.1f};desc="{queries.count} queries", '
+                    f"db-slowest;dur={queries.slowest_seconds * 1000:.1f}, app;dur={app_ms:.1f}"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_queries.reset(token)
+
+            for statement, count, same in queries.repeated(threshold):
+                logger.warning(
+                    "possible N+1 in %s %s: statement ran %d times (%d with identical parameters): %s",
+                    scope["method"],
+                    queries.route,
+                    count,
+                    same,
+                    " ".join(statement.split()),
+                )
@@ -1,19 +1,122 @@
 # import aioredis
 import redis.asyncio as redis # koristi se redis ili aioredis ako ga nismo napravili
+from redis.asyncio.client import Pipeline
+from redis.commands.core import AsyncScript
 from src.config import Config
+from src.metrics import redis_latency
+import time
 
 JTI_EXPIRY = 3600
+REVOKED_JTIS_KEY = "revoked_jtis"
+REVOKED_JTIS_CHANNEL = "revoked_jtis"
 
-token_blocklist = redis.StrictRedis(
-    host=Config.REDIS_HOST, port=Config.REDIS_PORT, db=0
-)
+
+class TimedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        start = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            redis_latency.observe(time.perf_counter() - start, "PIPELINE")
+
+
+class TimedRedis(redis.Redis):
+    # meri round trip svake komande za /metrics
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            command = args[0].decode() if isinstance(args[0], bytes) else str(args[0])
+            redis_latency.observe(time.perf_counter() - start, command.upper())
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> TimedPipeline:
+        return TimedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+# jedan klijent (i pool konekcija) za ceo proces, pravi se u lifespan-u ili pri prvoj upotrebi
+redis_client: TimedRedis | None = None
+
+
+def get_redis() -> TimedRedis:
+    global redis_client
+
+    if redis_client is None:
+        pool = redis.ConnectionPool(
+            host=Config.REDIS_HOST,
+            port=Config.REDIS_PORT,
+            db=0,
+            max_connections=Config.REDIS_MAX_CONNECTIONS,
+        )
+        redis_client = TimedRedis(connection_pool=pool)
+
+    return redis_client
+
+
+# Lua skripte se registruju jednom po klijentu (Script cuva sha i klijent), ne na svaki poziv
+scripts: dict[str, AsyncScript] = {}
+
+
+def get_script(source: str) -> AsyncScript:
+    client = get_redis()
+    script = scripts.get(source)
+
+    if script is None or script.registered_client is not client:
+        script = scripts[source] = client.register_script(source)
+
+    return script
+
+
+async def init_redis() -> None:
+    get_redis()
+
+
+async def close_redis() -> None:
+    global redis_client
+
+    if redis_client is not None:
+        await redis_client.aclose(close_connection_pool=True)
+        redis_client = None
+        scripts.clear()
 
 
 async def add_jti_to_blocklist(jti: str) -> None:
-    await token_blocklist.set(name=jti, value="", ex=JTI_EXPIRY)
+    # sorted set (score = istek) sluzi za punjenje bloom filtera na startu, kanal za obavestavanje workera
+    async with get_redis().pipeline(transaction=True) as pipe:
+        pipe.set(name=jti, value="", ex=JTI_EXPIRY)
+        pipe.zadd(REVOKED_JTIS_KEY, {jti: time.time() + JTI_EXPIRY})
+        pipe.publish(REVOKED_JTIS_CHANNEL, jti)
+        await pipe.execute()
 
 
 async def token_in_blocklist(jti: str) -> bool:
-    jti = await token_blocklist.get(jti)
+    jti = await get_redis().get(jti)
 
     return jti is not None
+
+
+# =================================LOGIN LIMITER===============================
+
+# provera blokade, INCR i EXPIRE u jednom round trip-u
+# pokusaj se broji unapred, uspesan login ga brise; blokiran pokusaj se ne broji i ne produzava blokadu
+REGISTER_LOGIN_ATTEMPT = """
+local attempts = tonumber(redis.call('GET', KEYS[1]) or '0')
+if attempts >= tonumber(ARGV[2]) then
+    return {attempts, 1}
+end
+attempts = redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return {attempts, 0}
+"""
+
+
+async def register_login_attempt(key: str, expiry: int, max_attempts: int) -> tuple[int, bool]:
+    script = get_script(REGISTER_LOGIN_ATTEMPT)
+
+    attempts, blocked = await script(keys=[key], args=[expiry, max_attempts])
+
+    return attempts, bool(blocked)
+
+
+async def reset_failed_login(key: str) -> None:
+    await get_redis().delete(key)
@@ -0,0 +1,105 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+
+from src.config import Config
+from src.db.redis import get_redis, token_in_blocklist, REVOKED_JTIS_KEY, REVOKED_JTIS_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationFilter:
+    """
+    Per-worker bloom filter of revoked JTIs, kept current from the Redis
+    pub/sub channel that add_jti_to_blocklist publishes to. Only a bloom hit
+    goes to Redis for the exact answer. While the subscription is down every
+    check goes to Redis.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, rebuild_interval: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rebuild_interval = rebuild_interval
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.ready = False
+        self._task = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.ready = False
+
+    async def is_revoked(self, jti: str) -> bool:
+        if self.ready and jti not in self.bloom:
+            return False
+        return await token_in_blocklist(jti)
+
+    async def _rebuild(self) -> None:
+        # istekli JTI-jevi ispadaju iz filtra pri svakom rebuild-u
+        await get_redis().zremrangebyscore(REVOKED_JTIS_KEY, "-inf", time.time())
+        jtis = await get_redis().zrange(REVOKED_JTIS_KEY, 0, -1)
+
+        bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+        for jti in jtis:
+            bloom.add(jti.decode())
+        self.bloom = bloom
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with get_redis().pubsub() as pubsub:
+                    # prvo subscribe pa rebuild, da se ne izgubi opoziv izmedju
+                    await pubsub.subscribe(REVOKED_JTIS_CHANNEL)
+                    await self._rebuild()
+                    self.ready = True
+                    next_rebuild = time.monotonic() + self.rebuild_interval
+
+                    while True:
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if message is not None:
+                            self.bloom.add(message["data"].decode())
+
+                        if time.monotonic() >= next_rebuild:
+                            await self._rebuild()
+                            next_rebuild = time.monotonic() + self.rebuild_interval
+            except Exception as e:
+                self.ready = False
+                logger.warning("revocation filter disconnected, checking Redis directly: %s", e)
+                await asyncio.sleep(5)
+
+
+revocation_filter = RevocationFilter(
+    capacity=Config.REVOCATION_BLOOM_CAPACITY,
+    error_rate=Config.REVOCATION_BLOOM_ERROR_RATE,
+    rebuild_interval=Config.REVOCATION_BLOOM_REBUILD_SECONDS,
+)
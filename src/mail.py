@@ -1,38 +0,0 @@
-from fastapi_mail import FastMail, ConnectionConfig, MessageSchema, MessageType
-from src.config import Config
-from pathlib import Path
-
-BASE_DIR = Path(__file__).resolve().parent
-
-mail_config = ConnectionConfig(
-    MAIL_FROM= Config.MAIL_FROM,
-    MAIL_SERVER= Config.MAIL_SERVER,
-    MAIL_PORT= 587,
-    MAIL_USERNAME= Config.MAIL_USERNAME,
-    MAIL_PASSWORD= Config.MAIL_PASSWORD,
-    MAIL_FROM_NAME= Config.MAIL_FROM_NAME,
-    MAIL_STARTTLS= True,
-    MAIL_SSL_TLS= False,
-    USE_CREDENTIALS= True,
-    VALIDATE_CERTS= True,
-    TEMPLATE_FOLDER= Path(BASE_DIR, "templates"),
-)
-
-print(mail_config)
-
-mail = FastMail(
-    config=mail_config
-)
-
-def create_message(recipients: list[str], subject: str, body:str):
-    message = MessageSchema(
-        recipients=recipients,
-        subject=subject,
-        body=body,
-        subtype=MessageType.html
-    )
-
-    return message
-
-# mail.send_message()
-
@@ -0,0 +1,42 @@
+import json
+import uuid
+
+from src.db.redis import get_redis
+
+MAIL_STREAM = "mail:outbound"
+MAIL_GROUP = "mailers"
+MAIL_DELAYED = "mail:delayed"
+MAIL_DEAD = "mail:dead"
+
+
+def encode_job(recipients: list[str], subject: str, body: str, attempts: int = 0) -> str:
+    # id: svaki posao (i svaki retry) je drugaciji clan sorted set-a sa retry-ima
+    return json.dumps({
+        "id": uuid.uuid4().hex,
+        "recipients": recipients,
+        "subject": subject,
+        "body": body,
+        "attempts": attempts,
+    })
+
+
+def decode_job(job: bytes | str) -> dict:
+    return json.loads(job)
+
+
+async def enqueue_mail(recipients: list[str], subject: str, body: str) -> str:
+    # poruka ostaje u Redis stream-u dok je worker ne posalje i ne potvrdi (XACK)
+    message_id = await get_redis().xadd(MAIL_STREAM, {"job": encode_job(recipients, subject, body)})
+
+    return message_id.decode()
+
+
+async def queue_depth() -> dict:
+    # worker brise poslate poruke iz stream-a, pa je XLEN broj neposlatih
+    async with get_redis().pipeline(transaction=False) as pipe:
+        pipe.xlen(MAIL_STREAM)
+        pipe.zcard(MAIL_DELAYED)
+        pipe.xlen(MAIL_DEAD)
+        outbound, delayed, dead = await pipe.execute()
+
+    return {"outbound": outbound, "delayed": delayed, "dead": dead}
@@ -0,0 +1,33 @@
+from functools import lru_cache
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, select_autoescape
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+
+MAIL_TEMPLATES = [
+    "verify_account_mail.html",
+    "password_reset_mail.html",
+]
+
+
+# jedan Environment za sve mejlove: kompajlirani sabloni ostaju u memoriji,
+# bytecode cache na disku skracuje kompajliranje pri startu novih workera
+@lru_cache
+def get_env() -> Environment:
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        bytecode_cache=FileSystemBytecodeCache(),
+        autoescape=select_autoescape(["html"]),
+        auto_reload=False,
+        enable_async=True,
+    )
+
+
+def precompile() -> None:
+    for name in MAIL_TEMPLATES:
+        get_env().get_template(name)
+
+
+async def render_mail(name: str, **context) -> str:
+    return await get_env().get_template(name).render_async(**context)
@@ -0,0 +1,235 @@
+"""
+Outbound mail worker.
+
+Reads jobs from the Redis stream filled by src.mail_queue.enqueue_mail and
+sends them over a pool of persistent SMTP connections, one per consumer.
+Every job is acknowledged as soon as it is sent. Failed sends are retried
+with exponential backoff and moved to the dead letter stream after
+MAIL_MAX_ATTEMPTS; entries that cannot be decoded go there right away. Jobs
+left unacknowledged by a crashed worker are reclaimed after
+MAIL_VISIBILITY_TIMEOUT seconds. Any other error (Redis down, a bug) is
+logged and the consumer retries after a backoff instead of stopping.
+
+    python -m src.mail_worker
+"""
+import asyncio
+import logging
+import os
+import random
+import signal
+import socket
+import time
+from email.message import EmailMessage
+from email.utils import formataddr
+
+import aiosmtplib
+from redis.exceptions import ResponseError
+
+from src.config import Config
+from src.db.redis import get_redis, get_script, close_redis
+from src.mail_queue import (
+    decode_job,
+    encode_job,
+    MAIL_STREAM,
+    MAIL_GROUP,
+    MAIL_DELAYED,
+    MAIL_DEAD,
+)
+
+logger = logging.getLogger(__name__)
+
+# pauza posle neocekivane greske u consumer-u, duplira se do ERROR_BACKOFF_MAX
+ERROR_BACKOFF = 1.0
+ERROR_BACKOFF_MAX = 30.0
+
+# atomski prebacuje dospele retry poslove iz sorted set-a nazad u stream
+MOVE_DUE_JOBS = """
+local jobs = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, job in ipairs(jobs) do
+    redis.call('ZREM', KEYS[1], job)
+    redis.call('XADD', KEYS[2], '*', 'job', job)
+end
+return #jobs
+"""
+
+
+def build_message(job: dict, sender: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = ", ".join(job["recipients"])
+    message["Subject"] = job["subject"]
+    message.set_content(job["body"], subtype="html")
+    return message
+
+
+class SMTPConnection:
+    """One persistent SMTP connection, reopened lazily after a failure."""
+
+    def __init__(self, **smtp_options):
+        self.smtp_options = smtp_options
+        self.smtp = None
+
+    async def send(self, message: EmailMessage) -> None:
+        if self.smtp is None or not self.smtp.is_connected:
+            self.smtp = aiosmtplib.SMTP(**self.smtp_options)
+            await self.smtp.connect()
+
+        try:
+            await self.smtp.send_message(message)
+        except (aiosmtplib.SMTPServerDisconnected, ConnectionError):
+            await self.close()
+            raise
+
+    async def close(self) -> None:
+        if self.smtp is not None and self.smtp.is_connected:
+            try:
+                await self.smtp.quit()
+            except aiosmtplib.SMTPException:
+                self.smtp.close()
+        self.smtp = None
+
+
+class MailWorker:
+    def __init__(
+        self,
+        connections: int = Config.MAIL_WORKER_CONNECTIONS,
+        batch_size: int = Config.MAIL_WORKER_BATCH_SIZE,
+        max_attempts: int = Config.MAIL_MAX_ATTEMPTS,
+        visibility_timeout: int = Config.MAIL_VISIBILITY_TIMEOUT,
+        **smtp_options,
+    ):
+        self.connections = connections
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.visibility_timeout_ms = visibility_timeout * 1000
+        self.smtp_options = smtp_options or {
+            "hostname": Config.MAIL_SERVER,
+            "port": Config.MAIL_PORT,
+            "username": Config.MAIL_USERNAME if Config.USE_CREDENTIALS else None,
+            "password": Config.MAIL_PASSWORD if Config.USE_CREDENTIALS else None,
+            "use_tls": Config.MAIL_SSL_TLS,
+            "start_tls": Config.MAIL_STARTTLS,
+            "validate_certs": Config.VALIDATE_CERTS,
+        }
+        self.sender = formataddr((Config.MAIL_FROM_NAME, Config.MAIL_FROM))
+        self.name = f"{socket.gethostname()}-{os.getpid()}"
+        self.sent = 0
+        self.failed = 0
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def run(self) -> None:
+        try:
+            await get_redis().xgroup_create(MAIL_STREAM, MAIL_GROUP, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+        consumers = [self._consume(i) for i in range(self.connections)]
+        await asyncio.gather(self._schedule_retries(), *consumers)
+
+    async def _consume(self, index: int) -> None:
+        consumer = f"{self.name}-{index}"
+        connection = SMTPConnection(**self.smtp_options)
+        errors = 0
+
+        try:
+            while not self._stopping.is_set():
+                try:
+                    await self._consume_once(connection, consumer)
+                    errors = 0
+                except Exception:
+                    errors += 1
+                    delay = min(ERROR_BACKOFF * 2 ** (errors - 1), ERROR_BACKOFF_MAX)
+                    logger.exception("mail consumer %s failed, retrying in %.0fs", consumer, delay)
+                    await self._pause(delay)
+        finally:
+            await connection.close()
+
+    async def _consume_once(self, connection: SMTPConnection, consumer: str) -> None:
+        # prvo preuzimanje poruka koje je neki drugi consumer uzeo a nije potvrdio
+        claimed = await get_redis().xautoclaim(
+            MAIL_STREAM, MAIL_GROUP, consumer,
+            min_idle_time=self.visibility_timeout_ms, count=self.batch_size,
+        )
+        messages = claimed[1]
+
+        if not messages:
+            response = await get_redis().xreadgroup(
+                MAIL_GROUP, consumer, {MAIL_STREAM: ">"}, count=self.batch_size, block=1000,
+            )
+            messages = response[0][1] if response else []
+
+        for message_id, fields in messages:
+            await self._handle(connection, message_id, fields)
+
+    async def _handle(self, connection: SMTPConnection, message_id: bytes, fields: dict) -> None:
+        # XACK odmah posle slanja: greska kasnije u batch-u ne salje ponovo vec poslate
+        async with get_redis().pipeline(transaction=True) as pipe:
+            if fields:
+                try:
+                    job = decode_job(fields[b"job"])
+                    message = build_message(job, self.sender)
+                except Exception as e:
+                    # poruka koja ne moze da se procita bi se inace preuzimala zauvek
+                    logger.error("mail job %s is not readable, moved to %s: %s", message_id, MAIL_DEAD, e)
+                    pipe.xadd(MAIL_DEAD, {**fields, b"error": repr(e)})
+                else:
+                    try:
+                        await connection.send(message)
+                        self.sent += 1
+                    except (aiosmtplib.SMTPException, OSError) as e:
+                        self.failed += 1
+                        self._retry(pipe, job, e)
+
+            pipe.xack(MAIL_STREAM, MAIL_GROUP, message_id)
+            pipe.xdel(MAIL_STREAM, message_id)
+            await pipe.execute()
+
+    def _retry(self, pipe, job: dict, error: Exception) -> None:
+        attempts = job["attempts"] + 1
+        # encode_job daje novi id, pa se isti mejl poslat dva puta ne spaja u jedan clan sorted set-a
+        payload = encode_job(job["recipients"], job["subject"], job["body"], attempts)
+
+        if attempts >= self.max_attempts:
+            logger.error("mail to %s dropped after %s attempts: %s", job["recipients"], attempts, error)
+            pipe.xadd(MAIL_DEAD, {"job": payload, "error": str(error)})
+            return
+
+        delay = min(Config.MAIL_RETRY_BACKOFF * 2 ** (attempts - 1), 3600) * random.uniform(0.8, 1.2)
+        logger.warning("mail to %s failed (attempt %s), retrying in %.0fs: %s", job["recipients"], attempts, delay, error)
+        pipe.zadd(MAIL_DELAYED, {payload: time.time() + delay})
+
+    async def _pause(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _schedule_retries(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await get_script(MOVE_DUE_JOBS)(keys=[MAIL_DELAYED, MAIL_STREAM], args=[time.time(), self.batch_size])
+            except Exception:
+                logger.exception("moving due mail retries failed")
+            await self._pause(1.0)
+
+
+async def main() -> None:
+    worker = MailWorker()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    logger.info("mail worker %s started with %s SMTP connections", worker.name, worker.connections)
+    await worker.run()
+    await close_redis()
+    logger.info("mail worker %s stopped, sent=%s failed=%s", worker.name, worker.sent, worker.failed)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
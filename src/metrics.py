@@ -0,0 +1,302 @@
+import asyncio
+import bisect
+import logging
+import os
+import socket
+import time
+
+import orjson
+from fastapi import APIRouter
+from fastapi.responses import Response
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+# svaki uvicorn worker ima svoj registry, menja se samo iz event loop-a pa nema lock-ova.
+# workeri periodicno upisuju snapshot u Redis, /metrics ih sabira za ceo host
+WORKERS_KEY = f"metrics:workers:{socket.gethostname()}"
+WORKER_ID = str(os.getpid())
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+REDIS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: dict[str, "Metric"] = {}
+
+    def register(self, metric: "Metric") -> None:
+        self.metrics[metric.name] = metric
+
+    def snapshot(self) -> dict:
+        # samo metrike po workeru, deljene (npr. duzina mail reda) se ne sabiraju
+        return {
+            name: [[list(labels), value] for labels, value in metric.values.items()]
+            for name, metric in self.metrics.items()
+            if not metric.shared
+        }
+
+    def render(self, snapshots: list[dict] | None = None) -> str:
+        if snapshots is None:
+            snapshots = [self.snapshot()]
+
+        lines = []
+        for name, metric in self.metrics.items():
+            if metric.shared:
+                values = dict(metric.values)
+            else:
+                values = {}
+                for snapshot in snapshots:
+                    for labels, value in snapshot.get(name, []):
+                        key = tuple(labels)
+                        values[key] = metric.merge(values[key], value) if key in values else value
+
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for labels, value in sorted(values.items()):
+                lines.extend(metric.render(labels, value))
+
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), shared: bool = False):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.shared = shared
+        self.values: dict[tuple, object] = {}
+        registry.register(self)
+
+    def merge(self, left, right):
+        return left + right
+
+    def render(self, labels: tuple, value) -> list[str]:
+        return [f"{self.name}{_labels(self.labelnames, labels)} {value}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, *labels) -> None:
+        self.values[labels] = value
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels) -> None:
+        # [brojevi po bucket-u (poslednji je +Inf)..., suma]
+        counts = self.values.get(labels)
+        if counts is None:
+            counts = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def merge(self, left, right):
+        return [a + b for a, b in zip(left, right)]
+
+    def render(self, labels: tuple, value) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), value[:-1]):
+            cumulative += count
+            le = f'le="{bound}"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {value[-1]}")
+        lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+# ===================================METRIKE===================================
+
+http_requests = Counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+http_latency = Histogram("http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"))
+http_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+
+redis_latency = Histogram(
+    "redis_command_duration_seconds", "Redis command round trip by command.", ("command",), buckets=REDIS_BUCKETS
+)
+
+db_pool = Gauge("db_pool_connections", "SQLAlchemy pool connections by state.", ("state",))
+mail_queue = Gauge("mail_queue_depth", "Mail jobs waiting in Redis by queue.", ("queue",), shared=True)
+cache_events = Gauge("response_cache_events", "Response cache hits, misses and invalidations.", ("cache", "event"))
+hasher_pending = Gauge("password_hasher_pending", "Password hashes queued or running.")
+hasher_rejected = Gauge("password_hasher_rejected", "Password hashes rejected with 503.")
+
+# =============================================================================
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware, no BaseHTTPMiddleware task per request. The route
+    label is the path template (/api/v1/books/{book_id}), not the raw path,
+    so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_in_flight.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            http_requests.inc(scope["method"], path, status_code)
+            http_latency.observe(time.perf_counter() - start, scope["method"], path)
+
+
+def collect_worker() -> None:
+    # vrednosti koje se ne prate u hodu, citaju se pri snapshot-u
+    from src.db.main import pool_stats
+    from src.books.cache import book_cache
+    from src.auth.utils import password_hasher
+
+    stats = pool_stats()
+    db_pool.set(stats["checked_out"], "checked_out")
+    db_pool.set(stats["checked_in"], "checked_in")
+    # overflow() je negativan dok pool nije pun
+    db_pool.set(max(stats["overflow"], 0), "overflow")
+
+    for event, count in book_cache.stats.items():
+        cache_events.set(count, "books", event)
+
+    hasher_pending.set(password_hasher.pending)
+    hasher_rejected.set(password_hasher.rejected)
+
+
+async def publish() -> None:
+    from src.db.redis import get_redis
+
+    collect_worker()
+    payload = orjson.dumps({"ts": time.time(), "metrics": registry.snapshot()})
+
+    async with get_redis().pipeline(transaction=False) as pipe:
+        pipe.hset(WORKERS_KEY, WORKER_ID, payload)
+        pipe.expire(WORKERS_KEY, int(Config.METRICS_PUBLISH_SECONDS * 3) + 1)
+        await pipe.execute()
+
+
+async def host_snapshots() -> list[dict]:
+    from src.db.redis import get_redis
+
+    await publish()
+    workers = await get_redis().hgetall(WORKERS_KEY)
+
+    # worker koji se nije javio tri intervala se smatra ugasenim
+    cutoff = time.time() - Config.METRICS_PUBLISH_SECONDS * 3
+    snapshots = []
+    for payload in workers.values():
+        data = orjson.loads(payload)
+        if data["ts"] >= cutoff:
+            snapshots.append(data["metrics"])
+    return snapshots
+
+
+class MetricsPublisher:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        from src.db.redis import get_redis
+        try:
+            await get_redis().hdel(WORKERS_KEY, WORKER_ID)
+        except Exception:
+            logger.warning("could not remove worker metrics", exc_info=True)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await publish()
+            except Exception:
+                logger.warning("could not publish worker metrics", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+
+metrics_publisher = MetricsPublisher(Config.METRICS_PUBLISH_SECONDS)
+
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    from src.mail_queue import queue_depth
+
+    snapshots = None
+    try:
+        for queue, depth in (await queue_depth()).items():
+            mail_queue.set(depth, queue)
+        if Config.METRICS_PUBLISH_SECONDS > 0:
+            snapshots = await host_snapshots()
+    except Exception:
+        # bez Redis-a se vraca bar stanje ovog workera
+        logger.warning("redis unavailable, serving local metrics only", exc_info=True)
+
+    if snapshots is None:
+        collect_worker()
+
+    return Response(content=registry.render(snapshots), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,260 @@
+import asyncio
+import logging
+import os
+import site
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from functools import lru_cache
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.exceptions import HTTPException
+from fastapi.responses import Response
+from itsdangerous import URLSafeTimedSerializer, BadSignature
+from src.auth.dependencies import RoleChecker, get_current_user
+from src.config import Config
+from src.db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_KEY = "profile:{}"
+PROFILE_TOKEN_USED_KEY = "profile:token-used:{}"
+
+_PATH_PREFIXES = sorted(
+    [os.getcwd(), *site.getsitepackages(), site.getusersitepackages(), sys.prefix],
+    key=len,
+    reverse=True,
+)
+
+
+@lru_cache(maxsize=4096)
+def _short_path(filename: str) -> str:
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            return filename[len(prefix):].lstrip(os.sep)
+    return filename
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _thread_stack(frame) -> list[str]:
+    stack = []
+    while frame is not None:
+        stack.append(_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _coroutine_stack(coro) -> list[str]:
+    # zaustavljen task nema frame na steku niti, lanac await-ova se cita iz korutine
+    stack = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        stack.append(_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return stack
+
+
+class Profile:
+    """
+    Collapsed stacks ("a;b;c 12") for one request task, or for every thread
+    of the worker when task is None. Output works with flamegraph.pl and
+    speedscope.
+    """
+
+    def __init__(self, task: asyncio.Task | None = None):
+        self.task = task
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started = time.perf_counter()
+
+    def sample(self, frames: dict, running: asyncio.Task | None, loop_thread: int, own_thread: int) -> None:
+        self.samples += 1
+
+        if self.task is None:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in frames.items():
+                if thread_id != own_thread:
+                    self.stacks[";".join([names.get(thread_id, str(thread_id)), *_thread_stack(frame)])] += 1
+            return
+
+        if running is self.task:
+            # task se upravo izvrsava, pun stek niti event loop-a (ukljucujuci sync pozive)
+            self.stacks[";".join(_thread_stack(frames[loop_thread]))] += 1
+        elif not self.task.done():
+            self.stacks[";".join([*_coroutine_stack(self.task.get_coro()), "<waiting>"])] += 1
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+
+class SamplingProfiler:
+    """
+    One daemon thread samples sys._current_frames() every interval while at
+    least one profile is active, and exits when the last one ends. Nothing
+    runs when profiling is off.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.profiles: set[Profile] = set()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: int | None = None
+
+    def begin(self, profile: Profile) -> None:
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread = threading.get_ident()
+            self.profiles.add(profile)
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+
+    def end(self, profile: Profile) -> None:
+        # lock ceka da se zavrsi uzorak u toku, posle ovoga se profil ne menja
+        with self._lock:
+            self.profiles.discard(profile)
+
+    def _run(self) -> None:
+        own_thread = threading.get_ident()
+
+        while True:
+            with self._lock:
+                if not self.profiles:
+                    self._thread = None
+                    return
+
+                frames = sys._current_frames()
+                running = asyncio.current_task(self._loop)
+                for profile in self.profiles:
+                    try:
+                        profile.sample(frames, running, self._loop_thread, own_thread)
+                    except Exception:
+                        # stek se menja dok ga citamo, takav uzorak se preskace
+                        pass
+                del frames
+
+            time.sleep(self.interval)
+
+
+profiler = SamplingProfiler(Config.PROFILER_INTERVAL_MS / 1000)
+
+token_serializer = URLSafeTimedSerializer(secret_key=Config.JWT_SECRET, salt="profiler")
+
+
+async def store_profile(profile_id: str, profile: Profile) -> None:
+    await get_redis().set(PROFILE_KEY.format(profile_id), profile.collapsed(), ex=Config.PROFILER_RESULT_TTL)
+
+
+async def use_token(claims: dict) -> bool:
+    # token vazi za jedan zahtev: SET NX pamti iskoriscen id dok token ne istekne
+    try:
+        return bool(await get_redis().set(
+            PROFILE_TOKEN_USED_KEY.format(claims["id"]), claims.get("admin", ""), nx=True, ex=Config.PROFILER_TOKEN_TTL,
+        ))
+    except Exception:
+        logger.warning("could not check profiler token %s", claims.get("id"), exc_info=True)
+        return False
+
+
+class ProfilerMiddleware:
+    """
+    Profiles a single request when it carries a valid X-Profile token (issued
+    by POST /api/v1/admin/profiler/token). Each token profiles one request
+    only, a replayed token is ignored. The response gets an X-Profile-Id
+    header, the stacks are fetched with GET /api/v1/admin/profiler/{id}.
+    Requests without the header only pay for the header lookup.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        token = next((value for name, value in scope["headers"] if name == PROFILE_HEADER), None)
+        if token is None:
+            return await self.app(scope, receive, send)
+
+        try:
+            # latin-1 dekodira bilo koje bajtove, los header je samo nevazeci token
+            claims = token_serializer.loads(token.decode("latin-1"), max_age=Config.PROFILER_TOKEN_TTL)
+        except BadSignature:
+            logger.warning("ignoring invalid profiler token for %s", scope["path"])
+            return await self.app(scope, receive, send)
+
+        if not await use_token(claims):
+            logger.warning("ignoring reused profiler token from admin %s for %s", claims.get("admin"), scope["path"])
+            return await self.app(scope, receive, send)
+
+        profile_id = uuid.uuid4().hex
+        profile = Profile(asyncio.current_task())
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profiler.begin(profile)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.end(profile)
+            try:
+                await store_profile(profile_id, profile)
+            except Exception:
+                logger.warning("could not store profile %s", profile_id, exc_info=True)
+
+
+# =================================ADMIN ROUTES================================
+
+profiler_router = APIRouter(dependencies=[Depends(RoleChecker(["admin"]))])
+
+
+@profiler_router.post("/token")
+async def create_profiler_token(current_user = Depends(get_current_user)):
+    return {
+        "header": "X-Profile",
+        "token": token_serializer.dumps({"id": uuid.uuid4().hex, "admin": str(current_user.uid)}),
+        "expires_in": Config.PROFILER_TOKEN_TTL,
+    }
+
+
+@profiler_router.get("/worker")
+async def profile_worker(seconds: float = Query(10, gt=0, le=Config.PROFILER_MAX_SECONDS)):
+    # profilise sve niti workera koji je primio ovaj zahtev
+    profile = Profile()
+    profiler.begin(profile)
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.end(profile)
+
+    return Response(
+        content=profile.collapsed(),
+        media_type="text/plain",
+        headers={"X-Worker-Pid": str(os.getpid()), "X-Profile-Samples": str(profile.samples)},
+    )
+
+
+@profiler_router.get("/{profile_id}")
+async def get_profile(profile_id: str):
+    stacks = await get_redis().get(PROFILE_KEY.format(profile_id))
+
+    if stacks is None:
+        raise HTTPException(status_code=404, detail="Profile not found or expired")
+
+    return Response(content=stacks, media_type="text/plain")
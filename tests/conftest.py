@@ -0,0 +1,68 @@
+import os
+import tempfile
+
+# Settings se citaju pri importu src, pa env mora biti postavljen pre toga
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.gettempdir()}/template-tests.db")
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+os.environ.setdefault("MAIL_USERNAME", "test")
+os.environ.setdefault("MAIL_PASSWORD", "test")
+os.environ.setdefault("MAIL_FROM", "test@example.com")
+os.environ.setdefault("MAIL_PORT", "25")
+os.environ.setdefault("MAIL_SERVER", "localhost")
+os.environ.setdefault("MAIL_FROM_NAME", "test")
+os.environ.setdefault("DOMAIN", "localhost:8000")
+
+import fakeredis
+import httpx
+import pytest
+from sqlalchemy import event
+
+import src
+import src.db.redis as redis_module
+from src.auth.model import User
+from src.db.main import engine
+from src.db.redis import TimedRedis
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def redis():
+    redis_module.redis_client = TimedRedis(connection_pool=fakeredis.aioredis.FakeRedis().connection_pool)
+    yield redis_module.redis_client
+    await redis_module.close_redis()
+
+
+@pytest.fixture
+async def users_table():
+    # samo users; apartments ima kolone i indekse koje SQLite nema (tsvector, gin)
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: User.__table__.drop(sync_conn, checkfirst=True))
+        await conn.run_sync(lambda sync_conn: User.__table__.create(sync_conn))
+    yield
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client(redis, users_table):
+    transport = httpx.ASGITransport(app=src.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def user_selects():
+    # broji SELECT-e nad users tabelom, po jedan zahtev izmedju dva reset-a
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
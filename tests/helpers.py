@@ -0,0 +1,27 @@
+from src.auth.model import User
+from src.auth.utils import create_access_token, generate_password_hash
+from src.db.main import async_session
+
+
+async def create_user(**fields) -> User:
+    values = {
+        "username": "marko",
+        "password_hash": generate_password_hash("lozinka123"),
+        "email": "marko@example.com",
+        "first_name": "Marko",
+        "last_name": "Markovic",
+        "UCIN": "0101990710000",
+        "date_of_birth": "1990-01-01",
+        "gender": "male",
+        "is_verified": True,
+    }
+    user = User(**(values | fields))
+    async with async_session() as session:
+        session.add(user)
+        await session.commit()
+    return user
+
+
+def auth_headers(user: User) -> dict:
+    token = create_access_token(user_data={"email": user.email, "user_uid": str(user.uid), "role": user.role})
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,29 @@
+import pytest
+from pydantic import ValidationError
+
+from src.apartment.serializers import ApartmentCreateModel, QuoteRequestModel
+
+APARTMENT = {
+    "title": "Stan", "description": "d", "country": "RS", "city": "Beograd", "state": "", "address": "a",
+    "zip_code": "11000", "latitude": 44.8, "longitude": 20.4, "price": 50, "num_rooms": 2, "num_beds": 2,
+    "square_meters": 45, "floor": 1,
+}
+
+
+def test_apartment_currency_is_normalized():
+    assert ApartmentCreateModel(**APARTMENT).currency == "EUR"
+    assert ApartmentCreateModel(**APARTMENT, currency=" usd").currency == "USD"
+
+
+@pytest.mark.parametrize("currency", ["XYZ", "", "euro"])
+def test_apartment_rejects_currency_without_rate(currency):
+    with pytest.raises(ValidationError, match="Unsupported currency"):
+        ApartmentCreateModel(**APARTMENT, currency=currency)
+
+
+def test_quote_currency_uses_same_rules():
+    request = {"apartment_uids": ["5f0c6a1e-8b1f-4c3e-9f59-2f0f4a9d1c11"], "check_in": "2026-11-01", "check_out": "2026-11-03"}
+
+    assert QuoteRequestModel(**request, currency="gbp").currency == "GBP"
+    with pytest.raises(ValidationError, match="Unsupported currency"):
+        QuoteRequestModel(**request, currency="XYZ")
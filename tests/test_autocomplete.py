@@ -0,0 +1,115 @@
+import asyncio
+
+import orjson
+import pytest
+
+import src.apartment.autocomplete as autocomplete_module
+from src.apartment.autocomplete import REBUILD_LOCK_KEY, SEQUENCE_KEY, Autocomplete, LocationIndex
+
+
+def test_remove_last_apartment_drops_suggestion():
+    index = LocationIndex.build([("HR", "Dalmacija", "Split", 1), ("HR", "Dalmacija", "Sinj", 2)])
+
+    index.remove("HR", "Dalmacija", "Split")
+
+    assert [s["value"] for s in index.suggest("s", kind="city")] == ["Sinj"]
+    assert index.suggest("dal")[0]["count"] == 2
+
+
+def test_add_and_remove_without_state():
+    index = LocationIndex()
+
+    index.add("RS", None, "Beograd")
+    index.remove("RS", None, "Beograd")
+
+    assert index.entries == []
+    assert index.counts == {}
+
+
+LOCATIONS = [("HR", "Dalmacija", "Split", 2), ("RS", "Vojvodina", "Novi Sad", 1)]
+
+
+class FakeAutocomplete(Autocomplete):
+    # lokacije umesto GROUP BY iz baze, broji koliko puta je rebuild isao u bazu
+    def __init__(self, locations=LOCATIONS):
+        super().__init__(rebuild_interval=3600)
+        self.locations = locations
+        self.queries = 0
+
+    async def _locations(self) -> list:
+        self.queries += 1
+        await asyncio.sleep(0.01)
+        return self.locations
+
+
+def event(action: str, sequence: int, country: str, state: str, city: str) -> bytes:
+    return orjson.dumps([action, sequence, country, state, city])
+
+
+def cities(worker: Autocomplete) -> dict:
+    return {s["value"]: s["count"] for s in worker.index.suggest("", kind="city", limit=100)}
+
+
+@pytest.mark.anyio
+async def test_events_counted_in_snapshot_are_skipped(redis):
+    worker = FakeAutocomplete()
+    await redis.set(SEQUENCE_KEY, 5)
+    await worker._load()
+
+    await worker.apply(event("add", 5, "HR", "Dalmacija", "Split"))
+    await worker.apply(event("add", 7, "HR", "Dalmacija", "Sinj"))
+    await worker.apply(event("add", 6, "HR", "Dalmacija", "Split"))
+
+    assert worker.sequence == 5
+    assert cities(worker) == {"Split": 3, "Sinj": 1, "Novi Sad": 1}
+
+
+@pytest.mark.anyio
+async def test_snapshot_message_reloads_and_replays_recent_events(redis):
+    builder, worker = FakeAutocomplete(), FakeAutocomplete()
+    await builder._load()
+    await worker._load()
+
+    # dogadjaji 1 i 2 stignu pre novog snapshot-a koji sadrzi samo prvi
+    await redis.set(SEQUENCE_KEY, 1)
+    await worker.apply(event("add", 1, "HR", "Dalmacija", "Sinj"))
+    await worker.apply(event("add", 2, "CH", "Zürich", "Zürich"))
+    builder.locations = [*LOCATIONS, ("HR", "Dalmacija", "Sinj", 1)]
+    await builder._rebuild()
+
+    await worker.apply(orjson.dumps(["snapshot", builder.worker_id]))
+
+    assert worker.sequence == 1
+    assert cities(worker) == {"Split": 2, "Novi Sad": 1, "Sinj": 1, "Zürich": 1}
+    assert worker.queries == 0
+
+
+@pytest.mark.anyio
+async def test_own_snapshot_message_is_ignored(redis):
+    worker = FakeAutocomplete()
+    await worker._load()
+    worker.index.add("HR", "Dalmacija", "Sinj")
+
+    await worker.apply(orjson.dumps(["snapshot", worker.worker_id]))
+
+    assert "Sinj" in cities(worker)
+
+
+@pytest.mark.anyio
+async def test_cold_start_builds_snapshot_once(redis, monkeypatch):
+    monkeypatch.setattr(autocomplete_module, "SNAPSHOT_POLL_SECONDS", 0.01)
+    workers = [FakeAutocomplete() for _ in range(4)]
+
+    await asyncio.gather(*(worker._load() for worker in workers))
+
+    assert sum(worker.queries for worker in workers) == 1
+    assert all(cities(worker) == {"Split": 2, "Novi Sad": 1} for worker in workers)
+
+
+@pytest.mark.anyio
+async def test_rebuild_lock_has_one_owner(redis):
+    first, second = FakeAutocomplete(), FakeAutocomplete()
+
+    assert await first._take_rebuild_lock(60)
+    assert not await second._take_rebuild_lock(60)
+    assert await redis.get(REBUILD_LOCK_KEY) == first.worker_id.encode()
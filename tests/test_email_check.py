@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from src.auth.email_check import DeliverabilityChecker, StubResolver
+
+pytestmark = pytest.mark.anyio
+
+NO_MX = "The domain name nomx.rs does not accept email."
+
+
+def checker(resolver: StubResolver, negative_ttl: int = 3600) -> DeliverabilityChecker:
+    return DeliverabilityChecker(resolver=resolver, ttl=86400, negative_ttl=negative_ttl)
+
+
+async def test_deliverable_domain_is_resolved_once(redis):
+    resolver = StubResolver()
+    first, other_worker = checker(resolver), checker(resolver)
+
+    assert await first.check("marko@posta.rs") is None
+    assert await first.check("jovan@posta.rs") is None
+    # drugi worker ima prazan lokalni kes, presuda dolazi iz Redis-a
+    assert await other_worker.check("ana@posta.rs") is None
+
+    assert resolver.calls == 1
+    assert 86000 < await redis.ttl("email_domain:posta.rs") <= 86400
+
+
+async def test_undeliverable_domain_is_cached_for_negative_ttl(redis):
+    resolver = StubResolver(undeliverable={"nomx.rs": NO_MX})
+    domain_checker = checker(resolver, negative_ttl=1)
+
+    assert await domain_checker.check("marko@nomx.rs") == NO_MX
+    assert await domain_checker.check("jovan@nomx.rs") == NO_MX
+    assert resolver.calls == 1
+    assert await redis.ttl("email_domain:nomx.rs") == 1
+
+    # negativna presuda istekne i u procesu i u Redis-u, domen se ponovo proverava
+    await asyncio.sleep(1.1)
+    assert await domain_checker.check("marko@nomx.rs") == NO_MX
+    assert resolver.calls == 2
+
+
+async def test_invalid_address_skips_resolver(redis):
+    resolver = StubResolver()
+
+    assert await checker(resolver).check("not-an-email") is not None
+    assert resolver.calls == 0
+
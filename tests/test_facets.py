@@ -0,0 +1,124 @@
+import random
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from src.apartment.facets import AMENITIES, FacetBitmaps, FacetIndex, facet_event
+
+
+def make_rows(count: int, seed: int = 3) -> list[tuple]:
+    rng = random.Random(seed)
+    ids = rng.sample(range(count * 3), count)
+    return [(facet_id, rng.randrange(32), rng.randint(1, 5), rng.randint(1, 6), rng.randint(0, 12)) for facet_id in ids]
+
+
+def bitmaps_state(bitmaps: FacetBitmaps) -> tuple:
+    # prazne bitmape (0) posle remove su isto sto i nepostojece
+    def clean(values):
+        return {value: bits for value, bits in values.items() if bits}
+    return bitmaps.active, bitmaps.amenities, clean(bitmaps.rooms), clean(bitmaps.beds), clean(bitmaps.floors)
+
+
+@pytest.fixture(scope="module")
+def database():
+    rows = make_rows(2000)
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE apartments (facet_id INTEGER, amenity_mask INTEGER, num_rooms INTEGER, num_beds INTEGER, floor INTEGER)")
+    conn.executemany("INSERT INTO apartments VALUES (?, ?, ?, ?, ?)", rows)
+    yield rows, conn
+    conn.close()
+
+
+def test_build_matches_incremental_add():
+    rows = make_rows(500)
+    incremental = FacetBitmaps()
+    for row in rows:
+        incremental.add(*row)
+
+    assert bitmaps_state(FacetBitmaps.build(rows)) == bitmaps_state(incremental)
+
+
+def test_add_and_remove_are_idempotent():
+    rows = make_rows(200)
+    bitmaps = FacetBitmaps.build(rows)
+    before = bitmaps_state(bitmaps)
+
+    bitmaps.add(*rows[0])
+    assert bitmaps_state(bitmaps) == before
+
+    bitmaps.remove(*rows[0])
+    removed = bitmaps_state(bitmaps)
+    bitmaps.remove(*rows[0])
+    assert bitmaps_state(bitmaps) == removed
+    assert bitmaps_state(bitmaps) == bitmaps_state(FacetBitmaps.build(rows[1:]))
+
+    # nepoznat stan ne menja nista
+    bitmaps.remove(10**6, 31, 1, 1, 1)
+    assert bitmaps_state(bitmaps) == removed
+
+
+def test_range_or():
+    bitmaps = FacetBitmaps.build([(1, 0, 1, 1, 0), (2, 0, 2, 1, 0), (3, 0, 4, 1, 0)])
+
+    assert FacetBitmaps._range(bitmaps.rooms, None, None) is None
+    assert FacetBitmaps._range(bitmaps.rooms, 2, None) == 1 << 2 | 1 << 3
+    assert FacetBitmaps._range(bitmaps.rooms, None, 2) == 1 << 1 | 1 << 2
+    assert FacetBitmaps._range(bitmaps.rooms, 2, 3) == 1 << 2
+    assert FacetBitmaps._range(bitmaps.rooms, 5, None) == 0
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_counts_match_group_by(database, seed):
+    rows, conn = database
+    rng = random.Random(seed)
+    required = rng.randrange(32) & rng.randrange(32)
+    filters = {
+        "min_rooms": rng.choice([None, 2, 3]), "max_rooms": rng.choice([None, 3, 4]),
+        "min_beds": rng.choice([None, 2]), "max_beds": rng.choice([None, 5]),
+        "min_floor": rng.choice([None, 1, 4]), "max_floor": rng.choice([None, 8]),
+    }
+    bitmaps = FacetBitmaps.build(rows)
+
+    counts = bitmaps.counts(bitmaps.match(required, **filters))
+
+    where, params = ["amenity_mask & ? = ?"], [required, required]
+    for column, low, high in (("num_rooms", "min_rooms", "max_rooms"), ("num_beds", "min_beds", "max_beds"), ("floor", "min_floor", "max_floor")):
+        if filters[low] is not None:
+            where.append(f"{column} >= ?")
+            params.append(filters[low])
+        if filters[high] is not None:
+            where.append(f"{column} <= ?")
+            params.append(filters[high])
+    condition = " AND ".join(where)
+
+    def group_by(column):
+        statement = f"SELECT {column}, count(*) FROM apartments WHERE {condition} GROUP BY {column}"
+        return dict(conn.execute(statement, params).fetchall())
+
+    assert counts["total"] == conn.execute(f"SELECT count(*) FROM apartments WHERE {condition}", params).fetchone()[0]
+    assert {k: v for k, v in counts["num_rooms"].items() if v} == group_by("num_rooms")
+    assert {k: v for k, v in counts["num_beds"].items() if v} == group_by("num_beds")
+    for bit, name in enumerate(AMENITIES):
+        expected = conn.execute(f"SELECT count(*) FROM apartments WHERE {condition} AND amenity_mask & {1 << bit}", params).fetchone()[0]
+        assert counts["amenities"][name] == expected
+
+
+def apartment(facet_id, mask=0b101, rooms=2, beds=3, floor=1):
+    return SimpleNamespace(facet_id=facet_id, amenity_mask=mask, num_rooms=rooms, num_beds=beds, floor=floor)
+
+
+def test_apply_replays_events_over_rebuild():
+    index = FacetIndex(rebuild_interval=3600)
+    created, deactivated, later = apartment(1), apartment(2), apartment(3, mask=0b010)
+
+    # rebuild je vec video created i deactivated; dogadjaji stizu posle (subscribe pre upita)
+    index.bitmaps = FacetBitmaps.build([(1, 0b101, 2, 3, 1)])
+    for payload in (facet_event("add", created), facet_event("remove", deactivated), facet_event("add", later)):
+        index.apply(payload)
+
+    expected = FacetBitmaps.build([(1, 0b101, 2, 3, 1), (3, 0b010, 2, 3, 1)])
+    assert bitmaps_state(index.bitmaps) == bitmaps_state(expected)
+
+    index.apply(facet_event("remove", created))
+    assert index.bitmaps.counts(index.bitmaps.match(0))["total"] == 1
@@ -0,0 +1,125 @@
+import random
+
+import pytest
+
+from src.apartment import geo
+
+
+def in_box(latitude, longitude, south, west, north, east) -> bool:
+    if not south <= latitude <= north:
+        return False
+    return west <= longitude <= east if west <= east else (longitude >= west or longitude <= east)
+
+
+def random_point(south, west, north, east, rng) -> tuple[float, float]:
+    latitude = rng.uniform(south, north)
+    if west <= east:
+        return latitude, rng.uniform(west, east)
+    longitude = rng.uniform(west, east + 360.0)
+    return latitude, longitude - 360.0 if longitude > 180.0 else longitude
+
+
+def assert_covered(south, west, north, east, points) -> None:
+    cells = geo.cover(south, west, north, east)
+    ranges = geo.cover_ranges(south, west, north, east)
+
+    assert len(cells) <= geo.MAX_CELLS
+    for latitude, longitude in points:
+        geohash = geo.encode(latitude, longitude)
+        assert any(geohash.startswith(cell) for cell in cells), (latitude, longitude, cells)
+        assert any(low <= geohash < high for low, high in ranges), (latitude, longitude, ranges)
+
+
+def test_encode_known_value():
+    assert geo.encode(57.64911, 10.40744, precision=11) == "u4pruydqqvj"
+
+
+def test_cover_random_boxes():
+    rng = random.Random(7)
+    for _ in range(300):
+        size = 10 ** rng.uniform(-4, 1.5)
+        south = rng.uniform(-90.0, 90.0 - size)
+        west = rng.uniform(-180.0, 180.0)
+        east = (west + size * rng.uniform(0.2, 3.0) + 180.0) % 360.0 - 180.0
+        box = (south, west, south + size, east)
+        points = [random_point(*box, rng) for _ in range(50)]
+        points += [(box[0], box[1]), (box[0], box[3]), (box[2], box[1]), (box[2], box[3])]
+        assert_covered(*box, points)
+
+
+@pytest.mark.parametrize("box", [
+    (-10.0, 179.5, 10.0, -179.5),
+    (0.0, 170.0, 0.001, -170.0),
+    (-0.5, 179.999, 0.5, -179.999),
+])
+def test_cover_across_antimeridian(box):
+    rng = random.Random(11)
+    points = [random_point(*box, rng) for _ in range(500)]
+    points += [(0.0, 180.0), (0.0, -180.0), (box[0], box[1]), (box[2], box[3])]
+    assert_covered(*box, [(lat, lon) for lat, lon in points if in_box(lat, lon, *box)])
+
+
+@pytest.mark.parametrize("box", [
+    (89.9, -180.0, 90.0, 180.0),
+    (-90.0, -180.0, -89.5, 180.0),
+    (89.999, 10.0, 90.0, 10.001),
+])
+def test_cover_at_poles(box):
+    rng = random.Random(13)
+    points = [random_point(*box, rng) for _ in range(500)]
+    points += [(box[2], box[1]), (box[0], box[3])]
+    assert_covered(*box, points)
+
+
+def test_radius_bbox_contains_circle():
+    rng = random.Random(17)
+    for _ in range(200):
+        latitude, longitude = rng.uniform(-89.0, 89.0), rng.uniform(-180.0, 180.0)
+        radius = 10 ** rng.uniform(-1, 3.3)
+        box = geo.radius_bbox(latitude, longitude, radius)
+        for _ in range(200):
+            # tacke oko centra, proverava se samo one u krugu
+            spread = radius / 111.0 * 2
+            point_lat = min(max(latitude + rng.uniform(-spread, spread), -90.0), 90.0)
+            point_lon = (longitude + rng.uniform(-spread, spread) * 3 + 180.0) % 360.0 - 180.0
+            if geo.haversine_km(latitude, longitude, point_lat, point_lon) <= radius:
+                assert in_box(point_lat, point_lon, *box), (latitude, longitude, radius, point_lat, point_lon, box)
+
+
+def test_radius_bbox_near_pole_is_full_width():
+    south, west, north, east = geo.radius_bbox(89.5, 20.0, 100.0)
+
+    assert (west, north, east) == (-180.0, 90.0, 180.0)
+
+
+def test_next_cell():
+    assert geo._next_cell("b0") == "b1"
+    assert geo._next_cell("b0z") == "b10"
+    assert geo._next_cell("0zz") == "100"
+    assert geo._next_cell("zzz") is None
+
+
+def test_cover_ranges_merge_adjacent_cells():
+    ranges = geo.cover_ranges(0.1, 0.1, 0.2, 0.3)
+
+    assert len(geo.cover(0.1, 0.1, 0.2, 0.3)) == 15
+    assert ranges[:2] == [("s000d", "s000h"), ("s000s", "s000x")]
+    for (_, high), (low, _) in zip(ranges, ranges[1:]):
+        assert high < low
+
+
+def test_cover_ranges_last_cell_is_open():
+    ranges = geo.cover_ranges(89.9999, 179.9999, 90.0, 180.0)
+
+    assert ranges[-1][1] == "~"
+    assert geo.encode(90.0, 180.0) >= ranges[-1][0]
+
+
+def test_in_box_splits_longitude_across_antimeridian():
+    from src.apartment.service import in_box as in_box_sql
+
+    wrapped = str(in_box_sql(-1.0, 179.0, 1.0, -179.0).compile(compile_kwargs={"literal_binds": True}))
+    plain = str(in_box_sql(-1.0, 20.0, 1.0, 21.0).compile(compile_kwargs={"literal_binds": True}))
+
+    assert "apartments.longitude >= 179.0 OR apartments.longitude <= -179.0" in wrapped
+    assert "apartments.longitude BETWEEN 20.0 AND 21.0" in plain
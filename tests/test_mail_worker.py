@@ -0,0 +1,98 @@
+import asyncio
+
+import aiosmtplib
+import pytest
+
+import src.mail_worker as mail_worker
+from src.mail_queue import MAIL_DEAD, MAIL_DELAYED, MAIL_GROUP, MAIL_STREAM, decode_job, encode_job, enqueue_mail
+from src.mail_worker import MailWorker
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeConnection:
+    def __init__(self, fail_for: set[str] = frozenset()):
+        self.fail_for = fail_for
+        self.sent = []
+
+    async def send(self, message) -> None:
+        if message["To"] in self.fail_for:
+            raise aiosmtplib.SMTPRecipientsRefused([])
+        self.sent.append(message["To"])
+
+    async def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+async def worker(redis):
+    await redis.xgroup_create(MAIL_STREAM, MAIL_GROUP, id="0", mkstream=True)
+    return MailWorker(connections=1, batch_size=10, max_attempts=3)
+
+
+async def read(redis) -> list:
+    response = await redis.xreadgroup(MAIL_GROUP, "test", {MAIL_STREAM: ">"}, count=10)
+    return response[0][1] if response else []
+
+
+async def test_each_message_is_acked_after_send(redis, worker):
+    await enqueue_mail(["a@example.com"], "s", "b")
+    await enqueue_mail(["b@example.com"], "s", "b")
+    first, second = await read(redis)
+
+    await worker._handle(FakeConnection(), *first)
+
+    # drugi jos ceka, prvi je potvrdjen i obrisan
+    assert (await redis.xpending(MAIL_STREAM, MAIL_GROUP))["pending"] == 1
+    assert await redis.xlen(MAIL_STREAM) == 1
+
+
+async def test_unreadable_job_goes_to_dead_letters(redis, worker):
+    await redis.xadd(MAIL_STREAM, {"job": b"{not json"})
+    await redis.xadd(MAIL_STREAM, {"other": b"x"})
+
+    for message in await read(redis):
+        await worker._handle(FakeConnection(), *message)
+
+    assert await redis.xlen(MAIL_DEAD) == 2
+    assert (await redis.xpending(MAIL_STREAM, MAIL_GROUP))["pending"] == 0
+
+
+async def test_identical_retries_stay_separate(redis, worker):
+    for _ in range(2):
+        await enqueue_mail(["a@example.com"], "s", "b")
+
+    for message in await read(redis):
+        await worker._handle(FakeConnection(fail_for={"a@example.com"}), *message)
+
+    retries = await redis.zrange(MAIL_DELAYED, 0, -1)
+    assert len(retries) == 2
+    assert [decode_job(job)["attempts"] for job in retries] == [1, 1]
+    assert worker.failed == 2
+
+
+async def test_last_attempt_goes_to_dead_letters(redis, worker):
+    await redis.xadd(MAIL_STREAM, {"job": encode_job(["a@example.com"], "s", "b", attempts=2)})
+
+    await worker._handle(FakeConnection(fail_for={"a@example.com"}), *(await read(redis))[0])
+
+    assert await redis.zcard(MAIL_DELAYED) == 0
+    assert await redis.xlen(MAIL_DEAD) == 1
+
+
+async def test_consumer_keeps_running_after_error(redis, worker, monkeypatch):
+    monkeypatch.setattr(mail_worker, "ERROR_BACKOFF", 0.01)
+    calls = 0
+
+    async def consume_once(connection, consumer):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("redis went away")
+        worker.stop()
+
+    monkeypatch.setattr(worker, "_consume_once", consume_once)
+
+    await asyncio.wait_for(worker._consume(0), timeout=5)
+
+    assert calls == 2
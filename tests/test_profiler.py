@@ -0,0 +1,36 @@
+import pytest
+
+from tests.helpers import auth_headers, create_user
+
+pytestmark = pytest.mark.anyio
+
+
+async def profiler_token(client, admin) -> str:
+    response = await client.post("/api/v1/admin/profiler/token", headers=auth_headers(admin))
+    assert response.status_code == 200
+    return response.json()["token"]
+
+
+async def test_non_utf8_profile_header_is_ignored(client):
+    user = await create_user()
+    headers = {**auth_headers(user), "X-Profile": b"\xff\xfe"}
+
+    response = await client.get("/api/v1/auth/me", headers=headers)
+
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+
+
+async def test_profiler_token_is_single_use(client):
+    admin = await create_user(role="admin")
+    headers = {**auth_headers(admin), "X-Profile": await profiler_token(client, admin)}
+
+    first = await client.get("/api/v1/auth/me", headers=headers)
+    replay = await client.get("/api/v1/auth/me", headers=headers)
+
+    assert "x-profile-id" in first.headers
+    assert replay.status_code == 200
+    assert "x-profile-id" not in replay.headers
+
+    profile = await client.get(f"/api/v1/admin/profiler/{first.headers['x-profile-id']}", headers=auth_headers(admin))
+    assert profile.status_code == 200
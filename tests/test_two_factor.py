@@ -0,0 +1,34 @@
+import pytest
+
+from tests.helpers import auth_headers, create_user
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_qr_code_requires_token(client):
+    await create_user()
+
+    response = await client.get("/api/v1/auth/2fa/qr-code/marko")
+
+    assert response.status_code == 403
+
+
+async def test_qr_code_only_for_owner(client):
+    owner = await create_user(totp_secret="JBSWY3DPEHPK3PXP", enabled_2fa=True)
+    other = await create_user(username="jovan", email="jovan@example.com", UCIN="0202990710000")
+
+    response = await client.get(f"/api/v1/auth/2fa/qr-code/{owner.username}", headers=auth_headers(other))
+
+    assert response.status_code == 403
+
+
+async def test_qr_code_keeps_secret_of_enrolled_owner(client):
+    owner = await create_user()
+    headers = auth_headers(owner)
+
+    first = await client.get(f"/api/v1/auth/2fa/qr-code/{owner.username}", headers=headers)
+    second = await client.get(f"/api/v1/auth/2fa/qr-code/{owner.username}", headers=headers)
+
+    assert first.status_code == 200
+    assert first.headers["content-type"] == "image/png"
+    assert second.content == first.content
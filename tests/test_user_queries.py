@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from src.auth.profile_cache import USER_PROFILES_CHANNEL, user_profiles
+from tests.helpers import auth_headers, create_user
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def profile_cache(redis):
+    await user_profiles.start()
+    for _ in range(100):
+        if user_profiles.ready:
+            break
+        await asyncio.sleep(0.01)
+    yield user_profiles
+    await user_profiles.stop()
+
+
+async def test_login_loads_user_once(client, user_selects):
+    user = await create_user()
+
+    response = await client.post("/api/v1/auth/login", json={"email": user.email, "password_hash": "lozinka123"})
+
+    assert response.status_code == 200
+    assert len(user_selects) == 1
+
+
+async def test_me_loads_user_once(client, user_selects):
+    user = await create_user()
+
+    response = await client.get("/api/v1/auth/me", headers=auth_headers(user))
+
+    assert response.status_code == 200
+    assert response.json()["email"] == user.email
+    assert len(user_selects) == 1
+
+
+async def test_disable_2fa_loads_user_once(client, user_selects):
+    user = await create_user(totp_secret="JBSWY3DPEHPK3PXP", enabled_2fa=True)
+
+    response = await client.post("/api/v1/auth/disable_2fa", headers=auth_headers(user))
+
+    assert response.status_code == 200
+    assert len(user_selects) == 1
+
+
+async def test_cached_profile_skips_select(client, user_selects, profile_cache):
+    user = await create_user()
+    headers = auth_headers(user)
+
+    await client.get("/api/v1/auth/me", headers=headers)
+    user_selects.clear()
+    response = await client.get("/api/v1/auth/me", headers=headers)
+
+    assert response.status_code == 200
+    assert user_selects == []
+
+
+async def test_invalidation_reaches_other_workers(client, redis, user_selects, profile_cache):
+    user = await create_user()
+    headers = auth_headers(user)
+    await client.get("/api/v1/auth/me", headers=headers)
+
+    # drugi worker je promenio korisnika, ovaj vidi samo poruku na kanalu
+    await redis.publish(USER_PROFILES_CHANNEL, str(user.uid))
+    for _ in range(100):
+        if profile_cache.get(user.uid) is None:
+            break
+        await asyncio.sleep(0.01)
+
+    user_selects.clear()
+    response = await client.get("/api/v1/auth/me", headers=headers)
+
+    assert response.status_code == 200
+    assert len(user_selects) == 1
+
+
+async def test_stale_load_is_not_cached(client, user_selects, profile_cache):
+    user = await create_user()
+    headers = auth_headers(user)
+
+    # invalidacija izmedju citanja generation i upisa u kes
+    generation = profile_cache.generation
+    profile_cache.drop(user.uid)
+    profile_cache.set(user.uid, {"stale": True}, generation)
+
+    assert profile_cache.get(user.uid) is None
+
+    await client.get("/api/v1/auth/me", headers=headers)
+    user_selects.clear()
+    await client.get("/api/v1/auth/me", headers=headers)
+
+    assert user_selects == []
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from tests.helpers import auth_headers, create_user
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_me_hides_password_and_totp_secret(client):
+    user = await create_user(totp_secret="JBSWY3DPEHPK3PXP", enabled_2fa=True)
+
+    response = await client.get("/api/v1/auth/me", headers=auth_headers(user))
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["uid"] == str(user.uid)
+    assert body["enabled_2fa"] is True
+    assert "password_hash" not in body
+    assert "totp_secret" not in body
+
+
+async def test_all_users_requires_admin(client):
+    user = await create_user()
+
+    anonymous = await client.post("/api/v1/auth/all_users")
+    member = await client.post("/api/v1/auth/all_users", headers=auth_headers(user))
+
+    assert anonymous.status_code == 403
+    assert member.status_code == 403
+
+
+@pytest.mark.parametrize("format", ["json", "ndjson"])
+async def test_all_users_exports_public_fields(client, format):
+    admin = await create_user(role="admin")
+    await create_user(username="jovan", email="jovan@example.com", UCIN="0202990710000", totp_secret="JBSWY3DPEHPK3PXP")
+
+    response = await client.post(f"/api/v1/auth/all_users?format={format}", headers=auth_headers(admin))
+
+    assert response.status_code == 200
+    if format == "ndjson":
+        items = [json.loads(line) for line in response.text.splitlines()]
+    else:
+        items = response.json()["items"]
+    assert {item["username"] for item in items} == {"marko", "jovan"}
+    assert all("password_hash" not in item and "totp_secret" not in item for item in items)